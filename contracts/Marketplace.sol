@@ -5,6 +5,8 @@ pragma solidity ^0.8.3;
 import "https://github.com/OpenZeppelin/openzeppelin-contracts/blob/release-v4.9/contracts/token/ERC721/ERC721.sol";
 // Contador para os IDs dos itens alugáveis
 import "https://github.com/OpenZeppelin/openzeppelin-contracts/blob/release-v4.9/contracts/utils/Counters.sol";
+// Conjuntos de IDs usados nas consultas paginadas
+import "https://github.com/OpenZeppelin/openzeppelin-contracts/blob/release-v4.9/contracts/utils/structs/EnumerableSet.sol";
 
 
 contract Marketplace{
@@ -15,6 +17,8 @@ contract Marketplace{
 
     // Importando utilização do contador
     using Counters for Counters.Counter;
+    // Importando utilização dos conjuntos de IDs
+    using EnumerableSet for EnumerableSet.UintSet;
     // Contador para os IDs dos itens alugáveis
     Counters.Counter private _itemIds;
     // Contador para a quantidade de itens alugados
@@ -28,7 +32,8 @@ contract Marketplace{
     // colocar o seu item disponível para aluguel
     uint256  private taxaMarketplace;
     
-    // Estrutura que mapeia um item alugável
+    // Estrutura que mapeia um item alugável, retornada pelas consultas e
+    // mantida com o mesmo formato para os clientes (ABI)
     struct Item{
         uint256 itemId; // Identificador do item
         bool statusAlugado; // Status indicando se o item está alugado (true) ou não (false)
@@ -40,8 +45,30 @@ contract Marketplace{
         uint256 expiraEm; // Tempo de duração do aluguel
     }
 
+    // Formato em que o item é guardado, com os campos agrupados em 4 slots de
+    // 32 bytes (em vez de 8). O ID do item é a própria chave do mapeamento e
+    // um item existe quando o seu vendedor não é nulo
+    struct ItemArmazenado{
+        address contratoNFT; // slot 0 (20 bytes)
+        bool statusAlugado; // slot 0 (1 byte)
+        uint64 expiraEm; // slot 0 (8 bytes): duração e, após o aluguel, data de expiração
+        uint256 tokenId; // slot 1
+        address payable vendedor; // slot 2 (20 bytes)
+        uint96 preco; // slot 2 (12 bytes)
+        address locatario; // slot 3
+    }
+
     // Lista dos itens alugáveis do marketplace
-    mapping(uint256 => Item) private listaItens;
+    mapping(uint256 => ItemArmazenado) private listaItens;
+
+    // IDs dos itens disponíveis para aluguel
+    EnumerableSet.UintSet private _itensAlugaveis;
+    // IDs dos itens alugados no momento
+    EnumerableSet.UintSet private _itensAlugados;
+    // IDs dos itens de cada vendedor
+    mapping(address => EnumerableSet.UintSet) private _itensPorVendedor;
+    // IDs dos itens alugados por cada locatário
+    mapping(address => EnumerableSet.UintSet) private _itensPorLocatario;
     
     // Evento que será disparado para retornar um item após sua criação
     event ItemCriado(
@@ -55,6 +82,9 @@ contract Marketplace{
         uint256 expiraEm
     );
 
+    // Evento que informa o resultado de cada item de uma operação em lote
+    event ResultadoLote(uint256 indexed itemId, bool sucesso);
+
     // Construtor que inicializa o dono do contrato
     constructor(){
         donoContrato = payable(msg.sender);
@@ -78,21 +108,25 @@ contract Marketplace{
         uint256 preco, uint256 expiraEm) public payable{
         
         require(preco > 0, "Preco deve ser ao menos de 1 wei!");
+        require(preco <= type(uint96).max, "Preco acima do limite!");
+        // Metade do limite, para que a soma com a data do aluguel não exceda 64 bits
+        require(expiraEm <= type(uint64).max / 2, "Tempo de aluguel acima do limite!");
         require(msg.value == taxaMarketplace, "Pague exatamente a taxa que o Marketplace exige!");
 
         _itemIds.increment();
         uint256 itemId = _itemIds.current();
 
-        listaItens[itemId] = Item(
-            itemId,
+        listaItens[itemId] = ItemArmazenado(
+            contratoNFT,
             false,
-            address(contratoNFT),
+            uint64(expiraEm),
             tokenId,
             payable(msg.sender),
-            address(0),
-            preco,
-            expiraEm
+            uint96(preco),
+            address(0)
         );
+        _itensAlugaveis.add(itemId);
+        _itensPorVendedor[msg.sender].add(itemId);
 
         IERC721(contratoNFT).transferFrom(msg.sender, address(this), tokenId);
         donoContrato.transfer(taxaMarketplace);
@@ -111,147 +145,231 @@ contract Marketplace{
 
     // Função que aluga um item disponível no marketplace
     function alugarItem(address contratoNFT, uint256 itemId) public payable{
-        uint256 preco = listaItens[itemId].preco;
-        uint256 tokenId = listaItens[itemId].tokenId;
+        ItemArmazenado storage item = listaItens[itemId];
 
-        require(!listaItens[itemId].statusAlugado, "Este token ja esta alugado!");
-        require(IERC721(contratoNFT).ownerOf(tokenId) == address(this), "Token nao disponivel!");
-        require(msg.value == preco, "Pague exatamente o valor do aluguel!");
+        require(!item.statusAlugado, "Este token ja esta alugado!");
+        require(IERC721(contratoNFT).ownerOf(item.tokenId) == address(this), "Token nao disponivel!");
+        require(msg.value == item.preco, "Pague exatamente o valor do aluguel!");
         
-        listaItens[itemId].vendedor.transfer(msg.value);
-        IERC721(contratoNFT).transferFrom(address(this), msg.sender, tokenId);
+        _alugaItem(contratoNFT, itemId, item);
+    }
+
+    // Função que aluga vários itens em uma única transação. O valor enviado
+    // deve cobrir os itens desejados: itens indisponíveis ou que excedam o
+    // valor são ignorados, o resultado de cada item é informado pelo evento
+    // ResultadoLote e o valor não utilizado é devolvido ao locatário
+    function alugarItens(address contratoNFT, uint256[] calldata itemIds) external payable{
+        uint256 valorRestante = msg.value;
+
+        for (uint256 i = 0; i < itemIds.length; i++) {
+            ItemArmazenado storage item = listaItens[itemIds[i]];
+            uint256 preco = item.preco;
+            bool sucesso = preco <= valorRestante && _podeAlugar(contratoNFT, item);
+            if (sucesso) {
+                valorRestante -= preco;
+                _alugaItem(contratoNFT, itemIds[i], item);
+            }
+            emit ResultadoLote(itemIds[i], sucesso);
+        }
+
+        if (valorRestante > 0) {
+            payable(msg.sender).transfer(valorRestante);
+        }
+    }
 
-        listaItens[itemId].expiraEm = listaItens[itemId].expiraEm + block.timestamp;
-        listaItens[itemId].locatario = msg.sender;
-        listaItens[itemId].statusAlugado = true;
+    // Função que verifica, sem reverter, se um item pode ser alugado
+    function _podeAlugar(address contratoNFT, ItemArmazenado storage item) internal view returns (bool) {
+        if (item.vendedor == address(0) || item.statusAlugado || item.contratoNFT != contratoNFT) {
+            return false;
+        }
+        try IERC721(contratoNFT).ownerOf(item.tokenId) returns (address dono) {
+            return dono == address(this);
+        } catch {
+            return false;
+        }
+    }
+
+    // Função que efetiva o aluguel de um item já verificado
+    function _alugaItem(address contratoNFT, uint256 itemId, ItemArmazenado storage item) internal {
+        item.vendedor.transfer(item.preco);
+        IERC721(contratoNFT).transferFrom(address(this), msg.sender, item.tokenId);
+
+        // Status e expiração ocupam o mesmo slot e são gravados juntos
+        item.statusAlugado = true;
+        item.expiraEm = item.expiraEm + uint64(block.timestamp);
+        item.locatario = msg.sender;
+        _itensAlugaveis.remove(itemId);
+        _itensAlugados.add(itemId);
+        _itensPorLocatario[msg.sender].add(itemId);
         _countItensAlugados.increment();
     }
 
     // Função que finaliza um aluguel após o prazo de um item
     // ou caso o locatário desejar finalizar antes do prazo
     function finalizaAluguel(uint256 itemId) external {
-        Item storage itemAlugado = listaItens[itemId];
+        ItemArmazenado storage itemAlugado = listaItens[itemId];
 
         require(itemAlugado.statusAlugado, "Este token nao esta alugado!");
         require(msg.sender == itemAlugado.locatario || block.timestamp >= itemAlugado.expiraEm,
                 "Este token ainda esta no periodo de aluguel!");
         
+        require(_finalizaItem(itemId, itemAlugado), "Nao foi possivel transferir o NFT de volta para o vendedor!");
+    }
+
+    // Função que finaliza vários aluguéis em uma única transação. Itens que
+    // não podem ser finalizados são ignorados e o resultado de cada item é
+    // informado pelo evento ResultadoLote
+    function finalizaAlugueis(uint256[] calldata itemIds) external {
+        for (uint256 i = 0; i < itemIds.length; i++) {
+            ItemArmazenado storage itemAlugado = listaItens[itemIds[i]];
+            bool sucesso = itemAlugado.statusAlugado &&
+                (msg.sender == itemAlugado.locatario || block.timestamp >= itemAlugado.expiraEm) &&
+                _finalizaItem(itemIds[i], itemAlugado);
+            emit ResultadoLote(itemIds[i], sucesso);
+        }
+    }
+
+    // Função que devolve o NFT ao vendedor e remove o item do marketplace.
+    // Retorna false, sem alterar o item, caso a devolução falhe
+    function _finalizaItem(uint256 itemId, ItemArmazenado storage itemAlugado) internal returns (bool) {
+        // Campos lidos uma única vez
+        address vendedor = itemAlugado.vendedor;
+        address locatario = itemAlugado.locatario;
+
         itemAlugado.statusAlugado = false;
         
         (bool sucessoTransferencia, ) = (itemAlugado.contratoNFT).call(
             abi.encodeWithSignature(
                 "transferirTokenExpirado(address,address,uint256)",
-                itemAlugado.locatario,
-                itemAlugado.vendedor,
+                locatario,
+                vendedor,
                 itemAlugado.tokenId
             )
         );
-        require(sucessoTransferencia, "Nao foi possivel transferir o NFT de volta para o vendedor!");
+        if (!sucessoTransferencia) {
+            itemAlugado.statusAlugado = true;
+            return false;
+        }
 
+        _itensAlugados.remove(itemId);
+        _itensPorVendedor[vendedor].remove(itemId);
+        _itensPorLocatario[locatario].remove(itemId);
         _countItensDevolvidos.increment();
         delete listaItens[itemId];
+        return true;
     }
 
     // Função que retorna a lista de NFTs disponíveis para alugar
     function getNFTsAlugaveis() public view returns (Item[] memory) {
-        uint256 qtdeItensTotal = _itemIds.current();
-        uint256 qtdeItensAlugaveis = 0;
-        uint256 indiceAtual = 0;
-
-        // Contabiliza a quantidade de NFTs totais disponíveis
-        // para criar a lista de retorno
-        for (uint256 i = 1; i <= qtdeItensTotal; i++) {
-            if (listaItens[i].itemId != 0 && !listaItens[i].statusAlugado) {
-                qtdeItensAlugaveis += 1;
-            }
-        }
-
-        Item[] memory listaItensDisponiveis = new Item[](qtdeItensAlugaveis);
-
-        for (uint256 i = 1; i <= qtdeItensTotal; i++) {
-            if (listaItens[i].itemId != 0 && !listaItens[i].statusAlugado) {
-                listaItensDisponiveis[indiceAtual] = listaItens[i];
-                indiceAtual += 1;
-            }
-        }
+        (Item[] memory listaItensDisponiveis, ) = _paginaConjunto(_itensAlugaveis, 0, _itensAlugaveis.length());
         return listaItensDisponiveis;
     }
 
     // Função que retorna os NFTs alugáveis de um vendedor
     function getNFTsPorVendedor() public view returns (Item[] memory) {
-        uint256 qtdeItensTotal = _itemIds.current();
-        uint256 countItensVendedor = 0;
-        uint256 indiceAtual = 0;
-
-        // Contabiliza a quantidade de NFTs totais do vendedor
-        // para criar a lista de retorno
-        for (uint256 i = 1; i <= qtdeItensTotal; i++) {
-            if (listaItens[i].vendedor == msg.sender) {
-                countItensVendedor += 1;
-            }
-        }
-
-        Item[] memory listaItensVendedor = new Item[](countItensVendedor);
-
-        for (uint256 i = 1; i <= qtdeItensTotal; i++) {
-            if (listaItens[i].vendedor == msg.sender) {
-                listaItensVendedor[indiceAtual] = listaItens[i];
-                indiceAtual += 1;
-            }
-        }
+        EnumerableSet.UintSet storage itensVendedor = _itensPorVendedor[msg.sender];
+        (Item[] memory listaItensVendedor, ) = _paginaConjunto(itensVendedor, 0, itensVendedor.length());
         return listaItensVendedor;
     }
 
     // Função que retorna os NFTs alugados por um locatário
     function getNFTsPorLocatario() public view returns (Item[] memory) {
-        uint256 qtdeItensTotal = _itemIds.current();
-        uint256 countItensLocatario = 0;
-        uint256 indiceAtual = 0;
-
-        // Contabiliza a quantidade de NFTs totais do locatário
-        // para criar a lista de retorno
-        for (uint256 i = 1; i <= qtdeItensTotal; i++) {
-            if (listaItens[i].locatario == msg.sender) {
-                countItensLocatario += 1;
-            }
-        }
-
-        Item[] memory listaItensLocatario = new Item[](countItensLocatario);
-
-        for (uint256 i = 1; i <= qtdeItensTotal; i++) {
-            if (listaItens[i].locatario == msg.sender) {
-                listaItensLocatario[indiceAtual] = listaItens[i];
-                indiceAtual += 1;
-            }
-        }
+        EnumerableSet.UintSet storage itensLocatario = _itensPorLocatario[msg.sender];
+        (Item[] memory listaItensLocatario, ) = _paginaConjunto(itensLocatario, 0, itensLocatario.length());
         return listaItensLocatario;
     }
 
     // Função que retorna os itens expirados, mas ainda alugados até o momento atual da pesquisa
     function getNFTsExpiradosEAlugados() public view returns (Item[] memory) {
-        uint256 qtdeItensTotal = _itemIds.current();
-        uint256 countItensExpiradosEAlugados = 0;
-        uint256 indiceAtual = 0;
+        (Item[] memory listaItensExpirados, ) = _paginaExpirados(0, _itensAlugados.length());
+        return listaItensExpirados;
+    }
 
-        // Contabiliza a quantidade de NFTs totais expirados
-        // para criar a lista de retorno
-        for (uint256 i = 1; i <= qtdeItensTotal; i++) {
-            if (listaItens[i].statusAlugado && listaItens[i].expiraEm <= block.timestamp) {
-                countItensExpiradosEAlugados += 1;
-            }
+    // Versões paginadas das consultas acima. Recebem a posição inicial (cursor)
+    // e a quantidade máxima de itens (limite) e retornam os itens da página e
+    // o cursor da próxima página, que é 0 quando não há mais itens.
+    // A ordem segue os conjuntos de IDs, que podem ser reordenados quando
+    // um item é alugado ou devolvido entre as consultas.
+    function getNFTsAlugaveisPaginado(uint256 cursor, uint256 limite)
+        public view returns (Item[] memory, uint256) {
+        return _paginaConjunto(_itensAlugaveis, cursor, limite);
+    }
+
+    function getNFTsPorVendedorPaginado(uint256 cursor, uint256 limite)
+        public view returns (Item[] memory, uint256) {
+        return _paginaConjunto(_itensPorVendedor[msg.sender], cursor, limite);
+    }
+
+    function getNFTsPorLocatarioPaginado(uint256 cursor, uint256 limite)
+        public view returns (Item[] memory, uint256) {
+        return _paginaConjunto(_itensPorLocatario[msg.sender], cursor, limite);
+    }
+
+    function getNFTsExpiradosEAlugadosPaginado(uint256 cursor, uint256 limite)
+        public view returns (Item[] memory, uint256) {
+        return _paginaExpirados(cursor, limite);
+    }
+
+    // Função que retorna uma página dos itens de um conjunto de IDs
+    function _paginaConjunto(EnumerableSet.UintSet storage conjunto, uint256 cursor, uint256 limite)
+        internal view returns (Item[] memory, uint256) {
+        uint256 qtdeItensTotal = conjunto.length();
+        if (cursor >= qtdeItensTotal) {
+            return (new Item[](0), 0);
         }
+        uint256 fim = cursor + limite > qtdeItensTotal ? qtdeItensTotal : cursor + limite;
 
-        Item[] memory listaItensExpirados = new Item[](countItensExpiradosEAlugados);
+        Item[] memory pagina = new Item[](fim - cursor);
+        for (uint256 i = cursor; i < fim; i++) {
+            uint256 itemId = conjunto.at(i);
+            pagina[i - cursor] = _paraItem(itemId, listaItens[itemId]);
+        }
+        return (pagina, fim < qtdeItensTotal ? fim : 0);
+    }
 
-        for (uint256 i = 1; i <= qtdeItensTotal; i++) {
-            if (listaItens[i].statusAlugado && listaItens[i].expiraEm <= block.timestamp) {
-                listaItensExpirados[indiceAtual] = listaItens[i];
+    // Função que analisa até "limite" itens alugados a partir do cursor
+    // e retorna os que já expiraram (a página pode vir vazia)
+    function _paginaExpirados(uint256 cursor, uint256 limite)
+        internal view returns (Item[] memory, uint256) {
+        uint256 qtdeItensTotal = _itensAlugados.length();
+        if (cursor >= qtdeItensTotal) {
+            return (new Item[](0), 0);
+        }
+        uint256 fim = cursor + limite > qtdeItensTotal ? qtdeItensTotal : cursor + limite;
+
+        Item[] memory pagina = new Item[](fim - cursor);
+        uint256 indiceAtual = 0;
+        uint256 i = cursor;
+
+        for (; i < fim; i++) {
+            uint256 itemId = _itensAlugados.at(i);
+            ItemArmazenado storage item = listaItens[itemId];
+            if (item.expiraEm <= block.timestamp) {
+                pagina[indiceAtual] = _paraItem(itemId, item);
                 indiceAtual += 1;
             }
         }
-        return listaItensExpirados;
+
+        // Reduz o tamanho da lista para a quantidade de itens encontrados
+        assembly {
+            mstore(pagina, indiceAtual)
+        }
+        return (pagina, i < qtdeItensTotal ? i : 0);
     }
 
+    // Função que converte um item guardado para o formato retornado pelas consultas
+    function _paraItem(uint256 itemId, ItemArmazenado storage item) internal view returns (Item memory) {
+        return Item(
+            itemId,
+            item.statusAlugado,
+            item.contratoNFT,
+            item.tokenId,
+            item.vendedor,
+            item.locatario,
+            item.preco,
+            item.expiraEm
+        );
+    }
 
     // Modificador utilizado para especificar quais funções apenas o dono do marketplace pode chamar
     modifier apenasDono() {
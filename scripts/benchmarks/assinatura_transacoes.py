@@ -0,0 +1,74 @@
+'''
+    Mede quantas transações criarNovoToken por segundo são montadas e assinadas
+    localmente pelo ConstrutorTransacao, que deriva a chave pública uma única
+    vez, comparando com Account.sign_transaction, que a deriva (multiplicação
+    na curva elíptica) e recalcula o endereço a cada transação: com a chave em
+    bytes e também montando a transação pelo web3 com a chave em hexadecimal.
+    Não precisa de uma rede: nenhuma requisição é feita. A velocidade da
+    assinatura ECDSA depende do backend do eth-keys (instale o coincurve para
+    o backend em C), assim como a diferença entre os três casos.
+
+    Uso: python scripts/benchmarks/assinatura_transacoes.py <quantidade de transações>
+'''
+import os, sys, time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from eth_account import Account
+from web3 import Web3
+from dapp.ConstrutorTransacao import ConstrutorTransacao
+
+ABI_NFT = [{
+    "inputs": [{"internalType": "string", "name": "tokenURI", "type": "string"}],
+    "name": "criarNovoToken",
+    "outputs": [],
+    "stateMutability": "nonpayable",
+    "type": "function"
+}]
+CONTRATO = "0x5FbDB2315678afecb367f032d93F642f64180aa3"
+CID = "QmTSxfQwwnKrSQ5VQeWjvu35rYbVNPdFLgHif6oEq5CSns"
+
+def main():
+    quantidade = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    web3 = Web3()
+    contrato = web3.eth.contract(address=CONTRATO, abi=ABI_NFT)
+    conta = Account.create()
+    parametros = {'gasPrice': Web3.to_wei('50', 'gwei'), 'gas': 200000}
+
+    # Assinatura local com conta, seletor e template de gás guardados
+    construtor = ConstrutorTransacao(web3, conta.key.hex(), chain_id=1337, gas_templates={'criarNovoToken': 200000})
+    inicio = time.perf_counter()
+    for nonce in range(quantidade):
+        construtor.assina(construtor.constroi(contrato.functions.criarNovoToken(CID), parametros, nonce))
+    tempo_construtor = time.perf_counter() - inicio
+
+    # Mesma transação montada, mas assinada derivando a conta da chave a cada assinatura
+    inicio = time.perf_counter()
+    for nonce in range(quantidade):
+        Account.sign_transaction(construtor.constroi(contrato.functions.criarNovoToken(CID), parametros, nonce),
+                                 conta.key)
+    tempo_derivando = time.perf_counter() - inicio
+
+    # Assinatura derivando a conta da chave em hexadecimal a cada transação
+    inicio = time.perf_counter()
+    for nonce in range(quantidade):
+        tx = {
+            'to': CONTRATO,
+            'data': contrato.encodeABI(fn_name="criarNovoToken", args=[CID]),
+            'value': 0,
+            'nonce': nonce,
+            'chainId': 1337,
+            **parametros
+        }
+        web3.eth.account.sign_transaction(tx, conta.key.hex())
+    tempo_chave = time.perf_counter() - inicio
+
+    print("=======================================================")
+    print("Transações assinadas: {}".format(quantidade))
+    print("ConstrutorTransacao (chave derivada uma vez): {:.0f} tx/s".format(quantidade / tempo_construtor))
+    print("Derivando a chave a cada assinatura: {:.0f} tx/s ({:.2f}x mais lento)".format(
+        quantidade / tempo_derivando, tempo_derivando / tempo_construtor))
+    print("web3 com a chave em hexadecimal: {:.0f} tx/s ({:.2f}x mais lento)".format(
+        quantidade / tempo_chave, tempo_chave / tempo_construtor))
+    print("=======================================================")
+
+if __name__ == "__main__":
+    main()
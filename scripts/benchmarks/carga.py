@@ -0,0 +1,450 @@
+'''
+    Gera carga sobre os contratos NFT e Marketplace em uma rede local e mede
+    vazão, latência (p50/p99), gás e requisições JSON-RPC por operação.
+
+    A rede pode ser uma eth-tester/py-evm executada no próprio processo
+    (padrão, requer `pip install "eth-tester[py-evm]"`) ou um nó local já em
+    execução (anvil, hardhat, ganache) informado por --url, com as chaves das
+    contas na variável PRIVATE_KEYS (separadas por vírgula). Os contratos são
+    compilados com py-solc-x (--openzeppelin aponta para uma cópia local da
+    release-v4.9 do OpenZeppelin) ou lidos de um JSON exportado do Remix
+    (--artefatos, no formato {"NFT": {"abi": [...], "bytecode": "0x..."},
+    "Marketplace": {...}}).
+
+    Para cada tamanho de catálogo (--itens 100,1000), o marketplace é
+    populado até o tamanho e a mistura de operações (--mistura) é executada
+    por --threads threads. O resultado é um JSON que pode ser comparado entre
+    versões do código.
+
+    Uso: python scripts/benchmarks/carga.py --artefatos artefatos.json --itens 100,1000
+         --mistura criar=1,alugar=2,finalizar=1,listar=4 --threads 8 --operacoes 400 --saida carga.json
+'''
+import os, sys, json, math, time, random, argparse, tempfile, threading, subprocess
+from collections.abc import Mapping
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from eth_account import Account
+from web3 import Web3
+from dapp.Connection import Connection
+from dapp.NFTAlugavel import NFTAlugavel
+from dapp.MarketplaceAluguel import MarketplaceAluguel
+from dapp.RastreadorRecibos import normalizaHash
+from utils.lote import criaItensEmLote
+
+CAMINHO_CONTRATOS = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                                 "contracts")
+PREFIXO_OPENZEPPELIN = "https://github.com/OpenZeppelin/openzeppelin-contracts/blob/release-v4.9/"
+CID = "QmTSxfQwwnKrSQ5VQeWjvu35rYbVNPdFLgHif6oEq5CSns"
+PRECO_ETHER = 0.01
+TEMPO_ALUGUEL = 3600
+OPERACOES = ("criar", "alugar", "finalizar", "listar", "listar_paginado")
+
+# Rótulo da operação executada por cada thread e contador de requisições da
+# medição em andamento, usados para atribuir as requisições
+contexto = threading.local()
+
+class ContadorRequisicoes:
+    '''
+        Conta as requisições JSON-RPC por rótulo de operação e por método.
+        Requisições feitas fora de uma operação ficam no rótulo "fundo".
+
+        As consultas de recibo feitas pelo rastreador de recibos são
+        atribuídas à operação que enviou a transação, identificada pelo hash
+        retornado por eth_sendRawTransaction. As consultas de bloco do
+        rastreador são compartilhadas entre todas as transações pendentes e
+        permanecem em "fundo".
+    '''
+
+    def __init__(self):
+        self.contagem = {}
+        self.donos = {}
+        self.trava = threading.Lock()
+
+    def registra(self, metodo : str, quantidade : int = 1, dono = None):
+        rotulo = getattr(contexto, "rotulo", "fundo")
+        requisicoes = getattr(contexto, "requisicoes", None)
+        if rotulo == "fundo" and dono is not None:
+            rotulo, requisicoes = dono
+        with self.trava:
+            metodos = self.contagem.setdefault(rotulo, {})
+            metodos[metodo] = metodos.get(metodo, 0) + quantidade
+            if requisicoes is not None:
+                requisicoes[0] += quantidade
+
+    def middleware(self, make_request, w3):
+        def conta(method, params):
+            dono = None
+            if method == "eth_getTransactionReceipt":
+                with self.trava:
+                    dono = self.donos.get(normalizaHash(params[0]))
+            self.registra(method, dono=dono)
+            resposta = make_request(method, params)
+            requisicoes = getattr(contexto, "requisicoes", None)
+            if method == "eth_sendRawTransaction" and requisicoes is not None and "result" in resposta:
+                with self.trava:
+                    self.donos[normalizaHash(resposta["result"])] = (contexto.rotulo, requisicoes)
+            return resposta
+        return conta
+
+    def libera(self, pendentes : list):
+        # As transações já resolvidas não precisam mais ser atribuídas
+        with self.trava:
+            for pendente in pendentes:
+                self.donos.pop(pendente.tx_hash, None)
+
+    def total(self, rotulo : str):
+        with self.trava:
+            return sum(self.contagem.get(rotulo, {}).values())
+
+class ServidorEthTester(BaseHTTPRequestHandler):
+    '''
+        Expõe uma eth-tester do próprio processo por HTTP, para que a pilha
+        completa (sessão HTTP, lotes JSON-RPC, rastreador de recibos) seja medida.
+    '''
+    requisita = None
+    trava = threading.Lock()
+
+    def do_POST(self):
+        corpo = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with self.trava:
+            if isinstance(corpo, list):
+                resposta = [self._responde(requisicao) for requisicao in corpo]
+            else:
+                resposta = self._responde(corpo)
+        dados = json.dumps(resposta, default=self._paraJson).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(dados)))
+        self.end_headers()
+        self.wfile.write(dados)
+
+    @staticmethod
+    def _paraJson(valor):
+        # Recibos e blocos chegam como AttributeDict, e hashes como HexBytes
+        if isinstance(valor, Mapping):
+            return dict(valor)
+        return Web3.to_hex(valor)
+
+    def _responde(self, requisicao : dict):
+        try:
+            resposta = dict(self.requisita(requisicao["method"], requisicao.get("params", [])))
+        except Exception as e:
+            resposta = {"error": {"code": -32000, "message": str(e)}}
+        resposta.update({"jsonrpc": "2.0", "id": requisicao.get("id")})
+        return resposta
+
+    def log_message(self, *args):
+        pass
+
+def iniciaEthTester():
+    '''
+        Inicia uma eth-tester/py-evm e o servidor HTTP local que a expõe.
+
+        Retorno
+        -------
+            - rede (tuple): URL do servidor e chaves privadas das contas financiadas.
+    '''
+    from eth_tester import EthereumTester, PyEVMBackend
+    backend = PyEVMBackend()
+    provider = Web3.EthereumTesterProvider(EthereumTester(backend))
+    web3 = Web3(provider)
+    web3.middleware_onion.clear()
+    # Apenas os middlewares do provedor, que convertem os resultados para o formato JSON-RPC
+    ServidorEthTester.requisita = staticmethod(provider.request_func(web3, web3.middleware_onion))
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), ServidorEthTester)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    chaves = [Web3.to_hex(chave.to_bytes()) for chave in backend.account_keys]
+    return "http://127.0.0.1:{}".format(servidor.server_address[1]), chaves
+
+def compilaContratos(caminho_openzeppelin : str, fonte_marketplace : str = None):
+    '''
+        Compila NFT.sol e Marketplace.sol com py-solc-x, trocando os imports do
+        GitHub por uma cópia local do OpenZeppelin. O código do Marketplace
+        pode ser informado em fonte_marketplace (por exemplo, de outra versão).
+    '''
+    import solcx
+    fontes = {nome: {"urls": [os.path.join(CAMINHO_CONTRATOS, nome)]} for nome in ("NFT.sol", "Marketplace.sol")}
+    if fonte_marketplace is not None:
+        fontes["Marketplace.sol"] = {"content": fonte_marketplace}
+    saida = solcx.compile_standard({
+        "language": "Solidity",
+        "sources": fontes,
+        "settings": {
+            "remappings": ["{}={}/".format(PREFIXO_OPENZEPPELIN, os.path.abspath(caminho_openzeppelin))],
+            "optimizer": {"enabled": True, "runs": 200},
+            "outputSelection": {"*": {"*": ["abi", "evm.bytecode.object"]}}
+        }
+    }, allow_paths=[CAMINHO_CONTRATOS, os.path.abspath(caminho_openzeppelin)])
+    artefatos = {}
+    for arquivo, nome in (("NFT.sol", "NFT"), ("Marketplace.sol", "Marketplace")):
+        contrato = saida["contracts"][arquivo][nome]
+        artefatos[nome] = {"abi": contrato["abi"], "bytecode": "0x" + contrato["evm"]["bytecode"]["object"]}
+    return artefatos
+
+def implanta(web3 : Web3, chave : str, artefato : dict, *argumentos):
+    '''
+        Implanta um contrato e retorna o seu endereço.
+    '''
+    conta = Account.from_key(chave)
+    contrato = web3.eth.contract(abi=artefato["abi"], bytecode=artefato["bytecode"])
+    tx = contrato.constructor(*argumentos).build_transaction({
+        "from": conta.address,
+        "nonce": web3.eth.get_transaction_count(conta.address, "pending"),
+        "gasPrice": web3.eth.gas_price
+    })
+    tx_hash = web3.eth.send_raw_transaction(conta.sign_transaction(tx).rawTransaction)
+    return web3.eth.wait_for_transaction_receipt(tx_hash)["contractAddress"]
+
+def percentil(valores : list, fracao : float):
+    # Percentil pelo método do posto mais próximo
+    if not valores:
+        return None
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados), max(1, math.ceil(fracao * len(ordenados)))) - 1]
+
+class Carga:
+    '''
+        Executa a mistura de operações e guarda as medições de cada uma.
+    '''
+
+    def __init__(self, url : str, chaves : list, artefatos : dict, enderecos : dict, contador : ContadorRequisicoes):
+        self.contador = contador
+        conn_nft = Connection(url, enderecos["NFT"], artefatos["NFT"]["abi"])
+        conn_marketplace = Connection(url, enderecos["Marketplace"], artefatos["Marketplace"]["abi"])
+        if not (conn_nft.executeConnection() and conn_marketplace.executeConnection()):
+            raise RuntimeError("Não foi possível conectar aos contratos!")
+        self.web3 = conn_nft.getWeb3Connection()
+        self.web3.middleware_onion.add(contador.middleware, name="contador_carga")
+        contas = [Account.from_key(chave) for chave in chaves]
+        # A primeira conta é o vendedor; as demais são locatárias
+        self.vendedor = (
+            NFTAlugavel(contas[0].address, chaves[0], conn_nft),
+            MarketplaceAluguel(contas[0].address, chaves[0], conn_marketplace, enderecos["NFT"])
+        )
+        self.locatarios = [MarketplaceAluguel(conta.address, chave, conn_marketplace, enderecos["NFT"])
+                           for conta, chave in zip(contas[1:], chaves[1:])]
+        self.taxa = self.vendedor[1].getTaxaMarketplace()
+        self.disponiveis = []
+        self.alugados = {indice: [] for indice in range(len(self.locatarios))}
+        self.trava = threading.Lock()
+        self.medicoes = {}
+
+    def semeia(self, quantidade : int, concorrencia : int):
+        '''
+            Cria itens até que o marketplace tenha a quantidade informada disponível.
+        '''
+        faltam = quantidade - len(self.disponiveis)
+        if faltam <= 0:
+            return {"criados": 0, "tempo": 0.0}
+        contexto.rotulo = "semeadura"
+        with tempfile.TemporaryDirectory() as pasta:
+            caminho_cids = os.path.join(pasta, "cids.txt")
+            caminho_manifesto = os.path.join(pasta, "manifesto.csv")
+            with open(caminho_cids, "w", encoding="utf-8") as arquivo:
+                for indice in range(faltam):
+                    arquivo.write("{}-{}-{}\n".format(CID, quantidade, indice))
+            resumo = criaItensEmLote(self.vendedor[0], self.vendedor[1], caminho_cids, caminho_manifesto,
+                                     PRECO_ETHER, TEMPO_ALUGUEL, concorrencia)
+            with open(caminho_manifesto, "r", encoding="utf-8") as arquivo:
+                for linha in list(arquivo)[1:]:
+                    item_id = linha.strip().split(",")[2]
+                    if item_id:
+                        self.disponiveis.append(int(item_id))
+        contexto.rotulo = "fundo"
+        return resumo
+
+    def _gas(self, pendentes : list):
+        # Consulta os recibos fora da medição de requisições da operação
+        contexto.rotulo = "medicao"
+        return sum(self.web3.eth.get_transaction_receipt(pendente.tx_hash)["gasUsed"] for pendente in pendentes)
+
+    def _executa(self, operacao : str, locatario : int):
+        # Retorna a lista de transações da operação, [] para leituras ou None caso não haja item
+        if operacao == "criar":
+            nft, marketplace = self.vendedor
+            pendente_token = nft.criarNovoToken(CID, aguardar=False)
+            pendente_item = marketplace.criaItemAlugavel(pendente_token.result(), PRECO_ETHER, TEMPO_ALUGUEL,
+                                                         self.taxa, aguardar=False)
+            with self.trava:
+                self.disponiveis.append(pendente_item.result().itemId)
+            return [pendente_token, pendente_item]
+        if operacao == "alugar":
+            with self.trava:
+                if not self.disponiveis:
+                    return None
+                item_id = self.disponiveis.pop(random.randrange(len(self.disponiveis)))
+            pendente = self.locatarios[locatario].alugarItem(item_id, PRECO_ETHER, aguardar=False)
+            pendente.result()
+            with self.trava:
+                self.alugados[locatario].append(item_id)
+            return [pendente]
+        if operacao == "finalizar":
+            with self.trava:
+                if not self.alugados[locatario]:
+                    return None
+                item_id = self.alugados[locatario].pop()
+            pendente = self.locatarios[locatario].finalizaAluguel(item_id, aguardar=False)
+            pendente.result()
+            return [pendente]
+        if operacao == "listar":
+            if self.locatarios[locatario].getNFTsAlugaveis() is None:
+                raise RuntimeError("Falha em getNFTsAlugaveis")
+            return []
+        if operacao == "listar_paginado":
+            list(self.locatarios[locatario].iteraNFTsAlugaveis(100))
+            return []
+        raise ValueError("Operação desconhecida: {}".format(operacao))
+
+    def _mede(self, operacao : str, locatario : int):
+        contexto.rotulo = operacao
+        # Contador próprio da medição, para não misturar as requisições de outras threads
+        contexto.requisicoes = requisicoes = [0]
+        inicio = time.perf_counter()
+        try:
+            pendentes = self._executa(operacao, locatario)
+        except Exception as e:
+            contexto.requisicoes = None
+            with self.trava:
+                medicao = self.medicoes.setdefault(operacao, {"medidas": [], "erros": 0, "sem_item": 0, "falhas": {}})
+                medicao["erros"] += 1
+                # Mensagens agrupadas, para que o JSON mostre a causa de cada erro sem repeti-la
+                mensagem = "{}: {}".format(type(e).__name__, e)
+                medicao["falhas"][mensagem] = medicao["falhas"].get(mensagem, 0) + 1
+            return
+        latencia = time.perf_counter() - inicio
+        contexto.requisicoes = None
+        requisicoes = requisicoes[0]
+        gas = 0
+        if pendentes:
+            gas = self._gas(pendentes)
+            self.contador.libera(pendentes)
+        with self.trava:
+            medicao = self.medicoes.setdefault(operacao, {"medidas": [], "erros": 0, "sem_item": 0, "falhas": {}})
+            if pendentes is None:
+                medicao["sem_item"] += 1
+            else:
+                medicao["medidas"].append((latencia, gas, requisicoes))
+
+    def executa(self, mistura : dict, threads : int, operacoes : int, semente : int):
+        '''
+            Executa a mistura de operações e retorna o resumo das medições.
+        '''
+        self.medicoes = {}
+        nomes = list(mistura)
+        pesos = [mistura[nome] for nome in nomes]
+        restantes = [operacoes]
+        trava_restantes = threading.Lock()
+
+        def trabalhador(indice : int):
+            sorteio = random.Random(semente + indice)
+            locatario = indice % len(self.locatarios)
+            while True:
+                with trava_restantes:
+                    if restantes[0] <= 0:
+                        return
+                    restantes[0] -= 1
+                self._mede(sorteio.choices(nomes, pesos)[0], locatario)
+
+        fundo_antes = self.contador.total("fundo")
+        inicio = time.perf_counter()
+        trabalhadores = [threading.Thread(target=trabalhador, args=(indice,)) for indice in range(threads)]
+        for thread in trabalhadores:
+            thread.start()
+        for thread in trabalhadores:
+            thread.join()
+        duracao = time.perf_counter() - inicio
+
+        resumo = {"duracao_s": duracao, "requisicoes_fundo": self.contador.total("fundo") - fundo_antes,
+                  "operacoes": {}}
+        for operacao, medicao in sorted(self.medicoes.items()):
+            latencias = [medida[0] for medida in medicao["medidas"]]
+            quantidade = len(latencias)
+            resumo["operacoes"][operacao] = {
+                "quantidade": quantidade,
+                "erros": medicao["erros"],
+                "falhas": medicao["falhas"],
+                "sem_item": medicao["sem_item"],
+                "vazao_ops_s": quantidade / duracao if duracao else 0.0,
+                "latencia_p50_ms": percentil(latencias, 0.50) * 1000 if quantidade else None,
+                "latencia_p99_ms": percentil(latencias, 0.99) * 1000 if quantidade else None,
+                "gas_medio": sum(medida[1] for medida in medicao["medidas"]) / quantidade if quantidade else None,
+                "rpc_por_operacao": sum(medida[2] for medida in medicao["medidas"]) / quantidade if quantidade else None
+            }
+        return resumo
+
+def versaoCodigo():
+    # Commit atual, para identificar a versão medida
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=CAMINHO_CONTRATOS,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return None
+
+def leMistura(texto : str):
+    mistura = {}
+    for parte in texto.split(","):
+        nome, peso = parte.split("=")
+        if nome not in OPERACOES:
+            raise ValueError("Operação desconhecida: {} (opções: {})".format(nome, ", ".join(OPERACOES)))
+        mistura[nome] = float(peso)
+    return mistura
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera carga sobre os contratos em uma rede local.")
+    parser.add_argument("--url", help="URL de um nó local já em execução (padrão: eth-tester no processo)")
+    parser.add_argument("--artefatos", help="JSON com abi e bytecode de NFT e Marketplace")
+    parser.add_argument("--openzeppelin", help="Cópia local do OpenZeppelin release-v4.9, para compilar com solcx")
+    parser.add_argument("--itens", default="100", help="Tamanhos de catálogo separados por vírgula")
+    parser.add_argument("--mistura", default="criar=1,alugar=2,finalizar=1,listar=4")
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--operacoes", type=int, default=200, help="Operações por tamanho de catálogo")
+    parser.add_argument("--concorrencia", type=int, default=50, help="Transações pendentes na semeadura")
+    parser.add_argument("--semente", type=int, default=0)
+    parser.add_argument("--saida", help="Arquivo JSON de saída (padrão: apenas a saída padrão)")
+    argumentos = parser.parse_args()
+
+    if argumentos.artefatos:
+        with open(argumentos.artefatos, "r", encoding="utf-8") as arquivo:
+            artefatos = json.load(arquivo)
+    elif argumentos.openzeppelin:
+        artefatos = compilaContratos(argumentos.openzeppelin)
+    else:
+        parser.error("Informe --artefatos ou --openzeppelin")
+
+    if argumentos.url:
+        url, chaves = argumentos.url, [chave for chave in os.environ.get("PRIVATE_KEYS", "").split(",") if chave]
+    else:
+        url, chaves = iniciaEthTester()
+    if len(chaves) < 2:
+        raise RuntimeError("São necessárias ao menos duas contas (vendedor e locatário)!")
+
+    web3 = Web3(Web3.HTTPProvider(url))
+    enderecos = {"Marketplace": implanta(web3, chaves[0], artefatos["Marketplace"])}
+    enderecos["NFT"] = implanta(web3, chaves[0], artefatos["NFT"], enderecos["Marketplace"])
+
+    contador = ContadorRequisicoes()
+    carga = Carga(url, chaves, artefatos, enderecos, contador)
+    mistura = leMistura(argumentos.mistura)
+    resultado = {
+        "versao": versaoCodigo(),
+        "rede": "eth-tester" if not argumentos.url else argumentos.url,
+        "configuracao": {"mistura": mistura, "threads": argumentos.threads,
+                         "operacoes": argumentos.operacoes, "semente": argumentos.semente},
+        "execucoes": []
+    }
+    for tamanho in [int(valor) for valor in argumentos.itens.split(",")]:
+        inicio = time.perf_counter()
+        semeadura = carga.semeia(tamanho, argumentos.concorrencia)
+        execucao = {"itens": tamanho, "semeadura_s": time.perf_counter() - inicio,
+                    "itens_criados": semeadura.get("criados", 0)}
+        execucao.update(carga.executa(mistura, argumentos.threads, argumentos.operacoes, argumentos.semente))
+        resultado["execucoes"].append(execucao)
+
+    texto = json.dumps(resultado, indent=2, sort_keys=True)
+    if argumentos.saida:
+        with open(argumentos.saida, "w", encoding="utf-8") as arquivo:
+            arquivo.write(texto + "\n")
+    print(texto)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+'''
+    Compara a decodificação de uma resposta Item[] com N itens feita pelo
+    decodificador do web3 (o mesmo caminho de ContractFunction.call) e pela
+    decodificação rápida (decodificaItens e ColunasItens.deABI). Não requer
+    uma rede: a resposta é gerada localmente.
+
+    Uso: python scripts/benchmarks/decodificacao_itens.py <quantidade de itens> <repetições>
+'''
+import os, sys, time, random
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from web3 import Web3
+from web3._utils.abi import map_abi_data
+from web3._utils.normalizers import BASE_RETURN_NORMALIZERS
+from dapp.Item import Item, ColunasItens, decodificaItens
+
+TIPO_ITENS = "(uint256,bool,address,uint256,address,address,uint256,uint256)[]"
+ENDERECO_NULO = "0x0000000000000000000000000000000000000000"
+
+def geraResposta(web3 : Web3, quantidade : int):
+    '''
+        Codifica uma resposta Item[] com itens aleatórios de poucos vendedores e locatários.
+    '''
+    enderecos = [Web3.to_checksum_address("0x{:040x}".format(random.getrandbits(160))) for _ in range(100)]
+    contrato = enderecos[0]
+    itens = []
+    for item_id in range(1, quantidade + 1):
+        alugado = random.random() < 0.5
+        itens.append((
+            item_id, alugado, contrato, item_id, random.choice(enderecos),
+            random.choice(enderecos) if alugado else ENDERECO_NULO,
+            random.randint(10 ** 15, 10 ** 20), random.randint(60, 10 ** 9)
+        ))
+    return web3.codec.encode([TIPO_ITENS], [itens])
+
+def decodificaWeb3(web3 : Web3, dados : bytes):
+    '''
+        Decodifica a resposta como em ContractFunction.call e converte para Item.
+    '''
+    saida = map_abi_data(BASE_RETURN_NORMALIZERS, [TIPO_ITENS], web3.codec.decode([TIPO_ITENS], dados))
+    return [Item._make(item) for item in saida[0]]
+
+def mede(funcao, repeticoes : int):
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor, resultado
+
+def main():
+    quantidade = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    repeticoes = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    web3 = Web3()
+    dados = geraResposta(web3, quantidade)
+
+    tempo_web3, itens_web3 = mede(lambda: decodificaWeb3(web3, dados), repeticoes)
+    tempo_rapido, itens_rapidos = mede(lambda: decodificaItens(dados), repeticoes)
+    tempo_colunas, colunas = mede(lambda: ColunasItens.deABI(dados), repeticoes)
+    if itens_rapidos != itens_web3 or colunas.itens() != itens_web3:
+        print("A decodificação rápida divergiu do web3!")
+        return
+
+    print("=======================================================")
+    print("Itens: {} ({} bytes)".format(quantidade, len(dados)))
+    print("Decodificador do web3: {:.3f} s".format(tempo_web3))
+    print("decodificaItens: {:.3f} s ({:.1f}x)".format(tempo_rapido, tempo_web3 / tempo_rapido))
+    print("ColunasItens.deABI: {:.3f} s ({:.1f}x)".format(tempo_colunas, tempo_web3 / tempo_colunas))
+    print("=======================================================")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+'''
+    Relatório de gás por função do Marketplace, comparando o contrato atual
+    com uma versão de referência, ambos implantados do zero e submetidos à
+    mesma sequência de transações. Sem --url, cada versão roda em uma rede
+    eth-tester nova; com --url, as duas são implantadas no mesmo nó, em
+    contratos novos (os IDs dos tokens e dos itens recomeçam em cada um).
+
+    A versão de referência é lida do histórico do git (--referencia, por
+    padrão o contrato original, do primeiro commit que contém o
+    Marketplace.sol) e compilada junto com a atual por py-solc-x
+    (--openzeppelin, como em carga.py).
+    As funções que não existem na ABI de uma versão (ex.: consultas
+    paginadas e operações em lote no contrato original) não são medidas
+    nela: os itens do lote são alugados e finalizados um a um, e a coluna
+    da função aparece como "-" no relatório. Também é possível informar os dois JSONs exportados do Remix
+    (--artefatos-referencia e --artefatos). As transações são medidas pelo
+    gasUsed dos recibos e as consultas pelo eth_estimateGas das chamadas.
+
+    Uso: python scripts/benchmarks/gas_marketplace.py --openzeppelin ../openzeppelin-contracts
+         --itens 20 --lote 5 --saida gas.json
+'''
+import os, json, argparse, subprocess
+from eth_account import Account
+from web3 import Web3
+from carga import CAMINHO_CONTRATOS, CID, PRECO_ETHER, TEMPO_ALUGUEL, iniciaEthTester, compilaContratos, versaoCodigo
+
+def referenciaPadrao():
+    # Primeiro commit com o Marketplace.sol, anterior a todas as mudanças no contrato
+    saida = subprocess.check_output(["git", "log", "--reverse", "--format=%H", "--", "Marketplace.sol"],
+                                    cwd=CAMINHO_CONTRATOS, text=True).split()
+    return saida[0] if saida else "HEAD"
+
+def fonteReferencia(revisao : str):
+    return subprocess.check_output(["git", "show", "{}:contracts/Marketplace.sol".format(revisao)],
+                                   cwd=CAMINHO_CONTRATOS, text=True)
+
+def envia(web3 : Web3, chave : str, transacao, valor : int = 0):
+    '''
+        Assina e envia uma transação, aguardando o seu recibo.
+
+        Retorno
+        -------
+            - recibo (AttributeDict): Recibo da transação, que deve ter sido bem-sucedida.
+    '''
+    conta = Account.from_key(chave)
+    tx = transacao.build_transaction({
+        "from": conta.address,
+        "value": valor,
+        "nonce": web3.eth.get_transaction_count(conta.address, "pending"),
+        "gasPrice": web3.eth.gas_price
+    })
+    recibo = web3.eth.wait_for_transaction_receipt(
+        web3.eth.send_raw_transaction(conta.sign_transaction(tx).rawTransaction))
+    if recibo["status"] != 1:
+        raise RuntimeError("Transação revertida: {}".format(Web3.to_hex(recibo["transactionHash"])))
+    return recibo
+
+def mede(url : str, chaves : list, artefatos : dict, itens : int, lote : int):
+    '''
+        Implanta os contratos em uma rede e executa o cenário de medição:
+        criação de todos os itens, aluguel individual e em lote, consultas e
+        finalização individual e em lote.
+
+        Retorno
+        -------
+            - medidas (dict): Gás de cada execução, por função.
+    '''
+    web3 = Web3(Web3.HTTPProvider(url))
+    vendedor, locatario = chaves[0], chaves[1]
+    endereco_vendedor = Account.from_key(vendedor).address
+    endereco_locatario = Account.from_key(locatario).address
+    medidas = {}
+    funcoes = {entrada["name"] for entrada in artefatos["Marketplace"]["abi"] if entrada.get("type") == "function"}
+
+    def registra(nome : str, gas : int):
+        medidas.setdefault(nome, []).append(gas)
+
+    def consulta(nome : str, chamada, origem : str):
+        registra(nome, chamada.estimate_gas({"from": origem}))
+
+    fabrica = web3.eth.contract(abi=artefatos["Marketplace"]["abi"], bytecode=artefatos["Marketplace"]["bytecode"])
+    recibo = envia(web3, vendedor, fabrica.constructor())
+    registra("implantacao", recibo["gasUsed"])
+    marketplace = web3.eth.contract(address=recibo["contractAddress"], abi=artefatos["Marketplace"]["abi"])
+    fabrica = web3.eth.contract(abi=artefatos["NFT"]["abi"], bytecode=artefatos["NFT"]["bytecode"])
+    recibo = envia(web3, vendedor, fabrica.constructor(marketplace.address))
+    nft = web3.eth.contract(address=recibo["contractAddress"], abi=artefatos["NFT"]["abi"])
+
+    taxa = marketplace.functions.getTaxaMarketplace().call()
+    preco = Web3.to_wei(PRECO_ETHER, "ether")
+    # Em contratos recém-implantados os IDs dos tokens e dos itens são sequenciais a partir de 1
+    ids = list(range(1, itens + 1))
+    individuais, em_lote = ids[:itens - lote], ids[itens - lote:]
+    if "alugarItens" not in funcoes or "finalizaAlugueis" not in funcoes:
+        # Versão sem operações em lote: todos os itens são tratados um a um
+        individuais, em_lote = ids, []
+    for _ in ids:
+        envia(web3, vendedor, nft.functions.criarNovoToken(CID))
+    for token_id in ids:
+        recibo = envia(web3, vendedor, marketplace.functions.criaItemAlugavel(nft.address, token_id, preco,
+                                                                              TEMPO_ALUGUEL), taxa)
+        registra("criaItemAlugavel", recibo["gasUsed"])
+
+    consulta("getNFTsAlugaveis", marketplace.functions.getNFTsAlugaveis(), endereco_locatario)
+    if "getNFTsAlugaveisPaginado" in funcoes:
+        consulta("getNFTsAlugaveisPaginado", marketplace.functions.getNFTsAlugaveisPaginado(0, itens),
+                 endereco_locatario)
+    consulta("getNFTsPorVendedor", marketplace.functions.getNFTsPorVendedor(), endereco_vendedor)
+
+    for item_id in individuais:
+        recibo = envia(web3, locatario, marketplace.functions.alugarItem(nft.address, item_id), preco)
+        registra("alugarItem", recibo["gasUsed"])
+    if em_lote:
+        recibo = envia(web3, locatario, marketplace.functions.alugarItens(nft.address, em_lote), preco * len(em_lote))
+        registra("alugarItens", recibo["gasUsed"])
+
+    consulta("getNFTsPorLocatario", marketplace.functions.getNFTsPorLocatario(), endereco_locatario)
+    consulta("getNFTsExpiradosEAlugados", marketplace.functions.getNFTsExpiradosEAlugados(), endereco_locatario)
+
+    for item_id in individuais:
+        recibo = envia(web3, locatario, marketplace.functions.finalizaAluguel(item_id))
+        registra("finalizaAluguel", recibo["gasUsed"])
+    if em_lote:
+        recibo = envia(web3, locatario, marketplace.functions.finalizaAlugueis(em_lote))
+        registra("finalizaAlugueis", recibo["gasUsed"])
+    return medidas
+
+def resume(valores : list):
+    return {"execucoes": len(valores), "media": sum(valores) / len(valores), "min": min(valores), "max": max(valores)}
+
+def compara(referencia : dict, atual : dict):
+    '''
+        Junta as medidas das duas versões, com a diferença percentual das médias.
+    '''
+    funcoes = {}
+    for nome in sorted(set(referencia) | set(atual)):
+        linha = {"referencia": resume(referencia[nome]) if nome in referencia else None,
+                 "atual": resume(atual[nome]) if nome in atual else None}
+        if linha["referencia"] and linha["atual"]:
+            linha["diferenca_pct"] = 100 * (linha["atual"]["media"] / linha["referencia"]["media"] - 1)
+        funcoes[nome] = linha
+    return funcoes
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara o gás por função de duas versões do Marketplace.")
+    parser.add_argument("--url", help="URL de um nó local já em execução (padrão: eth-tester no processo)")
+    parser.add_argument("--openzeppelin", help="Cópia local do OpenZeppelin release-v4.9, para compilar com solcx")
+    parser.add_argument("--referencia", help="Revisão do git com o Marketplace de referência")
+    parser.add_argument("--artefatos-referencia", help="JSON com abi e bytecode da versão de referência")
+    parser.add_argument("--artefatos", help="JSON com abi e bytecode da versão atual")
+    parser.add_argument("--itens", type=int, default=20, help="Itens criados em cada versão")
+    parser.add_argument("--lote", type=int, default=5, help="Itens alugados e finalizados em lote")
+    parser.add_argument("--saida", help="Arquivo JSON de saída (padrão: apenas a saída padrão)")
+    argumentos = parser.parse_args()
+    if not 0 <= argumentos.lote < argumentos.itens:
+        parser.error("--lote deve ser menor que --itens")
+
+    revisao = None
+    if argumentos.artefatos and argumentos.artefatos_referencia:
+        with open(argumentos.artefatos_referencia, "r", encoding="utf-8") as arquivo:
+            artefatos_referencia = json.load(arquivo)
+        with open(argumentos.artefatos, "r", encoding="utf-8") as arquivo:
+            artefatos = json.load(arquivo)
+    elif argumentos.openzeppelin:
+        revisao = argumentos.referencia or referenciaPadrao()
+        artefatos_referencia = compilaContratos(argumentos.openzeppelin, fonteReferencia(revisao))
+        artefatos = compilaContratos(argumentos.openzeppelin)
+    else:
+        parser.error("Informe --openzeppelin ou --artefatos-referencia e --artefatos")
+
+    medidas = {}
+    for versao, artefatos_versao in (("referencia", artefatos_referencia), ("atual", artefatos)):
+        # Cada versão em contratos novos, para que as duas partam do mesmo estado
+        # (no eth-tester, também em uma rede nova)
+        if argumentos.url:
+            url, chaves = argumentos.url, [chave for chave in os.environ.get("PRIVATE_KEYS", "").split(",") if chave]
+        else:
+            url, chaves = iniciaEthTester()
+        if len(chaves) < 2:
+            raise RuntimeError("São necessárias ao menos duas contas (vendedor e locatário)!")
+        medidas[versao] = mede(url, chaves, artefatos_versao, argumentos.itens, argumentos.lote)
+
+    resultado = {
+        "versao": versaoCodigo(),
+        "referencia": revisao,
+        "rede": "eth-tester" if not argumentos.url else argumentos.url,
+        "configuracao": {"itens": argumentos.itens, "lote": argumentos.lote},
+        "funcoes": compara(medidas["referencia"], medidas["atual"])
+    }
+    print("{:<28} {:>12} {:>12} {:>9}".format("função", "referência", "atual", "dif. %"))
+    for nome, linha in resultado["funcoes"].items():
+        colunas = ["{:.0f}".format(linha[versao]["media"]) if linha[versao] else "-" for versao in ("referencia", "atual")]
+        diferenca = "{:+.1f}".format(linha["diferenca_pct"]) if "diferenca_pct" in linha else "-"
+        print("{:<28} {:>12} {:>12} {:>9}".format(nome, colunas[0], colunas[1], diferenca))
+    texto = json.dumps(resultado, indent=2, sort_keys=True)
+    if argumentos.saida:
+        with open(argumentos.saida, "w", encoding="utf-8") as arquivo:
+            arquivo.write(texto + "\n")
+    print(texto)
+
+if __name__ == "__main__":
+    main()
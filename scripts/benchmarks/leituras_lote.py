@@ -0,0 +1,57 @@
+'''
+    Compara a leitura de N NFTs (tokenURI) feita com uma chamada por token
+    e com lotes JSON-RPC, em uma rede local (ex.: Ganache). As requisições
+    HTTP de cada forma são contadas na sessão compartilhada do PoolProvedores,
+    incluindo os lotes, que não passam pelos middlewares do web3.
+
+    Uso: python scripts/benchmarks/leituras_lote.py <arquivo.env> <quantidade de tokens>
+'''
+import os, sys, time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.run import init
+
+def contaRequisicoes(contador : dict):
+    '''
+        Cria um hook de resposta da sessão HTTP que conta as requisições enviadas ao nó.
+    '''
+    def conta(resposta, *args, **kwargs):
+        contador['requisicoes'] += 1
+    return conta
+
+def main():
+    env_name = sys.argv[1] if len(sys.argv) > 1 else "vendedor.env"
+    quantidade = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    nft, _ = init(env_name)
+    if nft is None:
+        return
+    token_ids = list(range(1, quantidade + 1))
+    contador = {'requisicoes': 0}
+    hook = contaRequisicoes(contador)
+    nft.pool.sessao.hooks['response'].append(hook)
+
+    inicio = time.perf_counter()
+    for token_id in token_ids:
+        try:
+            nft.contract.functions.tokenURI(token_id).call()
+        except Exception:
+            pass
+    tempo_individual = time.perf_counter() - inicio
+    requisicoes_individual = contador['requisicoes']
+
+    contador['requisicoes'] = 0
+    inicio = time.perf_counter()
+    uris = nft.getTokenURIs(token_ids)
+    tempo_lote = time.perf_counter() - inicio
+    requisicoes_lote = contador['requisicoes']
+    nft.pool.sessao.hooks['response'].remove(hook)
+
+    print("=======================================================")
+    print("Tokens consultados: {} ({} com URI)".format(quantidade, sum(1 for uri in (uris or {}).values() if uri)))
+    print("Uma chamada por token: {} requisições, {:.1f} ms".format(requisicoes_individual, tempo_individual * 1000))
+    print("Lote JSON-RPC: {} {}, {:.1f} ms".format(requisicoes_lote, "requisição" if requisicoes_lote == 1 else "requisições",
+                                                 tempo_lote * 1000))
+    print("Ganho: {:.1f}x".format(tempo_individual / tempo_lote if tempo_lote else float("inf")))
+    print("=======================================================")
+
+if __name__ == "__main__":
+    main()
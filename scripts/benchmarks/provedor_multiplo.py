@@ -0,0 +1,69 @@
+'''
+    Verifica o ProvedorMultiplo com dois nós locais simulados (servidores
+    HTTP que respondem eth_blockNumber, eth_chainId e eth_call): a conexão
+    com os dois nós, com apenas um e com nenhum, e a distribuição das
+    leituras entre eles. Não requer uma rede.
+
+    Uso: python scripts/benchmarks/provedor_multiplo.py <quantidade de leituras>
+'''
+import os, sys, json, time, threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from web3 import Web3
+from dapp.ProvedorMultiplo import ProvedorMultiplo
+
+class NoSimulado(BaseHTTPRequestHandler):
+    '''
+        Nó JSON-RPC mínimo; cada servidor conta as requisições recebidas.
+    '''
+    RESULTADOS = {"eth_blockNumber": "0x10", "eth_chainId": "0x539", "eth_call": "0x" + "00" * 31 + "2a"}
+
+    def do_POST(self):
+        corpo = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.requisicoes += 1
+        resposta = {"jsonrpc": "2.0", "id": corpo.get("id"), "result": self.RESULTADOS.get(corpo["method"], "0x0")}
+        dados = json.dumps(resposta).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(dados)))
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def log_message(self, *args):
+        pass
+
+def iniciaNo():
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), NoSimulado)
+    servidor.requisicoes = 0
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor, "http://127.0.0.1:{}".format(servidor.server_address[1])
+
+def verifica(descricao : str, obtido, esperado):
+    print("{:<45} {}".format(descricao, "ok" if obtido == esperado else "FALHOU ({})".format(obtido)))
+    return obtido == esperado
+
+def main():
+    quantidade = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    nos = [iniciaNo() for _ in range(2)]
+    provedor = ProvedorMultiplo([url for _, url in nos], tempo_limite=1.0, intervalo_saude=60.0)
+    web3 = Web3(provedor)
+    resultados = [verifica("is_connected com os dois nós", web3.is_connected(), True)]
+
+    inicio = time.perf_counter()
+    for _ in range(quantidade):
+        web3.eth.call({"to": "0x" + "11" * 20, "data": "0x"})
+    duracao = time.perf_counter() - inicio
+    print("{} leituras em {:.1f} ms, por nó: {}".format(
+        quantidade, duracao * 1000, [servidor.requisicoes for servidor, _ in nos]))
+
+    nos[0][0].shutdown()
+    nos[0][0].server_close()
+    resultados.append(verifica("is_connected sem o primeiro nó", web3.is_connected(), True))
+    nos[1][0].shutdown()
+    nos[1][0].server_close()
+    resultados.append(verifica("is_connected sem nenhum nó", web3.is_connected(), False))
+    provedor.para()
+    sys.exit(0 if all(resultados) else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+import sys, time
+from utils.run import init
+from dapp.IndiceMarketplace import IndiceMarketplace
+from dapp.ColetorAlugueisExpirados import ColetorAlugueisExpirados
+
+# Intervalo em segundos entre duas exibições das métricas
+INTERVALO_METRICAS = 30
+
+env_name = sys.argv[1] if len(sys.argv) > 1 else "vendedor.env"
+nft, marketplace = init(env_name)
+if nft != None and marketplace != None:
+    indice = marketplace.indice
+    if indice is None:
+        # Sem INDEX_DB, o índice é mantido em memória e reconstruído a cada execução
+        indice = IndiceMarketplace(marketplace.web3, marketplace.contract, contract_nft=nft.contract)
+    coletor = ColetorAlugueisExpirados(marketplace, indice)
+    coletor.inicia()
+    print("=======================================================")
+    print("Coletor de aluguéis expirados em execução. Pressione Ctrl+C para encerrar.")
+    print("=======================================================")
+    try:
+        while True:
+            time.sleep(INTERVALO_METRICAS)
+            metricas = coletor.metricas()
+            print("Aluguéis agendados: {}".format(metricas['agendados']))
+            print("Vencidos aguardando finalização: {}".format(metricas['backlog']))
+            print("Finalizações em andamento: {}".format(metricas['em_andamento']))
+            print("Atraso em relação ao vencimento: {:.1f} segundos".format(metricas['atraso_segundos']))
+            print("Finalizados: {} | Falhas: {} | Transações: {}".format(
+                metricas['finalizados'], metricas['falhas'], metricas['lotes_enviados']))
+            print("=======================================================")
+    except KeyboardInterrupt:
+        coletor.para()
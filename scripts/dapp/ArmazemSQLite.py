@@ -0,0 +1,250 @@
+import sqlite3, threading
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS itens (
+    itemId INTEGER PRIMARY KEY,
+    statusAlugado INTEGER NOT NULL,
+    contratoNFT TEXT NOT NULL,
+    tokenId TEXT NOT NULL,
+    vendedor TEXT NOT NULL,
+    locatario TEXT NOT NULL,
+    preco TEXT NOT NULL,
+    expiraEm INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_itens_vendedor ON itens (vendedor);
+CREATE INDEX IF NOT EXISTS idx_itens_locatario ON itens (locatario) WHERE statusAlugado = 1;
+CREATE INDEX IF NOT EXISTS idx_itens_status_expira ON itens (statusAlugado, expiraEm);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_itens_token ON itens (contratoNFT, tokenId);
+CREATE TABLE IF NOT EXISTS tokens (
+    contratoNFT TEXT NOT NULL,
+    tokenId TEXT NOT NULL,
+    uri TEXT NOT NULL,
+    PRIMARY KEY (contratoNFT, tokenId)
+);
+CREATE TABLE IF NOT EXISTS checkpoint (
+    chave TEXT PRIMARY KEY,
+    valor NOT NULL
+);
+"""
+
+class ArmazemSQLite:
+    '''
+        Cria um novo objeto ArmazemSQLite. Guarda os itens do marketplace, as
+        URIs dos NFTs e o checkpoint da sincronização (último bloco, endereço
+        do contrato e chain id) em um arquivo SQLite, com
+        índices por vendedor, locatário, status e expiração. Possui a mesma
+        interface de ArmazemMemoria, podendo ser usado pelo IndiceMarketplace.
+
+        Valores uint256 que podem exceder 64 bits (tokenId e preco) são
+        guardados como texto e convertidos de volta para int na leitura.
+
+        Parâmetros
+        ----------
+            - caminho (str): Caminho do arquivo SQLite
+
+        Atributos
+        ----------
+            - caminho (str): Caminho do arquivo SQLite
+            - conexao (Connection): Conexão com o banco
+    '''
+
+    def __init__(self, caminho : str):
+        self.caminho = caminho
+        self.conexao = sqlite3.connect(caminho, check_same_thread=False)
+        self.conexao.execute("PRAGMA journal_mode=WAL")
+        self.conexao.execute("PRAGMA synchronous=NORMAL")
+        self.conexao.executescript(ESQUEMA)
+        self.conexao.commit()
+        self._trava = threading.RLock()
+
+    @staticmethod
+    def _paraItem(linha):
+        return (
+            linha[0],
+            bool(linha[1]),
+            linha[2],
+            int(linha[3]),
+            linha[4],
+            linha[5],
+            int(linha[6]),
+            linha[7]
+        )
+
+    def _consulta(self, sql : str, parametros : tuple = ()):
+        with self._trava:
+            return [self._paraItem(linha) for linha in self.conexao.execute(sql, parametros)]
+
+    def salvaItem(self, item : tuple):
+        '''
+            Insere ou atualiza um item.
+
+            Parâmetros
+            ----------
+                - item (tuple): Item no formato da struct Item.
+        '''
+        with self._trava:
+            self.conexao.execute(
+                "INSERT OR REPLACE INTO itens VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (item[0], int(item[1]), item[2], str(item[3]), item[4], item[5], str(item[6]), item[7])
+            )
+
+    def removeItem(self, itemId : int):
+        '''
+            Remove um item.
+
+            Parâmetros
+            ----------
+                - itemId (int): ID do item.
+        '''
+        with self._trava:
+            self.conexao.execute("DELETE FROM itens WHERE itemId = ?", (itemId,))
+
+    def getItem(self, itemId : int):
+        '''
+            Resgata um item pelo seu ID.
+
+            Retorno
+            -------
+                - item (None | tuple): Item ou None caso não exista.
+        '''
+        itens = self._consulta("SELECT * FROM itens WHERE itemId = ?", (itemId,))
+        return itens[0] if itens else None
+
+    def getItemPorToken(self, contratoNFT : str, tokenId : int):
+        '''
+            Resgata o item ativo associado a um NFT.
+
+            Retorno
+            -------
+                - item (None | tuple): Item ou None caso o NFT não esteja no marketplace.
+        '''
+        itens = self._consulta("SELECT * FROM itens WHERE contratoNFT = ? AND tokenId = ?", (contratoNFT, str(tokenId)))
+        return itens[0] if itens else None
+
+    def contratosNFT(self):
+        '''
+            Retorna os endereços dos contratos de NFT dos itens ativos.
+
+            Retorno
+            -------
+                - contratos (set): Endereços dos contratos de NFT.
+        '''
+        with self._trava:
+            return {linha[0] for linha in self.conexao.execute("SELECT DISTINCT contratoNFT FROM itens")}
+
+    def alugaveis(self):
+        '''
+            Retorna os itens disponíveis para alugar, ordenados pelo itemId.
+        '''
+        return self._consulta("SELECT * FROM itens WHERE statusAlugado = 0 ORDER BY itemId")
+
+    def porVendedor(self, vendedor : str):
+        '''
+            Retorna os itens de um vendedor, ordenados pelo itemId.
+        '''
+        return self._consulta("SELECT * FROM itens WHERE vendedor = ? ORDER BY itemId", (vendedor,))
+
+    def porLocatario(self, locatario : str):
+        '''
+            Retorna os itens alugados por um locatário, ordenados pelo itemId.
+        '''
+        return self._consulta(
+            "SELECT * FROM itens WHERE locatario = ? AND statusAlugado = 1 ORDER BY itemId", (locatario,)
+        )
+
+    def expiradosEAlugados(self, agora : int):
+        '''
+            Retorna os itens alugados cujo prazo expirou até o instante informado.
+
+            Parâmetros
+            ----------
+                - agora (int): Instante de referência (timestamp Unix).
+        '''
+        return self._consulta(
+            "SELECT * FROM itens WHERE statusAlugado = 1 AND expiraEm <= ? ORDER BY itemId", (agora,)
+        )
+
+    def salvaTokenURI(self, contratoNFT : str, tokenId : int, uri : str):
+        '''
+            Guarda a URI de um NFT.
+        '''
+        with self._trava:
+            self.conexao.execute("INSERT OR REPLACE INTO tokens VALUES (?, ?, ?)", (contratoNFT, str(tokenId), uri))
+
+    def getTokenURI(self, contratoNFT : str, tokenId : int):
+        '''
+            Resgata a URI de um NFT já guardada.
+
+            Retorno
+            -------
+                - uri (None | str): URI do NFT ou None caso não esteja guardada.
+        '''
+        with self._trava:
+            linha = self.conexao.execute(
+                "SELECT uri FROM tokens WHERE contratoNFT = ? AND tokenId = ?", (contratoNFT, str(tokenId))
+            ).fetchone()
+            return None if linha is None else linha[0]
+
+    def getUltimoBloco(self):
+        '''
+            Retorna o último bloco processado.
+        '''
+        with self._trava:
+            linha = self.conexao.execute("SELECT valor FROM checkpoint WHERE chave = 'ultimo_bloco'").fetchone()
+            return -1 if linha is None else linha[0]
+
+    def setUltimoBloco(self, bloco : int):
+        '''
+            Registra o último bloco processado.
+        '''
+        with self._trava:
+            self.conexao.execute("INSERT OR REPLACE INTO checkpoint VALUES ('ultimo_bloco', ?)", (bloco,))
+
+    def getOrigem(self):
+        '''
+            Retorna a origem dos dados guardados.
+
+            Retorno
+            -------
+                - origem (None | tuple): (endereço do contrato, chain id) ou None caso não registrada.
+        '''
+        with self._trava:
+            linhas = dict(self.conexao.execute(
+                "SELECT chave, valor FROM checkpoint WHERE chave IN ('contrato', 'chain_id')"
+            ).fetchall())
+            if len(linhas) < 2:
+                return None
+            return (linhas['contrato'], int(linhas['chain_id']))
+
+    def setOrigem(self, contrato : str, chain_id : int):
+        '''
+            Registra o contrato e a rede de origem dos dados guardados.
+        '''
+        with self._trava:
+            self.conexao.executemany("INSERT OR REPLACE INTO checkpoint VALUES (?, ?)",
+                                     [('contrato', contrato), ('chain_id', chain_id)])
+
+    def limpa(self):
+        '''
+            Remove os itens, as URIs e o checkpoint guardados.
+        '''
+        with self._trava:
+            self.conexao.execute("DELETE FROM itens")
+            self.conexao.execute("DELETE FROM tokens")
+            self.conexao.execute("DELETE FROM checkpoint")
+
+    def confirma(self):
+        '''
+            Grava em disco as alterações pendentes. O IndiceMarketplace confirma
+            cada janela de blocos junto com o seu checkpoint.
+        '''
+        with self._trava:
+            self.conexao.commit()
+
+    def fecha(self):
+        '''
+            Grava as alterações pendentes e fecha o arquivo.
+        '''
+        with self._trava:
+            self.conexao.commit()
+            self.conexao.close()
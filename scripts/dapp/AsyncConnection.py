@@ -0,0 +1,117 @@
+from web3 import AsyncWeb3
+from web3.contract import AsyncContract
+from dapp.GerenciadorNonce import GerenciadorNonce
+
+class AsyncConnection:
+    '''
+        Create a new AsyncConnection object instance. Asynchronous counterpart
+        of Connection, built on AsyncWeb3 and AsyncHTTPProvider, so a single
+        event loop can serve many calls concurrently.
+
+        Parameters
+        ----------
+            - provider (str): Network Provider URL (e.g. Ganache)
+            - address (str): Contract address
+            - abi (dict): Contract ABI
+            - nonce_manager (GerenciadorNonce | None): Nonce manager shared with
+            other async connections. A new one is created if None.
+
+        Attributes
+        ----------
+            - provider (str): Network Provider URL (e.g. Ganache)
+            - contract_address (str): Contract address
+            - contract_abi (dict): Contract ABI
+            - web3 (AsyncWeb3): AsyncWeb3 instance
+            - contract (AsyncContract): Smart Contract instance
+            - nonce_manager (GerenciadorNonce): Per-account nonce allocator
+    '''
+    provider : str
+    contract_address : str
+    contract_abi : dict
+    web3 : AsyncWeb3
+    contract : AsyncContract
+    nonce_manager : GerenciadorNonce
+
+    def __init__(self, provider : str, address : str, abi : dict, nonce_manager : GerenciadorNonce = None):
+        self.provider = provider
+        self.contract_address = address
+        self.contract_abi = abi
+        self.nonce_manager = nonce_manager
+
+    async def executeConnection(self):
+        '''
+            Call others functions about connection.
+
+            Returns
+            -------
+                - status (bool): True if the connection was well-success or False is not.
+        '''
+        try:
+            status_web3 = await self.connectNetwork()
+            status_contract = self.connectContract()
+            return (status_web3 and status_contract)
+        except Exception as e:
+            print(e)
+            return False
+
+    async def connectNetwork(self):
+        '''
+            Connects the provider and returns the status of the connection.
+
+            Returns
+            -------
+                - status (bool): True if the connection was well-success or False is not.
+        '''
+        try:
+            self.web3 = AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(self.provider))
+            if self.nonce_manager is None:
+                self.nonce_manager = GerenciadorNonce(self.web3)
+            return await self.web3.is_connected()
+        except Exception as e:
+            print(e)
+            return False
+
+    def connectContract(self):
+        '''
+            Connects the contract through of your address and your ABI.
+
+            Returns
+            -------
+                - status (bool): True if the connection was well-success or False is not.
+        '''
+        try:
+            self.contract = self.web3.eth.contract(address=self.contract_address, abi=self.contract_abi)
+            return True
+        except Exception as e:
+            print(e)
+            return False
+
+    def getWeb3Connection(self):
+        '''
+            Returns the AsyncWeb3 connection.
+
+            Returns
+            -------
+                - web3 (AsyncWeb3): AsyncWeb3 connection.
+        '''
+        return self.web3
+
+    def getContractConnection(self):
+        '''
+            Returns the contract connection.
+
+            Returns
+            -------
+                - contract (AsyncContract): Contract connection.
+        '''
+        return self.contract
+
+    def getNonceManager(self):
+        '''
+            Returns the nonce manager.
+
+            Returns
+            -------
+                - nonce_manager (GerenciadorNonce): Per-account nonce allocator.
+        '''
+        return self.nonce_manager
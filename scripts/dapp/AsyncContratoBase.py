@@ -0,0 +1,94 @@
+from dapp.AsyncConnection import AsyncConnection
+
+class AsyncContratoBase:
+    '''
+        Cria um novo objeto AsyncContratoBase. Versão assíncrona de
+        ContratoBase, com os métodos comuns aos objetos assíncronos que
+        mapeiam os contratos em solidity.
+
+        Parâmetros
+        ----------
+            - pubk (str): Chave pública da conta
+            - pk (str): Chave privada da conta
+            - connection (AsyncConnection): Instância da conexão assíncrona do web3 e do contrato
+
+        Atributos
+        ----------
+            - public_key (str): Chave pública da conta
+            - private_key (str): Chave privada da conta
+            - web3 (AsyncWeb3): Instância AsyncWeb3
+            - contract (AsyncContract): Instância do contrato inteligente
+            - nonces (GerenciadorNonce): Gerenciador de nonces compartilhado entre as conexões
+    '''
+
+    # Quantidade máxima de reenvios após um erro de nonce
+    TENTATIVAS_NONCE = 3
+
+    def __init__(self, pubk : str, pk : str, connection : AsyncConnection):
+        self.public_key = pubk
+        self.private_key = pk
+        self.web3 = connection.getWeb3Connection()
+        self.contract = connection.getContractConnection()
+        self.nonces = connection.getNonceManager()
+
+    async def _enviaTransacao(self, funcao, parametros : dict):
+        '''
+            Monta, assina e envia uma transação utilizando um nonce reservado
+            localmente. Caso o nó rejeite a transação por erro de nonce, o
+            nonce é sincronizado e a transação é reenviada; nos demais erros o
+            nonce é devolvido.
+
+            Parâmetros
+            ----------
+                - funcao (AsyncContractFunction): Função do contrato já com os argumentos.
+                - parametros (dict): Parâmetros da transação, exceto o nonce.
+
+            Retorno
+            -------
+                - tx_hash (HexBytes): Hash da transação enviada.
+        '''
+        for tentativa in range(self.TENTATIVAS_NONCE):
+            nonce = await self.nonces.proximoNonceAsync(self.public_key)
+            try:
+                # Cria a transação
+                tx = await funcao.build_transaction({**parametros, "nonce": nonce, "from": self.public_key})
+                # Assina a transação com a chave privada da conta
+                signed_tx = self.web3.eth.account.sign_transaction(tx, self.private_key)
+            except Exception:
+                self.nonces.devolve(self.public_key, nonce)
+                raise
+            try:
+                # Resgata o hash da transação
+                tx_hash = await self.web3.eth.send_raw_transaction(signed_tx.rawTransaction)
+            except Exception as e:
+                if not self.nonces.erroDeNonce(e):
+                    # A transação não foi aceita, então o nonce reservado volta a ficar livre
+                    self.nonces.devolve(self.public_key, nonce)
+                    raise
+                # O nonce já está em uso na rede: a reserva é descartada e o contador sincronizado
+                self.nonces.confirma(self.public_key)
+                await self.nonces.sincronizaAsync(self.public_key)
+                if tentativa == self.TENTATIVAS_NONCE - 1:
+                    raise
+                continue
+            self.nonces.confirma(self.public_key)
+            return tx_hash
+
+    async def _executaTransacao(self, funcao, parametros : dict):
+        '''
+            Envia uma transação e aguarda a sua mineração sem bloquear o loop de eventos.
+
+            Parâmetros
+            ----------
+                - funcao (AsyncContractFunction): Função do contrato já com os argumentos.
+                - parametros (dict): Parâmetros da transação, exceto o nonce.
+
+            Retorno
+            -------
+                - receipt (AttributeDict): Recibo da transação.
+        '''
+        tx_hash = await self._enviaTransacao(funcao, parametros)
+        receipt = await self.web3.eth.wait_for_transaction_receipt(tx_hash)
+        if receipt['status'] == 0:
+            raise Exception("Transação {} revertida!".format(self.web3.to_hex(tx_hash)))
+        return receipt
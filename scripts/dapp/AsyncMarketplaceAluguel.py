@@ -0,0 +1,186 @@
+from dapp.AsyncConnection import AsyncConnection
+from dapp.AsyncContratoBase import AsyncContratoBase
+from dapp.MarketplaceAluguel import MarketplaceAluguel
+from dapp.Item import Item
+from web3 import Web3
+
+class AsyncMarketplaceAluguel(AsyncContratoBase):
+    '''
+        Cria um novo objeto AsyncMarketplaceAluguel. Versão assíncrona de MarketplaceAluguel.
+
+        Parâmetros
+        ----------
+            - pubk (str): Chave pública da conta
+            - pk (str): Chave privada da conta
+            - connection (AsyncConnection): Instância da conexão assíncrona do web3 e do contrato
+            - contractNFT (str): Endereço do contrato de NFTs
+
+        Atributos
+        ----------
+            - public_key (str): Chave pública da conta
+            - private_key (str): Chave privada da conta
+            - web3 (AsyncWeb3): Instância AsyncWeb3
+            - contract (AsyncContract): Instância do contrato inteligente
+            - contract_nft (str): Endereço do contrato de NFTs
+            - nonces (GerenciadorNonce): Gerenciador de nonces compartilhado entre as conexões
+    '''
+
+    def __init__(self, pubk : str, pk : str, connection : AsyncConnection, contractNFT : str):
+        super().__init__(pubk, pk, connection)
+        self.contract_nft = contractNFT
+
+    async def criaItemAlugavel(self, tokenId : int, preco : int, tempoExpira : int, taxa : float):
+        '''
+            Disponibiliza um NFT para ser alugado.
+
+            Parâmetros
+            ----------
+                - tokenId (int): ID do NFT.
+                - preco (int): Preço do NFT alugável em Wei.
+                - tempoExpira (int): Tempo de expiração do item em segundos.
+                - taxa (float): Taxa cobrada pelo marketplace para criar um novo item.
+
+            Retorno
+            -------
+                - item (None | Item): Item cadastrado ou None caso ocorra algum erro.
+        '''
+        try:
+            receipt = await self._executaTransacao(
+                self.contract.functions.criaItemAlugavel(
+                    self.contract_nft,
+                    tokenId,
+                    Web3.to_wei(preco, 'ether'),
+                    tempoExpira
+                ),
+                {
+                    'value': Web3.to_wei(taxa, 'ether'),
+                    'gas': 2000000,
+                    'gasPrice': Web3.to_wei('50', 'gwei')
+                }
+            )
+            print("NFT disponibilizado para aluguel com sucesso!")
+            return self.extraiItemCriado(receipt)
+        except Exception as e:
+            print(e)
+            return None
+
+    async def alugarItem(self, itemId: int, valor : float):
+        '''
+            Aluga um NFT.
+
+            Parâmetros
+            ----------
+                - itemId (int): ID do item alugável.
+                - valor (float): Valor a ser pago pelo aluguel.
+
+            Retorno
+            -------
+                - status (bool): Indica o sucesso ou falha do aluguel.
+        '''
+        try:
+            await self._executaTransacao(
+                self.contract.functions.alugarItem(
+                    self.contract_nft,
+                    itemId
+                ),
+                {
+                    'value': Web3.to_wei(valor, 'ether'),
+                    'gas': 2000000,
+                    'gasPrice': Web3.to_wei('50', 'gwei')
+                }
+            )
+            return True
+        except Exception as e:
+            print(e)
+            return False
+
+    async def finalizaAluguel(self, itemId: int):
+        '''
+            Finaliza um aluguel.
+
+            Parâmetros
+            ----------
+                - itemId (int): ID do item alugado.
+
+            Retorno
+            -------
+                - status (bool): Indica o sucesso ou falha da finalização do aluguel.
+        '''
+        try:
+            await self._executaTransacao(
+                self.contract.functions.finalizaAluguel(itemId),
+                {"gasPrice": await self.web3.eth.gas_price}
+            )
+            return True
+        except Exception as e:
+            print(e)
+            return False
+
+    async def _consultaItens(self, funcao):
+        # Executa uma das consultas getNFTs* e converte os itens retornados
+        try:
+            nfts_disponiveis = await funcao().call({'from': self.public_key})
+            return [Item._make(item) for item in nfts_disponiveis]
+        except Exception as e:
+            print(e)
+            return None
+
+    async def getNFTsAlugaveis(self):
+        '''
+            Resgata os NFTs disponíveis para alugar.
+
+            Retorno
+            -------
+                - nfts_disponiveis (None | list): Lista de Items.
+        '''
+        return await self._consultaItens(self.contract.functions.getNFTsAlugaveis)
+
+    async def getNFTsPorVendedor(self):
+        '''
+            Resgata os NFTs de um vendedor.
+
+            Retorno
+            -------
+                - nfts_disponiveis (None | list): Lista de Items.
+        '''
+        return await self._consultaItens(self.contract.functions.getNFTsPorVendedor)
+
+    async def getNFTsPorLocatario(self):
+        '''
+            Resgata os NFTs de um locatário.
+
+            Retorno
+            -------
+                - nfts_disponiveis (None | list): Lista de Items.
+        '''
+        return await self._consultaItens(self.contract.functions.getNFTsPorLocatario)
+
+    async def getNFTsExpiradosEAlugados(self):
+        '''
+            Resgata os NFTs expirados e que ainda estão alugados.
+
+            Retorno
+            -------
+                - nfts_disponiveis (None | list): Lista de Items.
+        '''
+        return await self._consultaItens(self.contract.functions.getNFTsExpiradosEAlugados)
+
+    async def getTaxaMarketplace(self):
+        '''
+            Resgata a taxa cobrada pelo marketplace para criar um novo item.
+
+            Retorno
+            -------
+                - taxa (None | float) - Taxa cobrada pelo marketplace.
+        '''
+        try:
+            taxa = await self.contract.functions.getTaxaMarketplace().call({'from': self.public_key})
+            return float(Web3.from_wei(taxa, 'ether'))
+        except Exception as e:
+            print(e)
+            return None
+
+    # A decodificação e a formatação dos itens são as mesmas da versão síncrona
+    extraiItemCriado = MarketplaceAluguel.extraiItemCriado
+    formataItemCriado = MarketplaceAluguel.formataItemCriado
+    formataItem = MarketplaceAluguel.formataItem
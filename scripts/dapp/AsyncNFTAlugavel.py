@@ -0,0 +1,52 @@
+from dapp.AsyncConnection import AsyncConnection
+from dapp.AsyncContratoBase import AsyncContratoBase
+from dapp.NFTAlugavel import NFTAlugavel
+
+class AsyncNFTAlugavel(AsyncContratoBase):
+    '''
+        Cria um novo objeto AsyncNFTAlugavel. Versão assíncrona de NFTAlugavel.
+
+        Parâmetros
+        ----------
+            - pubk (str): Chave pública da conta
+            - pk (str): Chave privada da conta
+            - connection (AsyncConnection): Instância da conexão assíncrona do web3 e do contrato
+
+        Atributos
+        ----------
+            - public_key (str): Chave pública da conta
+            - private_key (str): Chave privada da conta
+            - web3 (AsyncWeb3): Instância AsyncWeb3
+            - contract (AsyncContract): Instância do contrato inteligente
+            - nonces (GerenciadorNonce): Gerenciador de nonces compartilhado entre as conexões
+    '''
+
+    def __init__(self, pubk : str, pk : str, connection : AsyncConnection):
+        super().__init__(pubk, pk, connection)
+
+    async def criarNovoToken(self, tokenCID : str):
+        '''
+            Salva um NFT na blockchain.
+
+            Parâmetros
+            ----------
+                - tokenCID (str): CID do novo NFT.
+
+            Retorno
+            -------
+                - token_id (None | int): ID do novo Token ou None caso ocorra algum erro.
+        '''
+        try:
+            receipt = await self._executaTransacao(
+                self.contract.functions.criarNovoToken(tokenCID),
+                {"gasPrice": await self.web3.eth.gas_price}
+            )
+            token_id = self.extraiTokenId(receipt)
+            print("NFT criado com sucesso!")
+            return token_id
+        except Exception as e:
+            print(e)
+            return None
+
+    # O recibo é processado da mesma forma que na versão síncrona
+    extraiTokenId = NFTAlugavel.extraiTokenId
@@ -0,0 +1,468 @@
+import os, mmap, uuid, base64, hashlib, threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+import requests
+
+ALFABETO_BASE58 = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+VALORES_BASE58 = {caractere: valor for valor, caractere in enumerate(ALFABETO_BASE58)}
+# Codecs e função de hash suportados (multicodec)
+CODEC_RAW = 0x55
+CODEC_DAG_PB = 0x70
+MULTIHASH_SHA256 = 0x12
+# Tipos de nó UnixFS
+UNIXFS_RAW = 0
+UNIXFS_ARQUIVO = 2
+
+class ConteudoInvalido(Exception):
+    '''
+        Erro de um CID não suportado ou de um bloco cujo hash não corresponde ao CID.
+    '''
+    pass
+
+def decodificaBase58(texto : str):
+    '''
+        Decodifica um texto em base58 (alfabeto do Bitcoin, usado nos CIDs v0).
+
+        Parâmetros
+        ----------
+            - texto (str): Texto em base58.
+
+        Retorno
+        -------
+            - dados (bytes): Bytes decodificados.
+    '''
+    valor = 0
+    for caractere in texto:
+        if caractere not in VALORES_BASE58:
+            raise ConteudoInvalido("Caractere inválido em base58: {}".format(caractere))
+        valor = valor * 58 + VALORES_BASE58[caractere]
+    # Cada '1' inicial representa um byte zero
+    zeros = len(texto) - len(texto.lstrip("1"))
+    return b"\x00" * zeros + valor.to_bytes((valor.bit_length() + 7) // 8, "big")
+
+def codificaBase58(dados : bytes):
+    '''
+        Codifica bytes em base58 (alfabeto do Bitcoin).
+
+        Parâmetros
+        ----------
+            - dados (bytes): Bytes a codificar.
+
+        Retorno
+        -------
+            - texto (str): Texto em base58.
+    '''
+    valor = int.from_bytes(dados, "big")
+    caracteres = []
+    while valor:
+        valor, resto = divmod(valor, 58)
+        caracteres.append(ALFABETO_BASE58[resto])
+    zeros = len(dados) - len(dados.lstrip(b"\x00"))
+    return "1" * zeros + "".join(reversed(caracteres))
+
+def _leVarint(dados, posicao : int):
+    # Inteiro sem sinal em varint (multiformats e protobuf)
+    valor = 0
+    deslocamento = 0
+    while True:
+        if posicao >= len(dados):
+            raise ConteudoInvalido("Varint truncado!")
+        byte = dados[posicao]
+        posicao += 1
+        valor |= (byte & 0x7F) << deslocamento
+        if not byte & 0x80:
+            return valor, posicao
+        deslocamento += 7
+
+def normalizaCID(uri : str):
+    '''
+        Extrai o CID de uma URI de token ("Qm...", "ipfs://Qm..." ou "/ipfs/Qm...").
+
+        Parâmetros
+        ----------
+            - uri (str): URI do token.
+
+        Retorno
+        -------
+            - cid (str): CID sem prefixos.
+    '''
+    cid = uri.strip()
+    for prefixo in ("ipfs://", "/ipfs/"):
+        if cid.startswith(prefixo):
+            cid = cid[len(prefixo):]
+    if not cid or "/" in cid:
+        raise ConteudoInvalido("URI não suportada: {}".format(uri))
+    return cid
+
+def decodificaCID(cid):
+    '''
+        Decodifica um CID v0 (base58, "Qm...") ou v1 (base32, "b..."), em
+        texto ou binário, com hash sha2-256.
+
+        Parâmetros
+        ----------
+            - cid (str | bytes): CID em texto ou binário (como nos links dag-pb).
+
+        Retorno
+        -------
+            - cid (tuple): Codec do conteúdo e o digest sha256 esperado.
+    '''
+    if isinstance(cid, str):
+        if len(cid) == 46 and cid.startswith("Qm"):
+            binario = decodificaBase58(cid)
+        elif cid.startswith("b"):
+            texto = cid[1:].upper()
+            binario = base64.b32decode(texto + "=" * (-len(texto) % 8))
+        else:
+            raise ConteudoInvalido("Codificação de CID não suportada: {}".format(cid))
+    else:
+        binario = bytes(cid)
+    if binario[:2] == bytes([MULTIHASH_SHA256, 32]):
+        # CID v0: apenas o multihash de um nó dag-pb
+        codec, posicao = CODEC_DAG_PB, 0
+    else:
+        versao, posicao = _leVarint(binario, 0)
+        if versao != 1:
+            raise ConteudoInvalido("Versão de CID não suportada: {}".format(versao))
+        codec, posicao = _leVarint(binario, posicao)
+    funcao_hash, posicao = _leVarint(binario, posicao)
+    tamanho, posicao = _leVarint(binario, posicao)
+    if funcao_hash != MULTIHASH_SHA256 or tamanho != 32 or len(binario) != posicao + 32:
+        raise ConteudoInvalido("Apenas CIDs com sha2-256 são suportados!")
+    if codec not in (CODEC_RAW, CODEC_DAG_PB):
+        raise ConteudoInvalido("Codec não suportado: {:#x}".format(codec))
+    return codec, binario[posicao:]
+
+def textoCID(binario : bytes):
+    '''
+        Converte um CID binário (link dag-pb) para texto: base58 para v0 e
+        base32 para v1.
+    '''
+    if binario[:2] == bytes([MULTIHASH_SHA256, 32]):
+        return codificaBase58(binario)
+    return "b" + base64.b32encode(binario).decode().lower().rstrip("=")
+
+def _camposProtobuf(dados):
+    # Percorre os campos de uma mensagem protobuf: (número, valor)
+    posicao = 0
+    while posicao < len(dados):
+        chave, posicao = _leVarint(dados, posicao)
+        numero, tipo = chave >> 3, chave & 0x07
+        if tipo == 0:
+            valor, posicao = _leVarint(dados, posicao)
+        elif tipo == 2:
+            tamanho, posicao = _leVarint(dados, posicao)
+            valor = dados[posicao:posicao + tamanho]
+            posicao += tamanho
+        elif tipo == 1:
+            valor, posicao = dados[posicao:posicao + 8], posicao + 8
+        elif tipo == 5:
+            valor, posicao = dados[posicao:posicao + 4], posicao + 4
+        else:
+            raise ConteudoInvalido("Tipo protobuf não suportado: {}".format(tipo))
+        yield numero, valor
+
+def leNoArquivo(bloco : bytes):
+    '''
+        Lê um nó dag-pb de um arquivo UnixFS.
+
+        Parâmetros
+        ----------
+            - bloco (bytes): Bloco dag-pb já verificado.
+
+        Retorno
+        -------
+            - no (tuple): Dados do arquivo contidos no próprio nó e os CIDs
+            binários dos blocos filhos, na ordem do arquivo.
+    '''
+    links = []
+    unixfs = b""
+    for numero, valor in _camposProtobuf(bloco):
+        if numero == 2:
+            # PBLink: o campo 1 é o CID do filho
+            links.extend(bytes(hash_filho) for campo, hash_filho in _camposProtobuf(valor) if campo == 1)
+        elif numero == 1:
+            unixfs = valor
+    tipo = UNIXFS_ARQUIVO
+    dados = b""
+    for numero, valor in _camposProtobuf(unixfs):
+        if numero == 1:
+            tipo = valor
+        elif numero == 2:
+            dados = valor
+    if tipo not in (UNIXFS_RAW, UNIXFS_ARQUIVO):
+        raise ConteudoInvalido("Apenas CIDs de arquivos são suportados (tipo UnixFS {})".format(tipo))
+    return dados, links
+
+class CacheConteudo:
+    '''
+        Cria um novo objeto CacheConteudo. Resolve os CIDs dos tokens por um
+        gateway IPFS e guarda o conteúdo em disco, em arquivos nomeados pelo
+        próprio CID. Os blocos são baixados no formato bruto (?format=raw) e
+        o sha256 de cada um é conferido com o CID antes de ser utilizado, sem
+        confiar no gateway. Arquivos divididos em vários blocos são remontados
+        a partir dos links dag-pb.
+
+        O espaço em disco é limitado: ao ultrapassar o tamanho máximo, os
+        conteúdos usados há mais tempo são removidos (LRU). As leituras
+        repetidas dos conteúdos grandes são servidas por mmap, sem copiar o
+        arquivo para a memória; os menores são lidos como bytes. Apenas os
+        mapas_abertos mapas usados mais recentemente ficam abertos no cache,
+        pois cada mmap mantém um descritor de arquivo.
+
+        Parâmetros
+        ----------
+            - gateway (str): URL do gateway IPFS (ex.: http://127.0.0.1:8080)
+            - pasta (str): Pasta onde os conteúdos são guardados
+            - tamanho_maximo (int): Espaço máximo em disco em bytes
+            - tempo_limite (float): Tempo máximo de cada requisição ao gateway em segundos
+            - mapas_abertos (int): Quantidade máxima de mmaps mantidos pelo cache
+
+        Atributos
+        ----------
+            - gateway (str): URL do gateway IPFS
+            - pasta (str): Pasta onde os conteúdos são guardados
+            - tamanho_maximo (int): Espaço máximo em disco em bytes
+            - mapas_abertos (int): Quantidade máxima de mmaps mantidos pelo cache
+            - tamanho_total (int): Espaço ocupado pelos conteúdos guardados
+            - acertos (int): Leituras servidas pelo disco
+            - falhas (int): Leituras que precisaram baixar o conteúdo
+            - bytes_baixados (int): Bytes recebidos do gateway
+            - removidos (int): Conteúdos removidos para liberar espaço
+    '''
+
+    # Conteúdos menores que isso são lidos como bytes, sem ocupar um descritor com um mmap
+    TAMANHO_MINIMO_MAPA = 64 * 1024
+
+    def __init__(self, gateway : str, pasta : str, tamanho_maximo : int = 512 * 1024 * 1024,
+                 tempo_limite : float = 30.0, mapas_abertos : int = 64):
+        self.gateway = gateway.rstrip("/")
+        self.pasta = pasta
+        self.tamanho_maximo = tamanho_maximo
+        self.tempo_limite = tempo_limite
+        self.mapas_abertos = mapas_abertos
+        self.tamanho_total = 0
+        self.acertos = 0
+        self.falhas = 0
+        self.bytes_baixados = 0
+        self.removidos = 0
+        self.sessao = requests.Session()
+        # CID -> tamanho, do menos para o mais recentemente usado
+        self._entradas = OrderedDict()
+        # Arquivos já mapeados na memória, reaproveitados nas leituras seguintes,
+        # do menos para o mais recentemente usado
+        self._mapas = OrderedDict()
+        # Downloads em andamento, para que cada CID seja baixado uma única vez
+        self._em_andamento = {}
+        self._trava = threading.Lock()
+        os.makedirs(pasta, exist_ok=True)
+        self._carregaPasta()
+
+    def _caminho(self, cid : str):
+        return os.path.join(self.pasta, cid)
+
+    def _carregaPasta(self):
+        # Reconstrói a ordem LRU pela data de último uso dos arquivos existentes
+        existentes = []
+        for nome in os.listdir(self.pasta):
+            caminho = os.path.join(self.pasta, nome)
+            if nome.startswith("tmp-"):
+                # Download interrompido
+                os.remove(caminho)
+                continue
+            estado = os.stat(caminho)
+            existentes.append((estado.st_mtime, nome, estado.st_size))
+        for _, cid, tamanho in sorted(existentes):
+            self._entradas[cid] = tamanho
+            self.tamanho_total += tamanho
+        with self._trava:
+            self._libera()
+
+    def le(self, uri : str):
+        '''
+            Lê o conteúdo de um CID, baixando-o caso ainda não esteja em disco.
+
+            Parâmetros
+            ----------
+                - uri (str): CID ou URI do token.
+
+            Retorno
+            -------
+                - conteudo (mmap | bytes): Conteúdo somente leitura (bytes vazio
+                para conteúdos vazios).
+        '''
+        cid = normalizaCID(uri)
+        conteudo = self._abre(cid)
+        if conteudo is not None:
+            return conteudo
+        self._baixa(cid)
+        conteudo = self._abre(cid, contabiliza=False)
+        if conteudo is None:
+            # Removido logo após o download por falta de espaço
+            with open(self._caminho(cid), "rb") as arquivo:
+                return arquivo.read()
+        return conteudo
+
+    def _abre(self, cid : str, contabiliza : bool = True):
+        with self._trava:
+            if cid not in self._entradas:
+                return None
+            self._entradas.move_to_end(cid)
+            if contabiliza:
+                self.acertos += 1
+            mapa = self._mapas.get(cid)
+            if mapa is not None:
+                self._mapas.move_to_end(cid)
+                return mapa
+            if self._entradas[cid] == 0:
+                return b""
+            with open(self._caminho(cid), "rb") as arquivo:
+                if self._entradas[cid] < self.TAMANHO_MINIMO_MAPA:
+                    mapa = arquivo.read()
+                else:
+                    mapa = self._mapas[cid] = mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+                    while len(self._mapas) > self.mapas_abertos:
+                        # O mapa descartado é fechado (com o seu descritor) quando
+                        # ninguém mais o referencia; fechá-lo aqui invalidaria o
+                        # conteúdo ainda em uso por quem o recebeu
+                        self._mapas.popitem(last=False)
+        # Registra o uso para manter a ordem LRU entre execuções
+        try:
+            os.utime(self._caminho(cid))
+        except OSError:
+            pass
+        return mapa
+
+    def _baixa(self, cid : str):
+        # Baixa um CID uma única vez, mesmo com várias threads pedindo o mesmo conteúdo
+        with self._trava:
+            if cid in self._entradas:
+                return False
+            futuro = self._em_andamento.get(cid)
+            responsavel = futuro is None
+            if responsavel:
+                futuro = self._em_andamento[cid] = Future()
+                self.falhas += 1
+        if not responsavel:
+            futuro.result()
+            return False
+        try:
+            temporario = self._caminho("tmp-{}".format(uuid.uuid4().hex))
+            try:
+                with open(temporario, "wb") as arquivo:
+                    self._escreveConteudo(cid, arquivo)
+                    tamanho = arquivo.tell()
+                os.replace(temporario, self._caminho(cid))
+            except BaseException:
+                if os.path.exists(temporario):
+                    os.remove(temporario)
+                raise
+            with self._trava:
+                self._entradas[cid] = tamanho
+                self.tamanho_total += tamanho
+                self._libera(manter=cid)
+            futuro.set_result(None)
+            return True
+        except BaseException as e:
+            futuro.set_exception(e)
+            raise
+        finally:
+            with self._trava:
+                self._em_andamento.pop(cid, None)
+
+    def _escreveConteudo(self, cid, arquivo):
+        # Escreve o conteúdo de um bloco e, em seguida, o de cada filho, em ordem
+        codec, digest = decodificaCID(cid)
+        bloco = self._baixaBloco(cid if isinstance(cid, str) else textoCID(cid), digest)
+        if codec == CODEC_RAW:
+            arquivo.write(bloco)
+            return
+        dados, links = leNoArquivo(bloco)
+        arquivo.write(dados)
+        for link in links:
+            self._escreveConteudo(link, arquivo)
+
+    def _baixaBloco(self, cid : str, digest : bytes):
+        resposta = self.sessao.get(
+            "{}/ipfs/{}".format(self.gateway, cid),
+            params={"format": "raw"},
+            headers={"Accept": "application/vnd.ipld.raw"},
+            timeout=self.tempo_limite
+        )
+        resposta.raise_for_status()
+        bloco = resposta.content
+        with self._trava:
+            self.bytes_baixados += len(bloco)
+        if hashlib.sha256(bloco).digest() != digest:
+            raise ConteudoInvalido("O conteúdo recebido não corresponde ao CID {}!".format(cid))
+        return bloco
+
+    def _libera(self, manter : str = None):
+        # Remove os conteúdos usados há mais tempo até respeitar o tamanho máximo
+        while self.tamanho_total > self.tamanho_maximo and self._entradas:
+            cid, tamanho = next(iter(self._entradas.items()))
+            if cid == manter:
+                break
+            del self._entradas[cid]
+            self.tamanho_total -= tamanho
+            self.removidos += 1
+            # Mapas ainda em uso continuam válidos; o sistema libera o espaço ao fechá-los
+            self._mapas.pop(cid, None)
+            try:
+                os.remove(self._caminho(cid))
+            except OSError:
+                # No Windows um arquivo mapeado não pode ser removido; fica para a próxima execução
+                pass
+
+    def preCarrega(self, uris, concorrencia : int = 16):
+        '''
+            Baixa em paralelo os conteúdos que ainda não estão em disco.
+
+            Parâmetros
+            ----------
+                - uris (iterable): CIDs ou URIs dos tokens.
+                - concorrencia (int): Quantidade máxima de downloads simultâneos.
+
+            Retorno
+            -------
+                - resumo (dict): Quantidade de conteúdos já em cache e baixados,
+                além do erro de cada CID com falha.
+        '''
+        resumo = {"em_cache": 0, "baixados": 0, "falhas": {}}
+        cids = []
+        for uri in uris:
+            try:
+                cids.append(normalizaCID(uri))
+            except ConteudoInvalido as e:
+                resumo["falhas"][uri] = str(e)
+        cids = list(dict.fromkeys(cids))
+        with ThreadPoolExecutor(max_workers=max(1, min(concorrencia, len(cids)))) as executor:
+            downloads = {cid: executor.submit(self._baixa, cid) for cid in cids}
+        for cid, download in downloads.items():
+            if download.exception() is not None:
+                resumo["falhas"][cid] = str(download.exception())
+            elif download.result():
+                resumo["baixados"] += 1
+            else:
+                resumo["em_cache"] += 1
+        return resumo
+
+    def metricas(self):
+        '''
+            Resume o uso do cache.
+
+            Retorno
+            -------
+                - metricas (dict): Conteúdos guardados, espaço ocupado, acertos,
+                falhas, bytes baixados e conteúdos removidos.
+        '''
+        with self._trava:
+            return {
+                "conteudos": len(self._entradas),
+                "tamanho_total": self.tamanho_total,
+                "tamanho_maximo": self.tamanho_maximo,
+                "acertos": self.acertos,
+                "falhas": self.falhas,
+                "bytes_baixados": self.bytes_baixados,
+                "removidos": self.removidos
+            }
@@ -0,0 +1,122 @@
+import time, threading
+
+class CacheTTL:
+    '''
+        Cria um novo objeto CacheTTL. Guarda valores que mudam pouco na rede
+        (taxa do marketplace, preço do gás, chain id), evitando uma requisição
+        a cada uso. Cada entrada expira após o seu tempo de vida (TTL) e,
+        opcionalmente, quando um novo bloco é minerado.
+
+        O número do bloco é informado por registraBloco (ex.: pelo rastreador
+        de recibos). Quando ninguém o informa há mais de intervalo_bloco
+        segundos, uma consulta a uma entrada por bloco resgata o número atual
+        com consulta_bloco antes de responder, para que essas entradas não
+        fiquem válidas até o fim do TTL em um uso apenas de leitura.
+
+        Parâmetros
+        ----------
+            - ttl (float): Tempo de vida padrão das entradas em segundos
+            - consulta_bloco (None | callable): Função sem argumentos que
+            retorna o número do bloco mais recente da rede
+            - intervalo_bloco (float): Idade máxima em segundos do número do
+            bloco conhecido ao validar uma entrada por bloco
+
+        Atributos
+        ----------
+            - ttl (float): Tempo de vida padrão das entradas em segundos
+            - intervalo_bloco (float): Idade máxima em segundos do número do bloco conhecido
+            - bloco (int): Último bloco informado por registraBloco
+            - acertos (int): Quantidade de consultas respondidas pelo cache
+            - falhas (int): Quantidade de consultas que precisaram carregar o valor
+    '''
+
+    def __init__(self, ttl : float = 60.0, consulta_bloco = None, intervalo_bloco : float = 12.0):
+        self.ttl = ttl
+        self.consulta_bloco = consulta_bloco
+        self.intervalo_bloco = intervalo_bloco
+        self.bloco = -1
+        self._bloco_em = float("-inf")
+        self.acertos = 0
+        self.falhas = 0
+        self._entradas = {}
+        self._trava = threading.Lock()
+
+    def obtem(self, chave, carrega, ttl : float = None, por_bloco : bool = False):
+        '''
+            Resgata um valor do cache, carregando-o caso não exista ou tenha expirado.
+
+            Parâmetros
+            ----------
+                - chave (hashable): Identificador do valor.
+                - carrega (callable): Função sem argumentos que resgata o valor na rede.
+                - ttl (None | float): Tempo de vida desta entrada. Utiliza o padrão
+                caso seja None e nunca expira caso seja float("inf").
+                - por_bloco (bool): Invalida a entrada quando um novo bloco for registrado.
+
+            Retorno
+            -------
+                - valor (Any): Valor guardado ou recém carregado.
+        '''
+        agora = time.monotonic()
+        with self._trava:
+            entrada = self._entradas.get(chave)
+            desatualizado = agora - self._bloco_em > self.intervalo_bloco
+        if por_bloco and desatualizado and self.consulta_bloco is not None:
+            self.registraBloco(self.consulta_bloco())
+        with self._trava:
+            if entrada is not None and agora < entrada[1] and (not entrada[2] or entrada[3] == self.bloco):
+                self.acertos += 1
+                return entrada[0]
+            self.falhas += 1
+            bloco = self.bloco
+        valor = carrega()
+        validade = agora + (self.ttl if ttl is None else ttl)
+        with self._trava:
+            self._entradas[chave] = (valor, validade, por_bloco, bloco)
+        return valor
+
+    def invalida(self, chave = None):
+        '''
+            Remove uma entrada do cache ou todas, caso a chave seja None.
+
+            Parâmetros
+            ----------
+                - chave (None | hashable): Identificador do valor.
+        '''
+        with self._trava:
+            if chave is None:
+                self._entradas.clear()
+            else:
+                self._entradas.pop(chave, None)
+
+    def registraBloco(self, numero : int):
+        '''
+            Informa o bloco mais recente da rede. As entradas marcadas com
+            por_bloco deixam de ser válidas quando o número aumenta.
+
+            Parâmetros
+            ----------
+                - numero (int): Número do bloco mais recente.
+        '''
+        with self._trava:
+            self._bloco_em = time.monotonic()
+            if numero > self.bloco:
+                self.bloco = numero
+
+    def estatisticas(self):
+        '''
+            Retorna os contadores do cache.
+
+            Retorno
+            -------
+                - estatisticas (dict): Acertos, falhas, taxa de acerto e
+                quantidade de entradas guardadas.
+        '''
+        with self._trava:
+            total = self.acertos + self.falhas
+            return {
+                'acertos': self.acertos,
+                'falhas': self.falhas,
+                'taxa_acerto': self.acertos / total if total else 0.0,
+                'entradas': len(self._entradas)
+            }
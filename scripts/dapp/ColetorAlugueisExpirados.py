@@ -0,0 +1,206 @@
+import time, heapq, threading
+from functools import partial
+from dapp.MarketplaceAluguel import MarketplaceAluguel
+from dapp.IndiceMarketplace import IndiceMarketplace
+
+class ColetorAlugueisExpirados:
+    '''
+        Cria um novo objeto ColetorAlugueisExpirados. Serviço de longa duração
+        que devolve automaticamente os NFTs cujo aluguel expirou.
+
+        Os aluguéis ficam em uma fila de prioridade ordenada por expiraEm,
+        alimentada pelo índice do marketplace (eventos ItemCriado e
+        transferências de aluguel), sem consultas completas ao contrato. A
+        thread do coletor dorme até o próximo vencimento (ou a próxima
+        sincronização do índice) e finaliza os itens vencidos em transações
+        finalizaAlugueis, enviadas sem aguardar a mineração das anteriores.
+
+        Parâmetros
+        ----------
+            - marketplace (MarketplaceAluguel): Marketplace usado para enviar as finalizações
+            - indice (IndiceMarketplace): Índice que alimenta a fila de aluguéis
+            - intervalo_sincronizacao (float): Tempo máximo em segundos entre duas sincronizações do índice
+            - margem (int): Segundos somados ao prazo, cobrindo a diferença entre o relógio local e o da rede
+            - tamanho_lote (None | int): Quantidade de itens por transação. Caso seja None,
+            é calculada pelo limite de gás do bloco
+            - espera_falha (float): Tempo em segundos até uma nova tentativa de um item que falhou
+
+        Atributos
+        ----------
+            - marketplace (MarketplaceAluguel): Marketplace usado para enviar as finalizações
+            - indice (IndiceMarketplace): Índice que alimenta a fila de aluguéis
+            - intervalo_sincronizacao (float): Tempo máximo em segundos entre duas sincronizações do índice
+            - margem (int): Segundos somados ao prazo de cada aluguel
+            - tamanho_lote (None | int): Quantidade de itens por transação
+            - espera_falha (float): Tempo em segundos até uma nova tentativa de um item que falhou
+            - finalizados (int): Quantidade de aluguéis finalizados pelo coletor
+            - falhas (int): Quantidade de finalizações que falharam
+            - lotes_enviados (int): Quantidade de transações enviadas
+    '''
+
+    def __init__(self, marketplace : MarketplaceAluguel, indice : IndiceMarketplace,
+                 intervalo_sincronizacao : float = 5.0, margem : int = 2,
+                 tamanho_lote : int = None, espera_falha : float = 30.0):
+        self.marketplace = marketplace
+        self.indice = indice
+        self.intervalo_sincronizacao = intervalo_sincronizacao
+        self.margem = margem
+        self.tamanho_lote = tamanho_lote
+        self.espera_falha = espera_falha
+        self.finalizados = 0
+        self.falhas = 0
+        self.lotes_enviados = 0
+        # Fila de (instante da tentativa, itemId); entradas obsoletas são descartadas ao sair da fila
+        self._fila = []
+        # Prazo atual de cada aluguel agendado
+        self._expiracoes = {}
+        self._em_andamento = set()
+        self._trava = threading.Lock()
+        self._acorda = threading.Event()
+        self._parar = threading.Event()
+        self._thread = None
+        self.indice.registraOuvinte(self._aoAlterarItem)
+
+    def _agenda(self, itemId : int, expiraEm : int, quando : float = None):
+        # Deve ser chamado com a trava adquirida
+        self._expiracoes[itemId] = expiraEm
+        quando = expiraEm + self.margem if quando is None else quando
+        heapq.heappush(self._fila, (quando, itemId))
+        if self._fila[0] == (quando, itemId):
+            # O novo item vence antes do instante em que a thread iria acordar
+            self._acorda.set()
+
+    def _aoAlterarItem(self, evento : str, item : tuple):
+        with self._trava:
+            if evento == 'alugado':
+                self._agenda(item[0], item[7])
+            elif evento == 'finalizado':
+                self._expiracoes.pop(item[0], None)
+
+    def inicia(self):
+        '''
+            Sincroniza o índice, carrega os aluguéis já indexados e inicia a
+            thread do coletor.
+        '''
+        if self._thread is not None:
+            return
+        self.indice.sincroniza()
+        # Itens alugados salvos em execuções anteriores não geram novos eventos
+        with self._trava:
+            for item in self.indice.armazem.expiradosEAlugados(2 ** 63 - 1):
+                if item[0] not in self._expiracoes:
+                    self._agenda(item[0], item[7])
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._executa, name="coletor-alugueis", daemon=True)
+        self._thread.start()
+
+    def para(self, timeout : float = None):
+        '''
+            Interrompe a thread do coletor. Transações já enviadas continuam
+            sendo acompanhadas pelo rastreador de recibos.
+
+            Parâmetros
+            ----------
+                - timeout (None | float): Tempo máximo de espera pelo término da thread.
+        '''
+        self._parar.set()
+        self._acorda.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _executa(self):
+        proxima_sincronizacao = time.time() + self.intervalo_sincronizacao
+        while not self._parar.is_set():
+            agora = time.time()
+            if agora >= proxima_sincronizacao:
+                try:
+                    self.indice.sincroniza()
+                except Exception as e:
+                    print(e)
+                proxima_sincronizacao = time.time() + self.intervalo_sincronizacao
+            vencidos = self._retiraVencidos(time.time())
+            if vencidos:
+                self._envia(vencidos)
+            with self._trava:
+                despertar = min(proxima_sincronizacao, self._fila[0][0]) if self._fila else proxima_sincronizacao
+                self._acorda.clear()
+            self._acorda.wait(max(0.0, despertar - time.time()))
+
+    def _retiraVencidos(self, agora : float):
+        vencidos = []
+        with self._trava:
+            while self._fila and self._fila[0][0] <= agora:
+                _, item_id = heapq.heappop(self._fila)
+                if item_id in self._expiracoes and item_id not in self._em_andamento:
+                    self._em_andamento.add(item_id)
+                    vencidos.append(item_id)
+        return vencidos
+
+    def _envia(self, itemIds : list):
+        lotes = self.marketplace.finalizaAlugueis(itemIds, self.tamanho_lote, aguardar=False)
+        if lotes is None:
+            self._reagenda(itemIds)
+            return
+        enviados = set()
+        for ids, pendente in lotes:
+            enviados.update(ids)
+            self.lotes_enviados += 1
+            pendente.add_done_callback(partial(self._aoConcluirLote, ids))
+        # Itens de lotes que nem chegaram a ser enviados
+        self._reagenda([item_id for item_id in itemIds if item_id not in enviados])
+
+    def _aoConcluirLote(self, ids : list, pendente):
+        try:
+            resultados = pendente.result()
+        except Exception as e:
+            print(e)
+            resultados = {}
+        with self._trava:
+            for item_id in ids:
+                if resultados.get(item_id):
+                    self.finalizados += 1
+                    self._em_andamento.discard(item_id)
+                    self._expiracoes.pop(item_id, None)
+        # Itens que falharam voltam para a fila; os já devolvidos pelo locatário
+        # saem dela quando o índice processar a transferência
+        self._reagenda([item_id for item_id in ids if not resultados.get(item_id)])
+
+    def _reagenda(self, itemIds : list):
+        if not itemIds:
+            return
+        quando = time.time() + self.espera_falha
+        with self._trava:
+            for item_id in itemIds:
+                self.falhas += 1
+                self._em_andamento.discard(item_id)
+                if item_id in self._expiracoes:
+                    self._agenda(item_id, self._expiracoes[item_id], quando)
+
+    def metricas(self, agora : float = None):
+        '''
+            Retorna as métricas do coletor.
+
+            Parâmetros
+            ----------
+                - agora (None | float): Instante de referência. Caso seja None,
+                utiliza o horário atual.
+
+            Retorno
+            -------
+                - metricas (dict): Aluguéis agendados, backlog (vencidos e ainda
+                não finalizados), itens em andamento, atraso em segundos do
+                aluguel vencido mais antigo e os contadores do coletor.
+        '''
+        agora = time.time() if agora is None else agora
+        with self._trava:
+            vencidos = [expira for expira in self._expiracoes.values() if expira <= agora]
+            return {
+                'agendados': len(self._expiracoes),
+                'backlog': len(vencidos),
+                'em_andamento': len(self._em_andamento),
+                'atraso_segundos': agora - min(vencidos) if vencidos else 0.0,
+                'finalizados': self.finalizados,
+                'falhas': self.falhas,
+                'lotes_enviados': self.lotes_enviados
+            }
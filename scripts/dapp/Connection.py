@@ -1,5 +1,10 @@
 from web3 import Web3
 from web3.eth import Contract
+from dapp.GerenciadorNonce import GerenciadorNonce
+from dapp.RastreadorRecibos import RastreadorRecibos
+from dapp.PoolProvedores import PoolProvedores
+from dapp.CacheTTL import CacheTTL
+from dapp.Instrumentacao import Instrumentacao
 
 class Connection:
     '''
@@ -11,25 +16,47 @@ class Connection:
             - provider (str): Network Provider URL (e.g. Ganache)
             - address (str): Contract address
             - abi (dict): Contract ABI
+            - nonce_manager (GerenciadorNonce | None): Nonce manager. If None, the
+            one shared by every connection to the same provider is used.
+            - receipt_tracker (RastreadorRecibos | None): Receipt tracker. If None, the
+            one shared by every connection to the same provider is used.
+            - pool_size (int): Maximum keep-alive connections of the shared HTTP session
         
         Attributes
         ----------
             - provider (str): Network Provider URL (e.g. Ganache)
             - contract_address (str): Contract address
             - contract_abi (dict): Contract ABI
-            - web3 (Web3): Web3 instance
+            - pool_size (int): Maximum keep-alive connections of the shared HTTP session
+            - web3 (Web3): Web3 instance, shared by every connection to the same provider
             - contract (Contract): Smart Contract instance
+            - nonce_manager (GerenciadorNonce): Per-account nonce allocator
+            - receipt_tracker (RastreadorRecibos): Resolves pending transactions
+            - cache (CacheTTL): Cache of slowly-changing reads, shared per provider
+            - instrumentacao (Instrumentacao): RPC and wrapper method metrics, shared per provider
+            - pool (PoolProvedores): Objects shared by every connection to the same provider
     '''
     provider : str
     contract_address : str
     contract_abi : dict
     web3 : Web3
     contract : Contract
+    nonce_manager : GerenciadorNonce
+    receipt_tracker : RastreadorRecibos
+    pool_size : int
+    cache : CacheTTL
+    instrumentacao : Instrumentacao
+    pool : PoolProvedores
 
-    def __init__(self, provider : str, address : str, abi : dict):
+    def __init__(self, provider : str, address : str, abi : dict,
+                 nonce_manager : GerenciadorNonce = None, receipt_tracker : RastreadorRecibos = None,
+                 pool_size : int = 20):
         self.provider = provider
         self.contract_address = address
         self.contract_abi = abi
+        self.nonce_manager = nonce_manager
+        self.receipt_tracker = receipt_tracker
+        self.pool_size = pool_size
     
     def executeConnection(self):
         '''
@@ -50,14 +77,23 @@ class Connection:
     def connectNetwork(self):
         '''
             Connects the provider and returns the status of the connection.
+            The Web3 instance, its HTTP session and the connection check are
+            shared by every connection to the same provider.
 
             Returns
             -------
                 - status (bool): True if the connection was well-success or False is not.
         '''
         try:
-            self.web3 = Web3(Web3.HTTPProvider(self.provider))
-            return self.web3.is_connected()
+            pool = self.pool = PoolProvedores.obtem(self.provider, self.pool_size)
+            self.web3 = pool.getWeb3()
+            if self.nonce_manager is None:
+                self.nonce_manager = pool.getNonceManager()
+            if self.receipt_tracker is None:
+                self.receipt_tracker = pool.getReceiptTracker()
+            self.cache = pool.getCache()
+            self.instrumentacao = pool.getInstrumentacao()
+            return pool.estaConectado()
         except Exception as e:
             print(e)
             return False
@@ -71,7 +107,9 @@ class Connection:
                 - status (bool): True if the connection was well-success or False is not.
         '''
         try:
-            self.contract = self.web3.eth.contract(address=self.contract_address, abi=self.contract_abi)
+            # Reaproveita o objeto já criado por outra conexão ao mesmo contrato
+            self.contract = PoolProvedores.obtem(self.provider, self.pool_size).contrato(self.contract_address,
+                                                                                      self.contract_abi)
             return True
         except Exception as e:
             print(e)
@@ -95,4 +133,55 @@ class Connection:
             -------
                 - contract (Contract): Contract connection.
         '''
-        return self.contract
\ No newline at end of file
+        return self.contract
+    
+    def getNonceManager(self):
+        '''
+            Returns the nonce manager.
+
+            Returns
+            -------
+                - nonce_manager (GerenciadorNonce): Per-account nonce allocator.
+        '''
+        return self.nonce_manager
+    
+    def getReceiptTracker(self):
+        '''
+            Returns the receipt tracker.
+
+            Returns
+            -------
+                - receipt_tracker (RastreadorRecibos): Resolves pending transactions.
+        '''
+        return self.receipt_tracker
+    
+    def getCache(self):
+        '''
+            Returns the cache of slowly-changing reads.
+
+            Returns
+            -------
+                - cache (CacheTTL): Cache shared by every connection to the same provider.
+        '''
+        return self.cache
+    
+    def getInstrumentacao(self):
+        '''
+            Returns the RPC instrumentation.
+
+            Returns
+            -------
+                - instrumentacao (Instrumentacao): Metrics shared by every connection to the same provider.
+        '''
+        return self.instrumentacao
+
+    def getPool(self):
+        '''
+            Returns the provider pool.
+
+            Returns
+            -------
+                - pool (PoolProvedores): Objects shared by every connection to the same provider,
+                also used to send JSON-RPC batch requests.
+        '''
+        return self.pool
@@ -0,0 +1,159 @@
+import threading
+from eth_abi import encode
+from eth_account import Account
+from eth_account._utils.signing import sign_transaction_dict
+from eth_account.datastructures import SignedTransaction
+from eth_keys import keys
+from eth_utils import keccak
+from hexbytes import HexBytes
+from web3 import Web3
+
+def assinaTransacao(chave : keys.PrivateKey, tx : dict):
+    '''
+        Assina uma transação com uma chave já derivada, sem recalcular a
+        chave pública e o endereço a cada assinatura (como Account.sign_transaction).
+
+        Parâmetros
+        ----------
+            - chave (PrivateKey): Chave privada do eth-keys, criada uma única vez por conta.
+            - tx (dict): Transação sem o campo 'from'.
+
+        Retorno
+        -------
+            - signed_tx (SignedTransaction): Transação assinada.
+    '''
+    v, r, s, codificada = sign_transaction_dict(chave, tx)
+    return SignedTransaction(rawTransaction=HexBytes(codificada), hash=HexBytes(keccak(codificada)), r=r, s=s, v=v)
+
+class ConstrutorTransacao:
+    '''
+        Cria um novo objeto ConstrutorTransacao. Monta e assina transações
+        localmente, sem requisições à rede: a conta é derivada da chave privada
+        uma única vez, o chain id e os seletores das funções ficam guardados e
+        o gás de cada função é estimado apenas na primeira transação com cada
+        tamanho de calldata (argumentos dinâmicos maiores consomem mais gás).
+
+        Parâmetros
+        ----------
+            - web3 (Web3): Instância Web3, usada apenas na calibração do gás
+            - pk (str): Chave privada da conta
+            - chain_id (int): Identificador da rede
+            - gas_templates (None | dict): Gás fixo por nome de função, dispensando a calibração
+            - margem_gas (float): Multiplicador aplicado ao gás estimado na calibração
+
+        Atributos
+        ----------
+            - web3 (Web3): Instância Web3, usada apenas na calibração do gás
+            - conta (LocalAccount): Conta derivada da chave privada
+            - chain_id (int): Identificador da rede
+            - gas_templates (dict): Gás por nome de função (fixo) ou por nome de função e
+            tamanho da calldata (calibrado)
+            - margem_gas (float): Multiplicador aplicado ao gás estimado na calibração
+    '''
+
+    def __init__(self, web3 : Web3, pk : str, chain_id : int, gas_templates : dict = None, margem_gas : float = 1.25):
+        self.web3 = web3
+        self.conta = Account.from_key(pk)
+        # A chave pública é derivada aqui, uma única vez, e não a cada assinatura
+        self._chave = keys.PrivateKey(self.conta.key)
+        self.chain_id = chain_id
+        self.gas_templates = dict(gas_templates or {})
+        self.margem_gas = margem_gas
+        self._seletores = {}
+        self._trava = threading.Lock()
+
+    def _seletor(self, funcao):
+        # Seletor e tipos dos argumentos são calculados uma vez por função do contrato
+        chave = (funcao.address, funcao.abi['name'], len(funcao.abi['inputs']))
+        if chave not in self._seletores:
+            tipos = [entrada['type'] for entrada in funcao.abi['inputs']]
+            assinatura = "{}({})".format(funcao.abi['name'], ",".join(tipos))
+            self._seletores[chave] = (Web3.keccak(text=assinatura)[:4], tipos)
+        return self._seletores[chave]
+
+    def codifica(self, funcao):
+        '''
+            Codifica a chamada de uma função do contrato (campo data da transação).
+
+            Parâmetros
+            ----------
+                - funcao (ContractFunction): Função do contrato já com os argumentos.
+
+            Retorno
+            -------
+                - data (bytes): Seletor da função seguido dos argumentos codificados.
+        '''
+        seletor, tipos = self._seletor(funcao)
+        return seletor + encode(tipos, list(funcao.args))
+
+    def calibraGas(self, funcao, transacao : dict):
+        '''
+            Estima o gás de uma função uma única vez para cada tamanho de
+            calldata e o guarda como template. Um gás fixo informado pelo nome
+            da função dispensa a estimativa.
+
+            Parâmetros
+            ----------
+                - funcao (ContractFunction): Função do contrato já com os argumentos.
+                - transacao (dict): Transação usada na estimativa.
+
+            Retorno
+            -------
+                - gas (int): Gás do template da função.
+        '''
+        nome = funcao.abi['name']
+        chave = (nome, len(transacao['data']))
+        with self._trava:
+            if nome in self.gas_templates:
+                return self.gas_templates[nome]
+            if chave not in self.gas_templates:
+                estimativa = self.web3.eth.estimate_gas({
+                    'from': transacao['from'],
+                    'to': transacao['to'],
+                    'data': transacao['data'],
+                    'value': transacao['value']
+                })
+                self.gas_templates[chave] = int(estimativa * self.margem_gas)
+            return self.gas_templates[chave]
+
+    def constroi(self, funcao, parametros : dict, nonce : int):
+        '''
+            Monta uma transação sem consultar a rede (exceto na calibração do gás).
+
+            Parâmetros
+            ----------
+                - funcao (ContractFunction): Função do contrato já com os argumentos.
+                - parametros (dict): Parâmetros da transação. 'gasPrice' é obrigatório;
+                'value' e 'gas' são opcionais.
+                - nonce (int): Nonce da transação.
+
+            Retorno
+            -------
+                - tx (dict): Transação pronta para ser assinada.
+        '''
+        tx = {
+            'from': self.conta.address,
+            'to': funcao.address,
+            'data': self.codifica(funcao),
+            'value': parametros.get('value', 0),
+            'gasPrice': parametros['gasPrice'],
+            'nonce': nonce,
+            'chainId': self.chain_id
+        }
+        tx['gas'] = parametros['gas'] if 'gas' in parametros else self.calibraGas(funcao, tx)
+        del tx['from']
+        return tx
+
+    def assina(self, tx : dict):
+        '''
+            Assina uma transação com a conta já derivada.
+
+            Parâmetros
+            ----------
+                - tx (dict): Transação montada por constroi.
+
+            Retorno
+            -------
+                - signed_tx (SignedTransaction): Transação assinada.
+        '''
+        return assinaTransacao(self._chave, tx)
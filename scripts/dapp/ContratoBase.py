@@ -0,0 +1,203 @@
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from web3.exceptions import TimeExhausted
+from dapp.Connection import Connection
+from dapp.LoteLeituras import LoteLeituras
+from dapp.ConstrutorTransacao import ConstrutorTransacao
+from dapp.FluxoEventos import FluxoEventos
+from dapp.Instrumentacao import instrumenta
+
+class ContratoBase:
+    '''
+        Cria um novo objeto ContratoBase. Contém os métodos comuns aos
+        objetos que mapeiam os contratos em solidity.
+
+        Parâmetros
+        ----------
+            - pubk (str): Chave pública da conta
+            - pk (str): Chave privada da conta
+            - connection (Connection): Instância da conexão do web3 e do contrato
+
+        Atributos
+        ----------
+            - public_key (str): Chave pública da conta
+            - private_key (str): Chave privada da conta
+            - web3 (Web3): Instância Web3
+            - contract (Contract): Instância do contrato inteligente
+            - nonces (GerenciadorNonce): Gerenciador de nonces compartilhado entre as conexões
+            - recibos (RastreadorRecibos): Rastreador de recibos compartilhado entre as conexões
+            - cache (CacheTTL): Cache das leituras que mudam pouco, compartilhado entre as conexões
+            - instrumentacao (Instrumentacao): Medições das requisições, atribuídas aos métodos
+            decorados com instrumenta
+            - pool (PoolProvedores): Objetos compartilhados da rede, que também envia as leituras em lote
+            - construtor (None | ConstrutorTransacao): Monta e assina as transações localmente,
+            criado no primeiro envio
+            - fluxo (None | FluxoEventos): Fluxo de eventos que acompanha as transações no
+            lugar do rastreador de recibos
+    '''
+
+    # Quantidade máxima de reenvios após um erro de nonce
+    TENTATIVAS_NONCE = 3
+    # Tempo de vida do preço do gás no cache, que também expira a cada novo bloco
+    TTL_GAS_PRICE = 15.0
+    # Tempo máximo de espera pela mineração nos métodos que aguardam a transação
+    # (pouco acima do prazo do rastreador, que resolve a transação com TimeExhausted)
+    TEMPO_LIMITE_RECIBO = 125.0
+
+    def __init__(self, pubk : str, pk : str, connection : Connection):
+        self.public_key = pubk
+        self.private_key = pk
+        self.web3 = connection.getWeb3Connection()
+        self.contract = connection.getContractConnection()
+        self.nonces = connection.getNonceManager()
+        self.recibos = connection.getReceiptTracker()
+        self.cache = connection.getCache()
+        self.instrumentacao = connection.getInstrumentacao()
+        self.pool = connection.getPool()
+        self.construtor = None
+        self.fluxo = None
+
+    def usaFluxo(self, fluxo : FluxoEventos):
+        '''
+            Passa a acompanhar as transações que emitem eventos pelo fluxo de
+            eventos, sem consultar os seus recibos.
+
+            Parâmetros
+            ----------
+                - fluxo (None | FluxoEventos): Fluxo de eventos ou None para voltar
+                a utilizar o rastreador de recibos.
+        '''
+        self.fluxo = fluxo
+
+    @instrumenta
+    def getGasPrice(self):
+        '''
+            Resgata o preço do gás, guardado em cache por alguns segundos
+            ou até o próximo bloco.
+
+            Retorno
+            -------
+                - gas_price (int): Preço do gás em Wei.
+        '''
+        return self.cache.obtem("gas_price", lambda: self.web3.eth.gas_price,
+                                ttl=self.TTL_GAS_PRICE, por_bloco=True)
+
+    @instrumenta
+    def getChainId(self):
+        '''
+            Resgata o chain id da rede, consultado uma única vez.
+
+            Retorno
+            -------
+                - chain_id (int): Identificador da rede.
+        '''
+        return self.cache.obtem("chain_id", lambda: self.web3.eth.chain_id, ttl=float("inf"))
+
+    def getConstrutor(self):
+        '''
+            Retorna o construtor de transações da conta, criando-o no primeiro uso.
+
+            Retorno
+            -------
+                - construtor (ConstrutorTransacao): Construtor de transações da conta.
+        '''
+        if self.construtor is None:
+            self.construtor = ConstrutorTransacao(self.web3, self.private_key, self.getChainId())
+        return self.construtor
+
+    def _enviaTransacao(self, funcao, parametros : dict):
+        '''
+            Monta, assina e envia uma transação utilizando um nonce reservado
+            localmente. Nenhuma requisição é feita antes do envio, exceto na
+            primeira transação de cada função (calibração do gás). Caso o nó
+            rejeite a transação por erro de nonce, o nonce é sincronizado e a
+            transação é reenviada; nos demais erros o nonce é devolvido.
+
+            Parâmetros
+            ----------
+                - funcao (ContractFunction): Função do contrato já com os argumentos.
+                - parametros (dict): Parâmetros da transação, exceto o nonce. 'gasPrice'
+                é obrigatório; 'value' e 'gas' são opcionais.
+
+            Retorno
+            -------
+                - tx_hash (HexBytes): Hash da transação enviada.
+        '''
+        for tentativa in range(self.TENTATIVAS_NONCE):
+            construtor = self.getConstrutor()
+            nonce = self.nonces.proximoNonce(self.public_key)
+            try:
+                # Cria a transação localmente, sem estimar o gás a cada envio
+                tx = construtor.constroi(funcao, parametros, nonce)
+                # Assina a transação com a conta já derivada da chave privada
+                signed_tx = construtor.assina(tx)
+            except Exception:
+                self.nonces.devolve(self.public_key, nonce)
+                raise
+            try:
+                # Resgata o hash da transação
+                tx_hash = self.web3.eth.send_raw_transaction(signed_tx.rawTransaction)
+            except Exception as e:
+                if not self.nonces.erroDeNonce(e):
+                    # A transação não foi aceita, então o nonce reservado volta a ficar livre
+                    self.nonces.devolve(self.public_key, nonce)
+                    raise
+                # O nonce já está em uso na rede: a reserva é descartada e o contador sincronizado
+                self.nonces.confirma(self.public_key)
+                self.nonces.sincroniza(self.public_key)
+                if tentativa == self.TENTATIVAS_NONCE - 1:
+                    raise
+                continue
+            self.nonces.confirma(self.public_key)
+            return tx_hash
+
+    def _submeteTransacao(self, funcao, parametros : dict, processa = None, evento : type = None, converte = None):
+        '''
+            Envia uma transação e a registra no rastreador de recibos, sem
+            aguardar a sua mineração. Caso exista um fluxo de eventos e o evento
+            esperado seja informado, a transação é acompanhada pelo fluxo.
+
+            Parâmetros
+            ----------
+                - funcao (ContractFunction): Função do contrato já com os argumentos.
+                - parametros (dict): Parâmetros da transação, exceto o nonce.
+                - processa (None | callable): Função aplicada ao recibo para gerar o resultado.
+                - evento (None | type): Tipo do registro do fluxo emitido pela transação.
+                - converte (None | callable): Função aplicada ao registro do fluxo para gerar o resultado.
+
+            Retorno
+            -------
+                - pendente (Future): Transação pendente, resolvida com o resultado de processa
+                ou de converte.
+        '''
+        tx_hash = self._enviaTransacao(funcao, parametros)
+        if self.fluxo is not None and evento is not None:
+            return self.fluxo.aguarda(tx_hash, evento, converte)
+        return self.recibos.rastreia(tx_hash, processa)
+
+    def _aguarda(self, pendente):
+        '''
+            Aguarda uma transação pendente por no máximo TEMPO_LIMITE_RECIBO segundos.
+
+            Parâmetros
+            ----------
+                - pendente (Future): Transação pendente retornada por _submeteTransacao.
+
+            Retorno
+            -------
+                - resultado: Resultado da transação pendente.
+        '''
+        try:
+            return pendente.result(timeout=self.TEMPO_LIMITE_RECIBO)
+        except FuturesTimeoutError:
+            raise TimeExhausted("Transação {} não foi minerada em {} segundos!".format(
+                getattr(pendente, "tx_hash", ""), self.TEMPO_LIMITE_RECIBO))
+
+    def novoLote(self):
+        '''
+            Cria um lote de leituras que usa a conta deste objeto como 'from'.
+
+            Retorno
+            -------
+                - lote (LoteLeituras): Lote vazio de chamadas de leitura.
+        '''
+        return LoteLeituras(self.web3, self.public_key, self.pool)
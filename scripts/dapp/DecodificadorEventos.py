@@ -0,0 +1,135 @@
+from typing import NamedTuple
+from web3 import Web3
+from dapp.RastreadorRecibos import normalizaHash
+
+class EventoItemCriado(NamedTuple):
+    '''
+        Evento ItemCriado do marketplace.
+    '''
+    itemId : int
+    statusAlugado : bool
+    contratoNFT : str
+    tokenId : int
+    vendedor : str
+    locatario : str
+    preco : int
+    expiraEm : int
+    bloco : int
+    indice_log : int
+    tx_hash : str
+
+class EventoTokenId(NamedTuple):
+    '''
+        Evento TokenId do contrato de NFTs, emitido a cada NFT criado.
+    '''
+    tokenId : int
+    contrato : str
+    bloco : int
+    indice_log : int
+    tx_hash : str
+
+class EventoTransfer(NamedTuple):
+    '''
+        Evento Transfer (ERC721) do contrato de NFTs.
+    '''
+    contrato : str
+    de : str
+    para : str
+    tokenId : int
+    bloco : int
+    indice_log : int
+    tx_hash : str
+
+class FimBloco(NamedTuple):
+    '''
+        Indica que todos os eventos até o bloco informado já foram entregues.
+    '''
+    bloco : int
+
+# Tópico do evento Transfer do padrão ERC721
+TOPICO_TRANSFER = bytes(Web3.keccak(text="Transfer(address,address,uint256)"))
+# Trechos das mensagens de erro dos nós quando uma consulta de logs retorna resultados demais
+ERROS_LIMITE_LOGS = ("too many", "limit exceeded", "query returned more than", "response size exceeded")
+
+class DecodificadorEventos:
+    '''
+        Cria um novo objeto DecodificadorEventos. Monta o filtro de logs dos
+        eventos ItemCriado do marketplace e TokenId e Transfer do contrato de
+        NFTs e converte cada log recebido no registro tipado correspondente.
+
+        Parâmetros
+        ----------
+            - contract (Contract): Instância do contrato do marketplace
+            - contract_nft (Contract): Instância do contrato de NFTs
+
+        Atributos
+        ----------
+            - contract (Contract): Instância do contrato do marketplace
+            - contract_nft (Contract): Instância do contrato de NFTs
+    '''
+
+    def __init__(self, contract, contract_nft):
+        self.contract = contract
+        self.contract_nft = contract_nft
+        # Decodificador de cada evento, indexado pelo seu tópico
+        self._topicos = {
+            self._topico(self.contract.events.ItemCriado().abi): self._decodificaItemCriado,
+            self._topico(self.contract_nft.events.TokenId().abi): self._decodificaTokenId,
+            TOPICO_TRANSFER: self._decodificaTransfer
+        }
+
+    @staticmethod
+    def _topico(abi_evento : dict):
+        tipos = ",".join(entrada['type'] for entrada in abi_evento['inputs'])
+        return bytes(Web3.keccak(text="{}({})".format(abi_evento['name'], tipos)))
+
+    def filtro(self):
+        '''
+            Retorna o filtro de logs (endereços e tópicos) dos eventos decodificados.
+
+            Retorno
+            -------
+                - filtro (dict): Filtro aceito por eth_getLogs e eth_subscribe.
+        '''
+        return {
+            'address': [self.contract.address, self.contract_nft.address],
+            'topics': [[Web3.to_hex(topico) for topico in self._topicos]]
+        }
+
+    def decodifica(self, log):
+        '''
+            Converte um log no registro tipado do seu evento.
+
+            Parâmetros
+            ----------
+                - log (AttributeDict): Log retornado por eth_getLogs.
+
+            Retorno
+            -------
+                - registro (EventoItemCriado | EventoTokenId | EventoTransfer): Registro do evento.
+        '''
+        return self._topicos[bytes(log['topics'][0])](log)
+
+    def _decodificaItemCriado(self, log):
+        args = self.contract.events.ItemCriado().process_log(log)['args']
+        return EventoItemCriado(
+            args['itemId'], args['statusAlugado'], args['contratoNFT'], args['tokenId'], args['vendedor'],
+            args['locatario'], args['preco'], args['expiraEm'],
+            log['blockNumber'], log['logIndex'], normalizaHash(log['transactionHash'])
+        )
+
+    def _decodificaTokenId(self, log):
+        args = self.contract_nft.events.TokenId().process_log(log)['args']
+        return EventoTokenId(
+            args['token_id'], log['address'],
+            log['blockNumber'], log['logIndex'], normalizaHash(log['transactionHash'])
+        )
+
+    def _decodificaTransfer(self, log):
+        return EventoTransfer(
+            log['address'],
+            Web3.to_checksum_address(log['topics'][1][-20:]),
+            Web3.to_checksum_address(log['topics'][2][-20:]),
+            Web3.to_int(log['topics'][3]),
+            log['blockNumber'], log['logIndex'], normalizaHash(log['transactionHash'])
+        )
@@ -0,0 +1,291 @@
+import json, asyncio, threading
+from concurrent.futures import Future
+from web3 import Web3
+from web3._utils.method_formatters import log_entry_formatter
+from dapp.RastreadorRecibos import normalizaHash, TransacaoRevertida
+from dapp.DecodificadorEventos import (DecodificadorEventos, EventoItemCriado, EventoTokenId,
+                                       EventoTransfer, FimBloco, ERROS_LIMITE_LOGS)
+
+# Blocos em que os registros entregues continuam disponíveis para aguarda
+BLOCOS_RECENTES = 128
+
+class FluxoEventos:
+    '''
+        Cria um novo objeto FluxoEventos. Acompanha, em uma única thread, os
+        eventos ItemCriado do marketplace e TokenId e Transfer do contrato de
+        NFTs, decodificados em registros tipados e repassados a todos os
+        consumidores inscritos.
+
+        Os eventos são recebidos por WebSocket (eth_subscribe) quando uma URL
+        ws:// é informada e o pacote websockets está disponível. Caso contrário,
+        ou se a conexão cair, os eventos são consultados por eth_getLogs em
+        janelas de blocos que crescem enquanto as consultas são pequenas e
+        diminuem quando o nó recusa a quantidade de resultados.
+
+        Transações enviadas podem ser acompanhadas pelo próprio fluxo (aguarda),
+        dispensando a consulta de recibos. O recibo só é consultado quando o
+        evento esperado não aparece depois de alguns blocos, para detectar
+        transações revertidas.
+
+        Parâmetros
+        ----------
+            - web3 (Web3): Instância Web3
+            - contract (Contract): Instância do contrato do marketplace
+            - contract_nft (Contract): Instância do contrato de NFTs
+            - bloco_inicial (None | int): Primeiro bloco acompanhado. Caso seja None,
+            utiliza o bloco atual
+            - url_ws (None | str): URL WebSocket do nó
+            - intervalo (float): Intervalo em segundos entre as consultas de logs
+            - janela_inicial (int): Quantidade inicial de blocos por consulta de logs
+            - janela_maxima (int): Quantidade máxima de blocos por consulta de logs
+            - blocos_verificacao (int): Blocos sem o evento esperado até a consulta do recibo
+
+        Atributos
+        ----------
+            - web3 (Web3): Instância Web3
+            - contract (Contract): Instância do contrato do marketplace
+            - contract_nft (Contract): Instância do contrato de NFTs
+            - decodificador (DecodificadorEventos): Decodificador dos eventos acompanhados
+            - url_ws (None | str): URL WebSocket do nó
+            - intervalo (float): Intervalo em segundos entre as consultas de logs
+            - janela (int): Quantidade atual de blocos por consulta de logs
+            - janela_maxima (int): Quantidade máxima de blocos por consulta de logs
+            - blocos_verificacao (int): Blocos sem o evento esperado até a consulta do recibo
+            - ultimo_bloco (int): Último bloco com todos os eventos entregues
+            - modo (None | str): 'websocket' ou 'sondagem', conforme o transporte em uso
+    '''
+
+    def __init__(self, web3 : Web3, contract, contract_nft, bloco_inicial : int = None, url_ws : str = None,
+                 intervalo : float = 1.0, janela_inicial : int = 100, janela_maxima : int = 5000,
+                 blocos_verificacao : int = 3):
+        self.web3 = web3
+        self.contract = contract
+        self.contract_nft = contract_nft
+        self.url_ws = url_ws
+        self.intervalo = intervalo
+        self.janela = janela_inicial
+        self.janela_maxima = janela_maxima
+        self.blocos_verificacao = blocos_verificacao
+        self.ultimo_bloco = None if bloco_inicial is None else bloco_inicial - 1
+        self.modo = None
+        self.decodificador = DecodificadorEventos(contract, contract_nft)
+        self._consumidores = []
+        # Transações aguardadas: hash -> lista de (tipo, converte, pendente, bloco da última verificação)
+        self._aguardando = {}
+        # Posições (bloco, índice do log) já entregues, evitando duplicatas na troca de transporte
+        self._entregues = set()
+        # Registros dos últimos blocos, indexados pelo hash da transação
+        self._recentes = {}
+        self._trava = threading.Lock()
+        self._parar = threading.Event()
+        self._thread = None
+
+    def _filtro(self):
+        return dict(self.decodificador.filtro())
+
+    def inscreve(self, consumidor, tipos : tuple = None):
+        '''
+            Inscreve um consumidor, chamado com cada registro entregue pelo fluxo.
+
+            Parâmetros
+            ----------
+                - consumidor (callable): Função chamada com cada registro.
+                - tipos (None | tuple): Tipos de registro repassados ao consumidor
+                (EventoItemCriado, EventoTokenId, EventoTransfer, FimBloco). Caso
+                seja None, todos os registros são repassados.
+        '''
+        with self._trava:
+            self._consumidores.append((consumidor, tipos))
+
+    def aguarda(self, tx_hash, tipo : type, converte = None):
+        '''
+            Acompanha uma transação enviada até o fluxo entregar o seu evento.
+
+            Parâmetros
+            ----------
+                - tx_hash (HexBytes | str): Hash da transação.
+                - tipo (type): Tipo do registro esperado (ex.: EventoTokenId).
+                - converte (None | callable): Função aplicada ao registro para gerar o resultado.
+
+            Retorno
+            -------
+                - pendente (Future): Resolvido com o registro (ou o resultado de
+                converte), ou com TransacaoRevertida caso a transação falhe.
+        '''
+        pendente = Future()
+        pendente.tx_hash = normalizaHash(tx_hash)
+        with self._trava:
+            # A transação pode ter sido minerada antes do registro
+            registro = next((r for r in self._recentes.get(pendente.tx_hash, []) if isinstance(r, tipo)), None)
+            if registro is None:
+                bloco = self.ultimo_bloco if self.ultimo_bloco is not None else -1
+                self._aguardando.setdefault(pendente.tx_hash, []).append((tipo, converte, pendente, bloco))
+                return pendente
+        try:
+            pendente.set_result(converte(registro) if converte else registro)
+        except Exception as e:
+            pendente.set_exception(e)
+        return pendente
+
+    def inicia(self):
+        '''
+            Inicia a thread do fluxo.
+        '''
+        if self._thread is not None:
+            return
+        if self.ultimo_bloco is None:
+            self.ultimo_bloco = self.web3.eth.block_number
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._executa, name="fluxo-eventos", daemon=True)
+        self._thread.start()
+
+    def para(self, timeout : float = None):
+        '''
+            Interrompe a thread do fluxo.
+
+            Parâmetros
+            ----------
+                - timeout (None | float): Tempo máximo de espera pelo término da thread.
+        '''
+        self._parar.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _executa(self):
+        if self.url_ws:
+            try:
+                self.modo = 'websocket'
+                asyncio.run(self._executaWebSocket())
+            except Exception as e:
+                print("Fluxo de eventos por WebSocket indisponível ({}), consultando logs.".format(e))
+        self.modo = 'sondagem'
+        while not self._parar.is_set():
+            try:
+                self._sonda()
+            except Exception as e:
+                print(e)
+            self._parar.wait(self.intervalo)
+
+    async def _executaWebSocket(self):
+        import websockets
+        async with websockets.connect(self.url_ws) as conexao:
+            # Os eventos perdidos antes da inscrição são recuperados por uma consulta de logs
+            await conexao.send(json.dumps({"jsonrpc": "2.0", "id": 1, "method": "eth_subscribe",
+                                           "params": ["logs", self._filtro()]}))
+            await conexao.send(json.dumps({"jsonrpc": "2.0", "id": 2, "method": "eth_subscribe",
+                                           "params": ["newHeads"]}))
+            inscricoes = {}
+            while len(inscricoes) < 2:
+                resposta = json.loads(await conexao.recv())
+                if "error" in resposta:
+                    raise Exception(resposta["error"])
+                if resposta.get("id") in (1, 2):
+                    inscricoes[resposta["result"]] = resposta["id"]
+            await asyncio.get_running_loop().run_in_executor(None, self._sonda)
+            while not self._parar.is_set():
+                try:
+                    mensagem = json.loads(await asyncio.wait_for(conexao.recv(), self.intervalo))
+                except asyncio.TimeoutError:
+                    continue
+                parametros = mensagem.get("params", {})
+                tipo = inscricoes.get(parametros.get("subscription"))
+                if tipo == 1:
+                    log = log_entry_formatter(parametros["result"])
+                    if not log.get('removed') and log['blockNumber'] > self.ultimo_bloco:
+                        self._entrega(self.decodificador.decodifica(log))
+                elif tipo == 2:
+                    # Com um novo bloco, todos os eventos dos blocos anteriores já chegaram
+                    bloco = Web3.to_int(hexstr=parametros["result"]["number"]) - 1
+                    await asyncio.get_running_loop().run_in_executor(None, self._concluiBloco, bloco)
+
+    def _sonda(self):
+        bloco_atual = self.web3.eth.block_number
+        while self.ultimo_bloco < bloco_atual and not self._parar.is_set():
+            inicio = self.ultimo_bloco + 1
+            fim = min(bloco_atual, inicio + self.janela - 1)
+            try:
+                logs = self.web3.eth.get_logs(dict(self._filtro(), fromBlock=inicio, toBlock=fim))
+            except Exception as e:
+                mensagem = str(e).lower()
+                if self.janela > 1 and any(erro in mensagem for erro in ERROS_LIMITE_LOGS):
+                    # O nó recusou a quantidade de resultados: a janela é reduzida pela
+                    # metade e deixa de crescer além do tamanho recusado
+                    self.janela_maxima = self.janela - 1
+                    self.janela = max(1, self.janela // 2)
+                    continue
+                raise
+            for log in logs:
+                self._entrega(self.decodificador.decodifica(log))
+            self._concluiBloco(fim)
+            if len(logs) < self.janela:
+                # Janelas com poucos eventos podem crescer, reduzindo a quantidade de consultas
+                self.janela = min(self.janela_maxima, self.janela * 2)
+
+    def _entrega(self, registro):
+        if not isinstance(registro, FimBloco):
+            posicao = (registro.bloco, registro.indice_log)
+            with self._trava:
+                if posicao in self._entregues:
+                    return
+                self._entregues.add(posicao)
+                self._recentes.setdefault(registro.tx_hash, []).append(registro)
+                aguardando = self._aguardando.get(registro.tx_hash, [])
+                resolvidos = [espera for espera in aguardando if isinstance(registro, espera[0])]
+                for espera in resolvidos:
+                    aguardando.remove(espera)
+                if not aguardando:
+                    self._aguardando.pop(registro.tx_hash, None)
+            for _, converte, pendente, _ in resolvidos:
+                try:
+                    pendente.set_result(converte(registro) if converte else registro)
+                except Exception as e:
+                    pendente.set_exception(e)
+        with self._trava:
+            consumidores = list(self._consumidores)
+        for consumidor, tipos in consumidores:
+            if tipos is None or isinstance(registro, tipos):
+                try:
+                    consumidor(registro)
+                except Exception as e:
+                    print(e)
+
+    def _concluiBloco(self, bloco : int):
+        if bloco <= self.ultimo_bloco:
+            return
+        self.ultimo_bloco = bloco
+        with self._trava:
+            self._entregues = {posicao for posicao in self._entregues if posicao[0] > bloco}
+            self._recentes = {
+                tx_hash: registros for tx_hash, registros in self._recentes.items()
+                if registros[0].bloco > bloco - BLOCOS_RECENTES
+            }
+        self._entrega(FimBloco(bloco))
+        self._verificaAguardando(bloco)
+
+    def _verificaAguardando(self, bloco : int):
+        # Transações cujo evento não apareceu depois de alguns blocos têm o recibo consultado uma vez
+        with self._trava:
+            atrasadas = [
+                tx_hash for tx_hash, esperas in self._aguardando.items()
+                if any(bloco - espera[3] >= self.blocos_verificacao for espera in esperas)
+            ]
+        for tx_hash in atrasadas:
+            try:
+                recibo = self.web3.eth.get_transaction_receipt(tx_hash)
+            except Exception:
+                recibo = None
+            with self._trava:
+                esperas = self._aguardando.get(tx_hash, [])
+                if recibo is not None and (recibo['status'] == 0 or recibo['blockNumber'] <= bloco):
+                    self._aguardando.pop(tx_hash, None)
+                else:
+                    # Ainda não minerada: nova verificação depois de outros blocos
+                    self._aguardando[tx_hash] = [espera[:3] + (bloco,) for espera in esperas]
+                    esperas = []
+            for tipo, _, pendente, _ in esperas:
+                if recibo['status'] == 0:
+                    pendente.set_exception(TransacaoRevertida("Transação {} revertida!".format(tx_hash)))
+                else:
+                    pendente.set_exception(Exception("Evento {} não encontrado na transação {}!".format(
+                        tipo.__name__, tx_hash)))
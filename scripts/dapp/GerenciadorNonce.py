@@ -0,0 +1,190 @@
+import threading
+from web3 import Web3
+
+# Trechos de mensagens de erro dos nós que indicam um nonce local dessincronizado
+ERROS_NONCE = (
+    "nonce too low",
+    "replacement transaction underpriced",
+    "replacement underpriced",
+    "already known",
+    "invalid nonce",
+)
+
+class GerenciadorNonce:
+    '''
+        Cria um novo objeto GerenciadorNonce. Distribui os nonces das contas
+        localmente, permitindo enviar várias transações em sequência sem
+        aguardar a confirmação da anterior.
+
+        Parâmetros
+        ----------
+            - web3 (Web3 | AsyncWeb3): Instância Web3 utilizada para sincronizar os nonces
+
+        Atributos
+        ----------
+            - web3 (Web3 | AsyncWeb3): Instância Web3 utilizada para sincronizar os nonces
+            - nonces (dict): Próximo nonce livre de cada conta
+            - liberados (dict): Nonces devolvidos e ainda não reutilizados de cada conta
+            - reservados (dict): Quantidade de nonces reservados e ainda não confirmados ou devolvidos de cada conta
+    '''
+
+    def __init__(self, web3 : Web3):
+        self.web3 = web3
+        self.nonces = {}
+        self.liberados = {}
+        self.reservados = {}
+        self._confirmacoes = {}
+        self._trava = threading.Lock()
+
+    def _reserva(self, conta : str):
+        # Deve ser chamado com a trava adquirida e o nonce da conta já inicializado
+        liberados = self.liberados.get(conta)
+        if liberados:
+            # Nonces devolvidos são reaproveitados primeiro, do menor para o maior
+            nonce = min(liberados)
+            liberados.remove(nonce)
+        else:
+            nonce = self.nonces[conta]
+            self.nonces[conta] += 1
+        self.reservados[conta] = self.reservados.get(conta, 0) + 1
+        return nonce
+
+    def _ajusta(self, conta : str, rede : int, confirmacoes : int):
+        # Deve ser chamado com a trava adquirida
+        if self.reservados.get(conta, 0) > 0 or self._confirmacoes.get(conta, 0) != confirmacoes:
+            # Ainda há transações em montagem ou envio com nonces já reservados,
+            # ou alguma foi aceita durante a consulta à rede, então o contador
+            # local só pode avançar
+            self.nonces[conta] = max(self.nonces.get(conta, rede), rede)
+            self.liberados[conta] = {nonce for nonce in self.liberados.get(conta, ()) if nonce >= rede}
+        else:
+            self.nonces[conta] = rede
+            self.liberados.pop(conta, None)
+        return self.nonces[conta]
+
+    def proximoNonce(self, conta : str):
+        '''
+            Reserva o próximo nonce de uma conta. Nonces devolvidos são
+            reutilizados antes de um novo ser gerado. Cada reserva deve ser
+            encerrada por confirma (transação aceita pelo nó) ou por devolve
+            (transação não enviada).
+
+            Parâmetros
+            ----------
+                - conta (str): Endereço da conta.
+
+            Retorno
+            -------
+                - nonce (int): Nonce reservado para a próxima transação.
+        '''
+        with self._trava:
+            if conta not in self.nonces:
+                self.nonces[conta] = self.web3.eth.get_transaction_count(conta, 'pending')
+            return self._reserva(conta)
+
+    async def proximoNonceAsync(self, conta : str):
+        '''
+            Versão assíncrona de proximoNonce, para uso com AsyncWeb3.
+
+            Parâmetros
+            ----------
+                - conta (str): Endereço da conta.
+
+            Retorno
+            -------
+                - nonce (int): Nonce reservado para a próxima transação.
+        '''
+        if conta not in self.nonces:
+            inicial = await self.web3.eth.get_transaction_count(conta, 'pending')
+            with self._trava:
+                self.nonces.setdefault(conta, inicial)
+        with self._trava:
+            return self._reserva(conta)
+
+    def sincroniza(self, conta : str):
+        '''
+            Busca novamente na rede o nonce de uma conta. Enquanto houver
+            nonces reservados e ainda não confirmados ou devolvidos, o nonce
+            local apenas avança, para não entregar novamente um nonce em uso.
+
+            Parâmetros
+            ----------
+                - conta (str): Endereço da conta.
+
+            Retorno
+            -------
+                - nonce (int): Próximo nonce livre.
+        '''
+        confirmacoes = self._confirmacoes.get(conta, 0)
+        rede = self.web3.eth.get_transaction_count(conta, 'pending')
+        with self._trava:
+            return self._ajusta(conta, rede, confirmacoes)
+
+    async def sincronizaAsync(self, conta : str):
+        '''
+            Versão assíncrona de sincroniza, para uso com AsyncWeb3.
+
+            Parâmetros
+            ----------
+                - conta (str): Endereço da conta.
+
+            Retorno
+            -------
+                - nonce (int): Próximo nonce livre.
+        '''
+        confirmacoes = self._confirmacoes.get(conta, 0)
+        rede = await self.web3.eth.get_transaction_count(conta, 'pending')
+        with self._trava:
+            return self._ajusta(conta, rede, confirmacoes)
+
+    def confirma(self, conta : str):
+        '''
+            Encerra a reserva de um nonce cuja transação foi aceita pelo nó, ou
+            cujo nonce já estava em uso na rede (erro de nonce).
+
+            Parâmetros
+            ----------
+                - conta (str): Endereço da conta.
+        '''
+        with self._trava:
+            self.reservados[conta] = max(0, self.reservados.get(conta, 0) - 1)
+            self._confirmacoes[conta] = self._confirmacoes.get(conta, 0) + 1
+
+    def devolve(self, conta : str, nonce : int):
+        '''
+            Devolve um nonce que não chegou a ser utilizado (ex.: falha ao montar
+            ou enviar a transação). O nonce passa a ser o próximo entregue por
+            proximoNonce, evitando lacunas na sequência da conta.
+
+            Parâmetros
+            ----------
+                - conta (str): Endereço da conta.
+                - nonce (int): Nonce reservado e não utilizado.
+        '''
+        with self._trava:
+            self.reservados[conta] = max(0, self.reservados.get(conta, 0) - 1)
+            if nonce >= self.nonces.get(conta, 0):
+                # Nonce já descartado por uma sincronização
+                return
+            liberados = self.liberados.setdefault(conta, set())
+            liberados.add(nonce)
+            # Os nonces livres no fim da sequência voltam para o contador
+            while self.nonces[conta] - 1 in liberados:
+                self.nonces[conta] -= 1
+                liberados.remove(self.nonces[conta])
+
+    @staticmethod
+    def erroDeNonce(erro : Exception):
+        '''
+            Indica se um erro retornado pelo nó foi causado por um nonce inválido.
+
+            Parâmetros
+            ----------
+                - erro (Exception): Erro retornado no envio da transação.
+
+            Retorno
+            -------
+                - status (bool): True caso o erro seja de nonce.
+        '''
+        mensagem = str(erro).lower()
+        return any(trecho in mensagem for trecho in ERROS_NONCE)
@@ -0,0 +1,241 @@
+import os, csv, json, time, threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from web3 import Web3
+from dapp.DecodificadorEventos import DecodificadorEventos, ERROS_LIMITE_LOGS
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+# Colunas do arquivo de saída; campos que não pertencem ao evento ficam vazios
+COLUNAS_EVENTOS = ["evento", "bloco", "indice_log", "tx_hash", "contrato", "itemId", "tokenId",
+                   "statusAlugado", "vendedor", "locatario", "de", "para", "preco", "expiraEm"]
+
+def esquemaParquet():
+    '''
+        Retorna o esquema dos arquivos Parquet gerados pelo importador.
+
+        Retorno
+        -------
+            - esquema (pyarrow.Schema): Tipo de cada coluna de COLUNAS_EVENTOS.
+    '''
+    texto, inteiro = pyarrow.string(), pyarrow.int64()
+    tipos = {"bloco": inteiro, "indice_log": inteiro, "itemId": inteiro, "tokenId": inteiro,
+             "expiraEm": inteiro, "statusAlugado": pyarrow.bool_()}
+    return pyarrow.schema([(coluna, tipos.get(coluna, texto)) for coluna in COLUNAS_EVENTOS])
+
+class ImportadorHistorico:
+    '''
+        Cria um novo objeto ImportadorHistorico. Lê todos os eventos ItemCriado,
+        TokenId e Transfer de um intervalo de blocos (por exemplo, desde a
+        implantação do marketplace) e os grava decodificados em um arquivo.
+
+        O intervalo é dividido em janelas consultadas em paralelo por um número
+        limitado de threads. Uma janela recusada pelo nó por excesso de
+        resultados é dividida ao meio, e as próximas passam a usar o novo
+        tamanho. Os eventos são gravados em ordem de bloco e o progresso é
+        salvo em um checkpoint JSON após cada gravação, permitindo retomar uma
+        execução interrompida.
+
+        A saída é um CSV compacto ou, com o pacote pyarrow instalado, um
+        diretório com arquivos Parquet.
+
+        Parâmetros
+        ----------
+            - web3 (Web3): Instância Web3
+            - contract (Contract): Instância do contrato do marketplace
+            - contract_nft (Contract): Instância do contrato de NFTs
+            - caminho_saida (str): Arquivo CSV ou diretório Parquet de saída
+            - caminho_checkpoint (None | str): Arquivo do checkpoint. Caso seja None,
+            utiliza o caminho de saída com a extensão .checkpoint.json
+            - formato (str): 'csv' ou 'parquet'
+            - tamanho_janela (int): Quantidade de blocos por consulta de logs
+            - trabalhadores (int): Quantidade de consultas simultâneas
+            - linhas_por_arquivo (int): Eventos por arquivo Parquet
+
+        Atributos
+        ----------
+            - web3 (Web3): Instância Web3
+            - decodificador (DecodificadorEventos): Decodificador dos eventos importados
+            - caminho_saida (str): Arquivo CSV ou diretório Parquet de saída
+            - caminho_checkpoint (str): Arquivo do checkpoint
+            - formato (str): 'csv' ou 'parquet'
+            - tamanho_janela (int): Quantidade atual de blocos por consulta de logs
+            - trabalhadores (int): Quantidade de consultas simultâneas
+            - linhas_por_arquivo (int): Eventos por arquivo Parquet
+    '''
+
+    def __init__(self, web3 : Web3, contract, contract_nft, caminho_saida : str, caminho_checkpoint : str = None,
+                 formato : str = "csv", tamanho_janela : int = 2000, trabalhadores : int = 8,
+                 linhas_por_arquivo : int = 100000):
+        if formato not in ("csv", "parquet"):
+            raise ValueError("Formato de saída inválido: {}".format(formato))
+        if formato == "parquet" and pyarrow is None:
+            raise RuntimeError("O formato parquet requer o pacote pyarrow!")
+        self.web3 = web3
+        self.decodificador = DecodificadorEventos(contract, contract_nft)
+        self.caminho_saida = caminho_saida
+        self.caminho_checkpoint = caminho_checkpoint or os.path.splitext(caminho_saida)[0] + ".checkpoint.json"
+        self.formato = formato
+        self.tamanho_janela = tamanho_janela
+        self.trabalhadores = trabalhadores
+        self.linhas_por_arquivo = linhas_por_arquivo
+        self._trava = threading.Lock()
+
+    def leCheckpoint(self):
+        '''
+            Lê o checkpoint de uma execução anterior.
+
+            Retorno
+            -------
+                - checkpoint (None | dict): Último bloco gravado, total de eventos e
+                tamanho do CSV gravado, ou None caso não exista checkpoint.
+        '''
+        if not os.path.exists(self.caminho_checkpoint):
+            return None
+        with open(self.caminho_checkpoint, "r", encoding="utf-8") as arquivo:
+            return json.load(arquivo)
+
+    def _salvaCheckpoint(self, checkpoint : dict):
+        # A escrita em um arquivo temporário seguida da troca evita checkpoints corrompidos
+        temporario = self.caminho_checkpoint + ".tmp"
+        with open(temporario, "w", encoding="utf-8") as arquivo:
+            json.dump(checkpoint, arquivo)
+        os.replace(temporario, self.caminho_checkpoint)
+
+    def _buscaLogs(self, inicio : int, fim : int):
+        try:
+            return self.web3.eth.get_logs(dict(self.decodificador.filtro(), fromBlock=inicio, toBlock=fim))
+        except Exception as e:
+            mensagem = str(e).lower()
+            if inicio == fim or not any(erro in mensagem for erro in ERROS_LIMITE_LOGS):
+                raise
+        # O nó recusou a quantidade de resultados: a janela é dividida ao meio
+        meio = (inicio + fim) // 2
+        with self._trava:
+            self.tamanho_janela = max(1, min(self.tamanho_janela, meio - inicio + 1))
+        return self._buscaLogs(inicio, meio) + self._buscaLogs(meio + 1, fim)
+
+    def _buscaJanela(self, inicio : int, fim : int):
+        registros = [self.decodificador.decodifica(log) for log in self._buscaLogs(inicio, fim)]
+        registros.sort(key=lambda registro: (registro.bloco, registro.indice_log))
+        return [self._linha(registro) for registro in registros]
+
+    @staticmethod
+    def _linha(registro):
+        campos = registro._asdict()
+        campos.setdefault("contrato", campos.get("contratoNFT"))
+        linha = {coluna: campos.get(coluna) for coluna in COLUNAS_EVENTOS}
+        linha["evento"] = type(registro).__name__.replace("Evento", "")
+        if linha["preco"] is not None:
+            # uint256 não cabe nos inteiros de 64 bits do Parquet
+            linha["preco"] = str(linha["preco"])
+        return linha
+
+    def importa(self, bloco_inicial : int = 0, bloco_final : int = None, progresso = None):
+        '''
+            Importa os eventos do intervalo de blocos, retomando do checkpoint
+            caso ele exista.
+
+            Parâmetros
+            ----------
+                - bloco_inicial (int): Primeiro bloco importado (ex.: bloco de implantação do marketplace).
+                - bloco_final (None | int): Último bloco importado. Caso seja None, utiliza o bloco atual.
+                - progresso (None | callable): Função chamada com o resumo parcial após cada gravação.
+
+            Retorno
+            -------
+                - resumo (dict): Blocos e eventos importados nesta execução, tempo
+                em segundos, blocos/s, eventos/s, último bloco gravado e total de eventos.
+        '''
+        bloco_final = self.web3.eth.block_number if bloco_final is None else bloco_final
+        checkpoint = self.leCheckpoint() or {"ultimo_bloco": bloco_inicial - 1, "eventos": 0, "bytes": 0, "partes": 0}
+        proximo = checkpoint["ultimo_bloco"] + 1
+        resumo = {"blocos": 0, "eventos": 0}
+        inicio = time.perf_counter()
+
+        def atualizaResumo():
+            tempo = time.perf_counter() - inicio
+            resumo.update({
+                "tempo": tempo,
+                "blocos_por_segundo": resumo["blocos"] / tempo if tempo else 0.0,
+                "eventos_por_segundo": resumo["eventos"] / tempo if tempo else 0.0,
+                "ultimo_bloco": checkpoint["ultimo_bloco"],
+                "eventos_total": checkpoint["eventos"]
+            })
+            return resumo
+
+        saida = self._abreSaida(checkpoint)
+        concluidas = {}
+        buffer = []
+        erro = None
+        try:
+            with ThreadPoolExecutor(max_workers=self.trabalhadores) as executor:
+                pendentes = {}
+                while (proximo <= bloco_final and erro is None) or pendentes:
+                    # Mantém no máximo duas janelas por thread em andamento
+                    while proximo <= bloco_final and erro is None and len(pendentes) < 2 * self.trabalhadores:
+                        fim = min(bloco_final, proximo + self.tamanho_janela - 1)
+                        pendentes[executor.submit(self._buscaJanela, proximo, fim)] = (proximo, fim)
+                        proximo = fim + 1
+                    prontas, _ = wait(pendentes, return_when=FIRST_COMPLETED)
+                    for futuro in prontas:
+                        janela = pendentes.pop(futuro)
+                        try:
+                            concluidas[janela[0]] = (janela[1], futuro.result())
+                        except Exception as e:
+                            # Nenhuma janela nova é iniciada; as anteriores à falha ainda são gravadas
+                            erro = erro or e
+                    # As janelas são gravadas em ordem, assim que as anteriores terminam
+                    gravou = False
+                    while checkpoint["ultimo_bloco"] + 1 in concluidas:
+                        fim, linhas = concluidas.pop(checkpoint["ultimo_bloco"] + 1)
+                        buffer.extend(linhas)
+                        resumo["blocos"] += fim - checkpoint["ultimo_bloco"]
+                        resumo["eventos"] += len(linhas)
+                        checkpoint["ultimo_bloco"] = fim
+                        gravou = True
+                    if gravou and (self.formato == "csv" or len(buffer) >= self.linhas_por_arquivo):
+                        self._grava(saida, buffer, checkpoint)
+                        buffer = []
+                        if progresso is not None:
+                            progresso(atualizaResumo())
+            self._grava(saida, buffer, checkpoint)
+        finally:
+            if saida is not None:
+                saida.close()
+        if erro is not None:
+            raise erro
+        return atualizaResumo()
+
+    def _abreSaida(self, checkpoint : dict):
+        if self.formato == "parquet":
+            os.makedirs(self.caminho_saida, exist_ok=True)
+            return None
+        existe = os.path.exists(self.caminho_saida)
+        arquivo = open(self.caminho_saida, "r+" if existe else "w", encoding="utf-8", newline="")
+        # Linhas gravadas após o último checkpoint são descartadas antes de retomar
+        arquivo.seek(checkpoint["bytes"])
+        arquivo.truncate()
+        if checkpoint["bytes"] == 0:
+            arquivo.write(",".join(COLUNAS_EVENTOS) + "\r\n")
+        return arquivo
+
+    def _grava(self, saida, linhas : list, checkpoint : dict):
+        if self.formato == "parquet":
+            if linhas:
+                tabela = pyarrow.Table.from_pylist(linhas, schema=esquemaParquet())
+                nome = "parte-{:06d}.parquet".format(checkpoint["partes"])
+                temporario = os.path.join(self.caminho_saida, nome + ".tmp")
+                pyarrow.parquet.write_table(tabela, temporario)
+                os.replace(temporario, os.path.join(self.caminho_saida, nome))
+                checkpoint["partes"] += 1
+        else:
+            csv.DictWriter(saida, COLUNAS_EVENTOS).writerows(linhas)
+            saida.flush()
+            os.fsync(saida.fileno())
+            checkpoint["bytes"] = saida.tell()
+        checkpoint["eventos"] += len(linhas)
+        self._salvaCheckpoint(checkpoint)
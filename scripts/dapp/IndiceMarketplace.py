@@ -0,0 +1,459 @@
+import time, threading
+from bisect import insort, bisect_right
+from web3 import Web3
+from dapp.FluxoEventos import FluxoEventos, EventoItemCriado, EventoTransfer, FimBloco
+
+# Tópico do evento Transfer do padrão ERC721
+TOPICO_TRANSFER = Web3.to_hex(Web3.keccak(text="Transfer(address,address,uint256)"))
+ENDERECO_NULO = "0x0000000000000000000000000000000000000000"
+
+class ArmazemMemoria:
+    '''
+        Cria um novo objeto ArmazemMemoria. Guarda os itens do marketplace em
+        memória, com índices por vendedor, por locatário, por disponibilidade
+        e por data de expiração.
+
+        Os itens são tuplas no mesmo formato da struct Item do contrato:
+        (itemId, statusAlugado, contratoNFT, tokenId, vendedor, locatario, preco, expiraEm).
+
+        Atributos
+        ----------
+            - itens (dict): Itens indexados pelo itemId
+            - uris (dict): URIs dos NFTs indexadas por (contratoNFT, tokenId)
+            - ultimo_bloco (int): Último bloco processado
+            - origem (None | tuple): (endereço do contrato, chain id) dos itens guardados
+    '''
+
+    def __init__(self):
+        self._trava = threading.RLock()
+        self.limpa()
+
+    def limpa(self):
+        '''
+            Remove os itens, as URIs e o checkpoint guardados.
+        '''
+        with self._trava:
+            self.itens = {}
+            self.uris = {}
+            self.ultimo_bloco = -1
+            self.origem = None
+            self._por_vendedor = {}
+            self._por_locatario = {}
+            self._alugaveis = set()
+            self._por_token = {}
+            self._expiracoes = []
+
+    def salvaItem(self, item : tuple):
+        '''
+            Insere ou atualiza um item e os seus índices.
+
+            Parâmetros
+            ----------
+                - item (tuple): Item no formato da struct Item.
+        '''
+        with self._trava:
+            self.removeItem(item[0])
+            item_id = item[0]
+            self.itens[item_id] = item
+            self._por_vendedor.setdefault(item[4], set()).add(item_id)
+            self._por_token[(item[2], item[3])] = item_id
+            if item[1]:
+                self._por_locatario.setdefault(item[5], set()).add(item_id)
+                insort(self._expiracoes, (item[7], item_id))
+            else:
+                self._alugaveis.add(item_id)
+
+    def removeItem(self, itemId : int):
+        '''
+            Remove um item e as suas entradas nos índices.
+
+            Parâmetros
+            ----------
+                - itemId (int): ID do item.
+        '''
+        with self._trava:
+            item = self.itens.pop(itemId, None)
+            if item is None:
+                return
+            self._por_vendedor.get(item[4], set()).discard(itemId)
+            self._por_token.pop((item[2], item[3]), None)
+            if item[1]:
+                self._por_locatario.get(item[5], set()).discard(itemId)
+                posicao = bisect_right(self._expiracoes, (item[7], itemId)) - 1
+                if posicao >= 0 and self._expiracoes[posicao] == (item[7], itemId):
+                    del self._expiracoes[posicao]
+            else:
+                self._alugaveis.discard(itemId)
+
+    def getItem(self, itemId : int):
+        '''
+            Resgata um item pelo seu ID.
+
+            Retorno
+            -------
+                - item (None | tuple): Item ou None caso não exista.
+        '''
+        return self.itens.get(itemId)
+
+    def getItemPorToken(self, contratoNFT : str, tokenId : int):
+        '''
+            Resgata o item ativo associado a um NFT.
+
+            Retorno
+            -------
+                - item (None | tuple): Item ou None caso o NFT não esteja no marketplace.
+        '''
+        with self._trava:
+            item_id = self._por_token.get((contratoNFT, tokenId))
+            return None if item_id is None else self.itens[item_id]
+
+    def contratosNFT(self):
+        '''
+            Retorna os endereços dos contratos de NFT dos itens ativos.
+
+            Retorno
+            -------
+                - contratos (set): Endereços dos contratos de NFT.
+        '''
+        with self._trava:
+            return {contrato for contrato, _ in self._por_token}
+
+    def _selecionaItens(self, ids):
+        return [self.itens[item_id] for item_id in sorted(ids)]
+
+    def alugaveis(self):
+        '''
+            Retorna os itens disponíveis para alugar, ordenados pelo itemId.
+        '''
+        with self._trava:
+            return self._selecionaItens(self._alugaveis)
+
+    def porVendedor(self, vendedor : str):
+        '''
+            Retorna os itens de um vendedor, ordenados pelo itemId.
+        '''
+        with self._trava:
+            return self._selecionaItens(self._por_vendedor.get(vendedor, ()))
+
+    def porLocatario(self, locatario : str):
+        '''
+            Retorna os itens alugados por um locatário, ordenados pelo itemId.
+        '''
+        with self._trava:
+            return self._selecionaItens(self._por_locatario.get(locatario, ()))
+
+    def expiradosEAlugados(self, agora : int):
+        '''
+            Retorna os itens alugados cujo prazo expirou até o instante informado.
+
+            Parâmetros
+            ----------
+                - agora (int): Instante de referência (timestamp Unix).
+        '''
+        with self._trava:
+            limite = bisect_right(self._expiracoes, (agora, float("inf")))
+            return self._selecionaItens(item_id for _, item_id in self._expiracoes[:limite])
+
+    def salvaTokenURI(self, contratoNFT : str, tokenId : int, uri : str):
+        '''
+            Guarda a URI de um NFT.
+        '''
+        self.uris[(contratoNFT, tokenId)] = uri
+
+    def getTokenURI(self, contratoNFT : str, tokenId : int):
+        '''
+            Resgata a URI de um NFT já guardada.
+
+            Retorno
+            -------
+                - uri (None | str): URI do NFT ou None caso não esteja guardada.
+        '''
+        return self.uris.get((contratoNFT, tokenId))
+
+    def getUltimoBloco(self):
+        '''
+            Retorna o último bloco processado.
+        '''
+        return self.ultimo_bloco
+
+    def setUltimoBloco(self, bloco : int):
+        '''
+            Registra o último bloco processado.
+        '''
+        self.ultimo_bloco = bloco
+
+    def getOrigem(self):
+        '''
+            Retorna o contrato e a rede de origem dos itens guardados.
+        '''
+        return self.origem
+
+    def setOrigem(self, contrato : str, chain_id : int):
+        '''
+            Registra o contrato e a rede de origem dos itens guardados.
+        '''
+        self.origem = (contrato, chain_id)
+
+    def confirma(self):
+        '''
+            Confirma as alterações da última janela de blocos. Em memória não há o que gravar.
+        '''
+        pass
+
+class IndiceMarketplace:
+    '''
+        Cria um novo objeto IndiceMarketplace. Mantém um índice local dos itens
+        do marketplace, atualizado de forma incremental a partir dos eventos
+        emitidos desde o último bloco processado:
+            - ItemCriado (marketplace): novo item disponível;
+            - Transfer (NFT) do marketplace para uma conta: item alugado;
+            - Transfer (NFT) do locatário para o vendedor: aluguel finalizado.
+
+        O checkpoint guarda também o endereço do contrato e o chain id. Se o
+        armazenamento pertencer a outro contrato ou rede, ou se o último bloco
+        processado estiver além do bloco atual (rede reiniciada), os dados são
+        descartados e o índice é reconstruído a partir do bloco inicial.
+
+        Parâmetros
+        ----------
+            - web3 (Web3): Instância Web3
+            - contract (Contract): Instância do contrato do marketplace
+            - armazem (None | ArmazemMemoria | ArmazemSQLite): Armazenamento dos itens.
+            Um novo armazenamento em memória é criado caso seja None.
+            - bloco_inicial (int): Bloco de implantação do marketplace
+            - tamanho_janela (int): Quantidade de blocos por consulta de eventos
+            - contract_nft (None | Contract): Contrato de NFTs, usado para resgatar as URIs
+
+        Atributos
+        ----------
+            - web3 (Web3): Instância Web3
+            - contract (Contract): Instância do contrato do marketplace
+            - armazem (ArmazemMemoria | ArmazemSQLite): Armazenamento dos itens
+            - bloco_inicial (int): Bloco de implantação do marketplace
+            - tamanho_janela (int): Quantidade de blocos por consulta de eventos
+            - contract_nft (None | Contract): Contrato de NFTs, usado para resgatar as URIs
+    '''
+
+    def __init__(self, web3 : Web3, contract, armazem : ArmazemMemoria = None,
+                 bloco_inicial : int = 0, tamanho_janela : int = 2000, contract_nft = None):
+        self.web3 = web3
+        self.contract = contract
+        self.armazem = armazem if armazem is not None else ArmazemMemoria()
+        self.bloco_inicial = bloco_inicial
+        self.tamanho_janela = tamanho_janela
+        self.contract_nft = contract_nft
+        self._ouvintes = []
+        self._timestamps = {}
+        self._chain_id = None
+        self._trava = threading.Lock()
+
+    def registraOuvinte(self, ouvinte):
+        '''
+            Registra uma função chamada a cada alteração de item aplicada pelo
+            índice, com os argumentos (evento, item), em que evento é
+            'criado', 'alugado' ou 'finalizado'.
+
+            Parâmetros
+            ----------
+                - ouvinte (callable): Função chamada a cada alteração.
+        '''
+        self._ouvintes.append(ouvinte)
+
+    def _notifica(self, evento : str, item : tuple):
+        for ouvinte in self._ouvintes:
+            try:
+                ouvinte(evento, item)
+            except Exception as e:
+                print(e)
+
+    def sincroniza(self):
+        '''
+            Processa os eventos dos blocos ainda não indexados.
+
+            Retorno
+            -------
+                - ultimo_bloco (int): Último bloco processado.
+        '''
+        with self._trava:
+            bloco_atual = self.web3.eth.block_number
+            self._verificaCheckpoint(bloco_atual)
+            inicio = max(self.armazem.getUltimoBloco() + 1, self.bloco_inicial)
+            while inicio <= bloco_atual:
+                fim = min(inicio + self.tamanho_janela - 1, bloco_atual)
+                self._processaJanela(inicio, fim)
+                # Os itens da janela e o checkpoint são confirmados juntos
+                self.armazem.setUltimoBloco(fim)
+                self.armazem.confirma()
+                inicio = fim + 1
+            self._timestamps.clear()
+            return self.armazem.getUltimoBloco()
+
+    def _verificaCheckpoint(self, bloco_atual : int):
+        if self._chain_id is None:
+            self._chain_id = self.web3.eth.chain_id
+        origem = (self.contract.address, self._chain_id)
+        if self.armazem.getOrigem() != origem or self.armazem.getUltimoBloco() > bloco_atual:
+            self.armazem.limpa()
+            self.armazem.setOrigem(*origem)
+            self.armazem.confirma()
+
+    def _processaJanela(self, inicio : int, fim : int):
+        criados = self.contract.events.ItemCriado.get_logs(fromBlock=inicio, toBlock=fim)
+        contratos = self.armazem.contratosNFT() | {log['args']['contratoNFT'] for log in criados}
+        transferencias = []
+        if contratos:
+            transferencias = self.web3.eth.get_logs({
+                'fromBlock': inicio,
+                'toBlock': fim,
+                'address': sorted(contratos),
+                'topics': [TOPICO_TRANSFER]
+            })
+        # Os eventos são aplicados na ordem em que ocorreram na rede
+        eventos = [(log['blockNumber'], log['logIndex'], 0, log) for log in criados]
+        eventos += [(log['blockNumber'], log['logIndex'], 1, log) for log in transferencias]
+        for _, _, tipo, log in sorted(eventos, key=lambda evento: evento[:2]):
+            if tipo == 0:
+                self._aplicaItemCriado(log['args'])
+            else:
+                self._aplicaTransferencia(
+                    log['address'],
+                    Web3.to_checksum_address(log['topics'][1][-20:]),
+                    Web3.to_checksum_address(log['topics'][2][-20:]),
+                    Web3.to_int(log['topics'][3]),
+                    log['blockNumber']
+                )
+
+    def _aplicaItemCriado(self, args):
+        item = (
+            args['itemId'],
+            args['statusAlugado'],
+            args['contratoNFT'],
+            args['tokenId'],
+            args['vendedor'],
+            args['locatario'],
+            args['preco'],
+            args['expiraEm']
+        )
+        self.armazem.salvaItem(item)
+        self._notifica('criado', item)
+
+    def _aplicaTransferencia(self, contrato : str, de : str, para : str, token_id : int, bloco : int):
+        item = self.armazem.getItemPorToken(contrato, token_id)
+        if item is None:
+            return
+        if not item[1] and de == self.contract.address and para != ENDERECO_NULO:
+            # alugarItem: o prazo passa a contar a partir do bloco do aluguel
+            expira_em = item[7] + self._timestampBloco(bloco)
+            item_alugado = item[:1] + (True,) + item[2:5] + (para, item[6], expira_em)
+            self.armazem.salvaItem(item_alugado)
+            self._notifica('alugado', item_alugado)
+        elif item[1] and de == item[5] and para == item[4]:
+            # finalizaAluguel: o item é removido do marketplace
+            self.armazem.removeItem(item[0])
+            self._notifica('finalizado', item)
+
+    def consomeFluxo(self, fluxo : FluxoEventos):
+        '''
+            Sincroniza o índice e passa a atualizá-lo com os registros de um
+            fluxo de eventos, sem novas consultas de logs. O fluxo deve
+            acompanhar o contrato de NFTs dos itens indexados.
+
+            Parâmetros
+            ----------
+                - fluxo (FluxoEventos): Fluxo de eventos do marketplace.
+        '''
+        self.sincroniza()
+        fluxo.inscreve(self._aplicaRegistro, (EventoItemCriado, EventoTransfer, FimBloco))
+
+    def _aplicaRegistro(self, registro):
+        with self._trava:
+            ultimo_bloco = self.armazem.getUltimoBloco()
+            if registro.bloco <= ultimo_bloco:
+                # Bloco já processado por sincroniza
+                return
+            if isinstance(registro, FimBloco):
+                self.armazem.setUltimoBloco(registro.bloco)
+                self.armazem.confirma()
+                self._timestamps.clear()
+            elif isinstance(registro, EventoItemCriado):
+                self._aplicaItemCriado(registro._asdict())
+            else:
+                self._aplicaTransferencia(registro.contrato, registro.de, registro.para,
+                                          registro.tokenId, registro.bloco)
+
+    def _timestampBloco(self, numero : int):
+        if numero not in self._timestamps:
+            self._timestamps[numero] = self.web3.eth.get_block(numero)['timestamp']
+        return self._timestamps[numero]
+
+    def getTokenURI(self, tokenId : int):
+        '''
+            Resgata a URI de um NFT, consultando o contrato apenas na primeira vez.
+
+            Parâmetros
+            ----------
+                - tokenId (int): ID do NFT.
+
+            Retorno
+            -------
+                - uri (str): URI (CID) do NFT.
+        '''
+        uri = self.armazem.getTokenURI(self.contract_nft.address, tokenId)
+        if uri is None:
+            uri = self.contract_nft.functions.tokenURI(tokenId).call()
+            self.armazem.salvaTokenURI(self.contract_nft.address, tokenId, uri)
+            self.armazem.confirma()
+        return uri
+
+    def getNFTsAlugaveis(self):
+        '''
+            Resgata os itens disponíveis para alugar.
+
+            Retorno
+            -------
+                - itens (list): Lista de itens no formato da struct Item.
+        '''
+        return self.armazem.alugaveis()
+
+    def getNFTsPorVendedor(self, vendedor : str):
+        '''
+            Resgata os itens de um vendedor.
+
+            Parâmetros
+            ----------
+                - vendedor (str): Endereço do vendedor.
+
+            Retorno
+            -------
+                - itens (list): Lista de itens no formato da struct Item.
+        '''
+        return self.armazem.porVendedor(vendedor)
+
+    def getNFTsPorLocatario(self, locatario : str):
+        '''
+            Resgata os itens alugados por um locatário.
+
+            Parâmetros
+            ----------
+                - locatario (str): Endereço do locatário.
+
+            Retorno
+            -------
+                - itens (list): Lista de itens no formato da struct Item.
+        '''
+        return self.armazem.porLocatario(locatario)
+
+    def getNFTsExpiradosEAlugados(self, agora : int = None):
+        '''
+            Resgata os itens expirados e que ainda estão alugados.
+
+            Parâmetros
+            ----------
+                - agora (None | int): Instante de referência. Caso seja None,
+                utiliza o horário atual.
+
+            Retorno
+            -------
+                - itens (list): Lista de itens no formato da struct Item.
+        '''
+        return self.armazem.expiradosEAlugados(int(time.time()) if agora is None else agora)
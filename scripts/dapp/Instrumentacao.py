@@ -0,0 +1,354 @@
+import os, json, time, inspect, cProfile, threading, functools, contextvars
+
+# Chamada de método dos wrappers em execução no contexto atual
+_span_atual = contextvars.ContextVar("span_instrumentacao", default=None)
+
+# Rótulo das requisições feitas fora de um método instrumentado (ex.: rastreador de recibos)
+SPAN_FUNDO = "fundo"
+# Limites (em segundos) dos histogramas exportados
+LIMITES_HISTOGRAMA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class _Span:
+    # Uma execução de método instrumentado; o tempo de rede também é somado aos spans externos
+    __slots__ = ("nome", "pai", "tempo_rpc", "requisicoes")
+
+    def __init__(self, nome : str, pai):
+        self.nome = nome
+        self.pai = pai
+        self.tempo_rpc = 0.0
+        self.requisicoes = 0
+
+class _Medida:
+    # Contagem, soma e histograma de durações
+    __slots__ = ("quantidade", "erros", "soma", "faixas")
+
+    def __init__(self):
+        self.quantidade = 0
+        self.erros = 0
+        self.soma = 0.0
+        self.faixas = [0] * len(LIMITES_HISTOGRAMA)
+
+    def registra(self, duracao : float, erro : bool):
+        self.quantidade += 1
+        self.soma += duracao
+        if erro:
+            self.erros += 1
+        for indice, limite in enumerate(LIMITES_HISTOGRAMA):
+            if duracao <= limite:
+                self.faixas[indice] += 1
+                break
+
+def instrumenta(metodo):
+    '''
+        Decorador dos métodos dos wrappers. Atribui as requisições JSON-RPC
+        feitas durante o método ao nome "Classe.metodo" e mede o seu tempo
+        total, quando o objeto possui uma Instrumentacao no atributo
+        `instrumentacao`. Quando o método retorna um gerador, é medido o
+        tempo gasto produzindo os seus itens.
+    '''
+    @functools.wraps(metodo)
+    def envolvido(self, *args, **kwargs):
+        instrumentacao = getattr(self, "instrumentacao", None)
+        if instrumentacao is None:
+            return metodo(self, *args, **kwargs)
+        nome = "{}.{}".format(type(self).__name__, metodo.__name__)
+        return instrumentacao.executa(nome, metodo, (self,) + args, kwargs)
+    return envolvido
+
+class Instrumentacao:
+    '''
+        Cria um novo objeto Instrumentacao. Conta e mede o tempo de cada
+        método JSON-RPC enviado ao provedor (como middleware do web3) e de
+        cada método dos wrappers decorado com `instrumenta`, atribuindo as
+        requisições ao método que as originou. O tempo de um método que não
+        foi gasto em requisições corresponde à montagem, assinatura e
+        decodificação, além da espera pelos recibos.
+
+        As medições podem ser exportadas no formato texto do Prometheus
+        (prometheus) ou registradas em um log estruturado, uma linha JSON por
+        requisição e por método (registraLog). Os métodos informados em
+        perfila são executados sob o cProfile.
+
+        Atributos
+        ----------
+            - requisicoes (dict): Medidas por (método do wrapper, método JSON-RPC)
+            - metodos (dict): Medidas do tempo total por método do wrapper
+            - tempo_rpc (dict): Tempo gasto em requisições por método do wrapper
+            - perfilados (set): Métodos executados sob o cProfile
+            - pasta_perfis (str): Pasta onde os perfis (.prof) são salvos
+    '''
+
+    def __init__(self):
+        self.requisicoes = {}
+        self.metodos = {}
+        self.tempo_rpc = {}
+        self.perfilados = set()
+        self.pasta_perfis = "perfis"
+        self._log = None
+        self._trava = threading.Lock()
+        self._trava_perfil = threading.Lock()
+
+    def middleware(self, make_request, w3):
+        '''
+            Middleware do web3 que mede cada requisição enviada ao provedor.
+        '''
+        def mede(method, params):
+            inicio = time.perf_counter()
+            erro = True
+            try:
+                resposta = make_request(method, params)
+                erro = isinstance(resposta, dict) and "error" in resposta
+                return resposta
+            finally:
+                self.registraRequisicao(method, time.perf_counter() - inicio, erro)
+        return mede
+
+    def registraRequisicao(self, metodo_rpc : str, duracao : float, erro : bool = False):
+        '''
+            Registra uma requisição enviada ao provedor para o método em execução.
+
+            Parâmetros
+            ----------
+                - metodo_rpc (str): Método JSON-RPC.
+                - duracao (float): Duração da requisição em segundos.
+                - erro (bool): Indica se a requisição falhou.
+        '''
+        span = _span_atual.get()
+        nome = span.nome if span is not None else SPAN_FUNDO
+        # O tempo de rede também conta para os métodos que chamaram o atual
+        while span is not None:
+            span.tempo_rpc += duracao
+            span.requisicoes += 1
+            span = span.pai
+        with self._trava:
+            medida = self.requisicoes.get((nome, metodo_rpc))
+            if medida is None:
+                medida = self.requisicoes[(nome, metodo_rpc)] = _Medida()
+            medida.registra(duracao, erro)
+            log = self._log
+        if log is not None:
+            self._escreveLog({"tipo": "rpc", "metodo": nome, "rpc": metodo_rpc, "duracao": duracao,
+                              "erro": erro})
+
+    def executa(self, nome : str, funcao, args : tuple, kwargs : dict):
+        '''
+            Executa uma função como o método informado, medindo-a.
+
+            Parâmetros
+            ----------
+                - nome (str): Nome do método ("Classe.metodo").
+                - funcao (callable): Função a ser executada.
+                - args (tuple): Argumentos posicionais.
+                - kwargs (dict): Argumentos nomeados.
+
+            Retorno
+            -------
+                - resultado (any): Retorno da função.
+        '''
+        span = _Span(nome, _span_atual.get())
+        token = _span_atual.set(span)
+        inicio = time.perf_counter()
+        resultado = None
+        try:
+            if nome in self.perfilados:
+                resultado = self._perfila(nome, funcao, args, kwargs)
+            else:
+                resultado = funcao(*args, **kwargs)
+            if inspect.isgenerator(resultado):
+                # As requisições de um gerador acontecem enquanto ele é percorrido
+                resultado = self.itera(nome, resultado)
+                span = None
+            return resultado
+        finally:
+            _span_atual.reset(token)
+            if span is not None:
+                # Os wrappers retornam None ou False em caso de erro
+                self._conclui(span, time.perf_counter() - inicio, resultado is None or resultado is False)
+
+    def itera(self, nome : str, iterador):
+        '''
+            Percorre um iterador como o método informado, medindo como uma
+            única chamada o tempo gasto produzindo os seus itens.
+
+            Parâmetros
+            ----------
+                - nome (str): Nome do método ("Classe.metodo").
+                - iterador (iterator): Iterador retornado pelo método.
+
+            Retorno
+            -------
+                - itens (generator): Itens do iterador.
+        '''
+        span = _Span(nome, None)
+        duracao = 0.0
+        erro = False
+        try:
+            while True:
+                span.pai = _span_atual.get()
+                token = _span_atual.set(span)
+                inicio = time.perf_counter()
+                try:
+                    item = next(iterador)
+                except StopIteration:
+                    return
+                except Exception:
+                    erro = True
+                    raise
+                finally:
+                    duracao += time.perf_counter() - inicio
+                    _span_atual.reset(token)
+                yield item
+        finally:
+            self._conclui(span, duracao, erro)
+
+    def _conclui(self, span : _Span, duracao : float, erro : bool):
+        with self._trava:
+            medida = self.metodos.get(span.nome)
+            if medida is None:
+                medida = self.metodos[span.nome] = _Medida()
+            medida.registra(duracao, erro)
+            self.tempo_rpc[span.nome] = self.tempo_rpc.get(span.nome, 0.0) + span.tempo_rpc
+            log = self._log
+        if log is not None:
+            self._escreveLog({"tipo": "metodo", "metodo": span.nome, "duracao": duracao,
+                              "tempo_rpc": span.tempo_rpc, "requisicoes": span.requisicoes, "erro": erro})
+
+    def perfila(self, metodos, pasta : str = "perfis"):
+        '''
+            Passa a executar os métodos informados sob o cProfile, salvando um
+            arquivo .prof por chamada (visualizável com pstats ou snakeviz).
+
+            Parâmetros
+            ----------
+                - metodos (iterable): Nomes "Classe.metodo" dos métodos perfilados.
+                - pasta (str): Pasta onde os perfis são salvos.
+        '''
+        self.perfilados = set(metodos)
+        self.pasta_perfis = pasta
+
+    def _perfila(self, nome : str, funcao, args : tuple, kwargs : dict):
+        # Apenas um perfilador pode estar ativo por vez; chamadas concorrentes não são perfiladas
+        if not self._trava_perfil.acquire(blocking=False):
+            return funcao(*args, **kwargs)
+        try:
+            perfil = cProfile.Profile()
+            resultado = perfil.runcall(funcao, *args, **kwargs)
+            os.makedirs(self.pasta_perfis, exist_ok=True)
+            perfil.dump_stats(os.path.join(self.pasta_perfis, "{}-{}.prof".format(nome, time.time_ns())))
+            return resultado
+        finally:
+            self._trava_perfil.release()
+
+    def registraLog(self, caminho : str):
+        '''
+            Passa a registrar cada requisição e cada método em um arquivo de
+            log estruturado, com um objeto JSON por linha.
+
+            Parâmetros
+            ----------
+                - caminho (None | str): Caminho do arquivo (aberto para anexar),
+                ou None para parar de registrar.
+        '''
+        with self._trava:
+            anterior = self._log
+            self._log = open(caminho, "a", encoding="utf-8") if caminho else None
+        if anterior is not None:
+            anterior.close()
+
+    def _escreveLog(self, registro : dict):
+        registro["momento"] = time.time()
+        linha = json.dumps(registro) + "\n"
+        with self._trava:
+            if self._log is not None:
+                self._log.write(linha)
+                self._log.flush()
+
+    def resumo(self):
+        '''
+            Resume as medições por método dos wrappers.
+
+            Retorno
+            -------
+                - resumo (dict): Para cada método, a quantidade de chamadas, falhas,
+                tempo total, tempo em requisições e requisições por método JSON-RPC.
+        '''
+        with self._trava:
+            resumo = {}
+            for nome, medida in self.metodos.items():
+                resumo[nome] = {"chamadas": medida.quantidade, "falhas": medida.erros, "tempo": medida.soma,
+                                "tempo_rpc": self.tempo_rpc.get(nome, 0.0), "rpc": {}}
+            for (nome, metodo_rpc), medida in self.requisicoes.items():
+                entrada = resumo.setdefault(nome, {"chamadas": 0, "falhas": 0, "tempo": 0.0, "tempo_rpc": 0.0, "rpc": {}})
+                entrada["rpc"][metodo_rpc] = {"quantidade": medida.quantidade, "erros": medida.erros,
+                                              "tempo": medida.soma}
+            return resumo
+
+    def prometheus(self):
+        '''
+            Exporta as medições no formato texto do Prometheus.
+
+            Retorno
+            -------
+                - texto (str): Contadores e histogramas por método JSON-RPC e por
+                método dos wrappers.
+        '''
+        linhas = [
+            "# HELP dapp_rpc_requisicoes_total Requisições JSON-RPC por método do wrapper e método RPC.",
+            "# TYPE dapp_rpc_requisicoes_total counter",
+        ]
+        with self._trava:
+            requisicoes = sorted(self.requisicoes.items())
+            metodos = sorted(self.metodos.items())
+            tempo_rpc = dict(self.tempo_rpc)
+            for (nome, metodo_rpc), medida in requisicoes:
+                linhas.append('dapp_rpc_requisicoes_total{{metodo="{}",rpc="{}"}} {}'.format(
+                    nome, metodo_rpc, medida.quantidade))
+            linhas.append("# HELP dapp_rpc_erros_total Requisições JSON-RPC com erro.")
+            linhas.append("# TYPE dapp_rpc_erros_total counter")
+            for (nome, metodo_rpc), medida in requisicoes:
+                linhas.append('dapp_rpc_erros_total{{metodo="{}",rpc="{}"}} {}'.format(
+                    nome, metodo_rpc, medida.erros))
+            linhas.append("# HELP dapp_rpc_duracao_segundos Duração das requisições JSON-RPC.")
+            linhas.append("# TYPE dapp_rpc_duracao_segundos histogram")
+            for (nome, metodo_rpc), medida in requisicoes:
+                linhas.extend(self._histograma("dapp_rpc_duracao_segundos",
+                                               'metodo="{}",rpc="{}"'.format(nome, metodo_rpc), medida))
+            linhas.append("# HELP dapp_metodo_duracao_segundos Duração total dos métodos dos wrappers.")
+            linhas.append("# TYPE dapp_metodo_duracao_segundos histogram")
+            for nome, medida in metodos:
+                linhas.extend(self._histograma("dapp_metodo_duracao_segundos", 'metodo="{}"'.format(nome), medida))
+            linhas.append("# HELP dapp_metodo_falhas_total Chamadas dos wrappers que retornaram None ou False.")
+            linhas.append("# TYPE dapp_metodo_falhas_total counter")
+            for nome, medida in metodos:
+                linhas.append('dapp_metodo_falhas_total{{metodo="{}"}} {}'.format(nome, medida.erros))
+            linhas.append("# HELP dapp_metodo_rpc_segundos_total Tempo dos métodos gasto em requisições JSON-RPC.")
+            linhas.append("# TYPE dapp_metodo_rpc_segundos_total counter")
+            for nome, _ in metodos:
+                linhas.append('dapp_metodo_rpc_segundos_total{{metodo="{}"}} {}'.format(nome, tempo_rpc.get(nome, 0.0)))
+        return "\n".join(linhas) + "\n"
+
+    @staticmethod
+    def _histograma(metrica : str, rotulos : str, medida : _Medida):
+        linhas = []
+        acumulado = 0
+        for limite, quantidade in zip(LIMITES_HISTOGRAMA, medida.faixas):
+            acumulado += quantidade
+            linhas.append('{}_bucket{{{},le="{}"}} {}'.format(metrica, rotulos, limite, acumulado))
+        linhas.append('{}_bucket{{{},le="+Inf"}} {}'.format(metrica, rotulos, medida.quantidade))
+        linhas.append('{}_sum{{{}}} {}'.format(metrica, rotulos, medida.soma))
+        linhas.append('{}_count{{{}}} {}'.format(metrica, rotulos, medida.quantidade))
+        return linhas
+
+    def salvaPrometheus(self, caminho : str):
+        '''
+            Salva as medições no formato texto do Prometheus (para o textfile
+            collector do node_exporter, por exemplo).
+
+            Parâmetros
+            ----------
+                - caminho (str): Caminho do arquivo.
+        '''
+        temporario = caminho + ".tmp"
+        with open(temporario, "w", encoding="utf-8") as arquivo:
+            arquivo.write(self.prometheus())
+        os.replace(temporario, caminho)
@@ -0,0 +1,276 @@
+import struct
+from array import array
+from typing import NamedTuple
+from web3 import Web3
+
+class Item(NamedTuple):
+    '''
+        Item do marketplace, no mesmo formato da struct Item do contrato.
+        Guarda os valores brutos (preço em Wei, status como bool); os textos
+        exibidos ao usuário são gerados apenas quando solicitados.
+    '''
+    itemId : int
+    statusAlugado : bool
+    contratoNFT : str
+    tokenId : int
+    vendedor : str
+    locatario : str
+    preco : int
+    expiraEm : int
+
+    @property
+    def precoEther(self):
+        '''
+            Preço do aluguel em Ether (Decimal).
+        '''
+        return Web3.from_wei(self.preco, 'ether')
+
+    @property
+    def alugadoTexto(self):
+        '''
+            Status do aluguel para exibição ("Sim" ou "Não").
+        '''
+        return "Sim" if self.statusAlugado else "Não"
+
+    @property
+    def locatarioTexto(self):
+        '''
+            Locatário para exibição ("-" caso o item não esteja alugado).
+        '''
+        return self.locatario if self.statusAlugado else "-"
+
+    def formata(self):
+        '''
+            Formata o item para exibição.
+
+            Retorno
+            -------
+                - item_formatado (dict): Item com o status em texto e o preço em Ether.
+        '''
+        return {
+            'itemId': self.itemId,
+            'statusAlugado': self.alugadoTexto,
+            'enderecoContratoNFT': self.contratoNFT,
+            'tokenId': self.tokenId,
+            'vendedor': self.vendedor,
+            'locatario': self.locatarioTexto,
+            'preco': self.precoEther,
+            'expiraEm': self.expiraEm
+        }
+
+# Tamanho de cada campo da struct Item na codificação ABI
+TAMANHO_PALAVRA = 32
+CAMPOS_ITEM = len(Item._fields)
+TAMANHO_ITEM = CAMPOS_ITEM * TAMANHO_PALAVRA
+# Uma struct Item codificada: cada campo ocupa uma palavra de 32 bytes, os
+# endereços ocupam os últimos 20 bytes e o bool o último byte da sua palavra
+FORMATO_ITEM = struct.Struct(">32s31x?12x20s32s12x20s12x20s32s32s")
+
+def _localizaItens(dados, posicao : int):
+    # Retorna a visão (sem cópia) das structs de um Item[] cujo deslocamento está na palavra informada
+    visao = memoryview(dados)
+    cabeca = posicao * TAMANHO_PALAVRA
+    deslocamento = int.from_bytes(visao[cabeca:cabeca + TAMANHO_PALAVRA], 'big')
+    quantidade = int.from_bytes(visao[deslocamento:deslocamento + TAMANHO_PALAVRA], 'big')
+    inicio = deslocamento + TAMANHO_PALAVRA
+    if inicio + quantidade * TAMANHO_ITEM > len(visao):
+        raise ValueError("Resposta Item[] truncada!")
+    return visao[inicio:inicio + quantidade * TAMANHO_ITEM]
+
+def decodificaItens(dados, posicao : int = 0):
+    '''
+        Decodifica a resposta bruta (eth_call) de uma consulta que retorna
+        Item[] sem o decodificador genérico do web3. Como a struct Item tem
+        tamanho fixo, cada item é lido diretamente dos bytes da resposta, e
+        os endereços repetidos são convertidos para checksum uma única vez.
+
+        Parâmetros
+        ----------
+            - dados (bytes): Retorno da chamada codificado em ABI.
+            - posicao (int): Palavra do cabeçalho com o deslocamento do Item[]
+            (0 nas consultas getNFTs* e *Paginado).
+
+        Retorno
+        -------
+            - itens (list): Lista de Items, iguais aos gerados pelo web3.
+    '''
+    enderecos = {}
+
+    def checksum(endereco : bytes):
+        convertido = enderecos.get(endereco)
+        if convertido is None:
+            convertido = enderecos[endereco] = Web3.to_checksum_address(endereco)
+        return convertido
+
+    de_bytes = int.from_bytes
+    return [
+        Item(de_bytes(item_id, 'big'), alugado, checksum(contrato), de_bytes(token_id, 'big'),
+             checksum(vendedor), checksum(locatario), de_bytes(preco, 'big'), de_bytes(expira_em, 'big'))
+        for item_id, alugado, contrato, token_id, vendedor, locatario, preco, expira_em
+        in FORMATO_ITEM.iter_unpack(_localizaItens(dados, posicao))
+    ]
+
+class ColunasItens:
+    '''
+        Cria um novo objeto ColunasItens. Guarda uma lista de itens em
+        colunas, uma por campo da struct Item, para filtrar e ordenar muitos
+        itens sem criar um objeto por item.
+
+        Os IDs dos itens e os prazos ficam em arrays de 64 bits do módulo
+        array; o ID do NFT e o preço (uint256) ficam em listas de inteiros e
+        os endereços em listas de textos hexadecimais em minúsculas. Caso um
+        prazo não caiba em 64 bits (ex.: versões do contrato que o guardavam
+        em uint256), a coluna expiraEm passa a ser uma lista.
+
+        Parâmetros
+        ----------
+            - itens (iterable): Itens no formato da struct Item
+
+        Atributos
+        ----------
+            - itemId (array): IDs dos itens
+            - statusAlugado (array): 1 para itens alugados e 0 para disponíveis
+            - contratoNFT (list): Endereços dos contratos dos NFTs
+            - tokenId (list): IDs dos NFTs
+            - vendedor (list): Endereços dos vendedores
+            - locatario (list): Endereços dos locatários
+            - preco (list): Preços em Wei
+            - expiraEm (array | list): Prazos ou datas de expiração dos aluguéis
+    '''
+
+    def __init__(self, itens = ()):
+        self.itemId = array('Q')
+        self.statusAlugado = array('B')
+        self.contratoNFT = []
+        self.tokenId = []
+        self.vendedor = []
+        self.locatario = []
+        self.preco = []
+        self.expiraEm = array('Q')
+        for item in itens:
+            self.itemId.append(item[0])
+            self.statusAlugado.append(1 if item[1] else 0)
+            self.contratoNFT.append(item[2].lower())
+            self.tokenId.append(item[3])
+            self.vendedor.append(item[4].lower())
+            self.locatario.append(item[5].lower())
+            self.preco.append(item[6])
+            self.anexaExpiracao(item[7])
+
+    @classmethod
+    def deABI(cls, dados : bytes, posicao : int = 0):
+        '''
+            Decodifica a resposta bruta (eth_call) de uma consulta que retorna
+            Item[] diretamente em colunas, sem passar pelo decodificador do web3.
+
+            Parâmetros
+            ----------
+                - dados (bytes): Retorno da chamada codificado em ABI.
+                - posicao (int): Palavra do cabeçalho com o deslocamento do Item[].
+
+            Retorno
+            -------
+                - colunas (ColunasItens): Itens decodificados em colunas.
+        '''
+        colunas = cls()
+        de_bytes = int.from_bytes
+        for item_id, alugado, contrato, token_id, vendedor, locatario, preco, expira_em \
+                in FORMATO_ITEM.iter_unpack(_localizaItens(dados, posicao)):
+            colunas.itemId.append(de_bytes(item_id, 'big'))
+            colunas.statusAlugado.append(alugado)
+            colunas.contratoNFT.append("0x" + contrato.hex())
+            colunas.tokenId.append(de_bytes(token_id, 'big'))
+            colunas.vendedor.append("0x" + vendedor.hex())
+            colunas.locatario.append("0x" + locatario.hex())
+            colunas.preco.append(de_bytes(preco, 'big'))
+            colunas.anexaExpiracao(de_bytes(expira_em, 'big'))
+        return colunas
+
+    def anexaExpiracao(self, expiraEm : int):
+        '''
+            Acrescenta um prazo à coluna expiraEm, convertendo-a em lista
+            caso o valor não caiba em 64 bits.
+
+            Parâmetros
+            ----------
+                - expiraEm (int): Prazo ou data de expiração do aluguel.
+        '''
+        try:
+            self.expiraEm.append(expiraEm)
+        except OverflowError:
+            self.expiraEm = list(self.expiraEm)
+            self.expiraEm.append(expiraEm)
+
+    def __len__(self):
+        return len(self.itemId)
+
+    def item(self, indice : int):
+        '''
+            Monta o Item de uma posição das colunas.
+
+            Parâmetros
+            ----------
+                - indice (int): Posição do item.
+
+            Retorno
+            -------
+                - item (Item): Item com os endereços em formato checksum.
+        '''
+        return Item(
+            self.itemId[indice],
+            bool(self.statusAlugado[indice]),
+            Web3.to_checksum_address(self.contratoNFT[indice]),
+            self.tokenId[indice],
+            Web3.to_checksum_address(self.vendedor[indice]),
+            Web3.to_checksum_address(self.locatario[indice]),
+            self.preco[indice],
+            self.expiraEm[indice]
+        )
+
+    def itens(self, indices = None):
+        '''
+            Monta os Items de várias posições das colunas.
+
+            Parâmetros
+            ----------
+                - indices (None | iterable): Posições dos itens. Caso seja None,
+                monta todos os itens.
+
+            Retorno
+            -------
+                - itens (list): Lista de Items.
+        '''
+        return [self.item(indice) for indice in (range(len(self)) if indices is None else indices)]
+
+    def filtra(self, coluna : str, condicao):
+        '''
+            Seleciona as posições cujos valores de uma coluna atendem a uma condição.
+
+            Parâmetros
+            ----------
+                - coluna (str): Nome da coluna (campo da struct Item).
+                - condicao (callable): Função que recebe o valor e retorna um bool.
+
+            Retorno
+            -------
+                - indices (list): Posições selecionadas.
+        '''
+        return [indice for indice, valor in enumerate(getattr(self, coluna)) if condicao(valor)]
+
+    def ordena(self, coluna : str, decrescente : bool = False, indices = None):
+        '''
+            Ordena as posições pelos valores de uma coluna.
+
+            Parâmetros
+            ----------
+                - coluna (str): Nome da coluna (campo da struct Item).
+                - decrescente (bool): Ordena do maior para o menor valor.
+                - indices (None | list): Posições ordenadas. Caso seja None, ordena todas.
+
+            Retorno
+            -------
+                - indices (list): Posições ordenadas.
+        '''
+        valores = getattr(self, coluna)
+        indices = range(len(self)) if indices is None else indices
+        return sorted(indices, key=valores.__getitem__, reverse=decrescente)
@@ -0,0 +1,109 @@
+import json, itertools
+from web3 import Web3
+from web3._utils.abi import get_abi_output_types, map_abi_data
+from web3._utils.normalizers import BASE_RETURN_NORMALIZERS
+from web3._utils.request import make_post_request
+
+class LoteLeituras:
+    '''
+        Cria um novo objeto LoteLeituras. Agrupa várias chamadas de leitura
+        (eth_call) de contratos em uma única requisição JSON-RPC em lote,
+        transformando N idas e voltas à rede em apenas uma.
+
+        Caso o nó não aceite requisições em lote, as chamadas são feitas
+        uma a uma, com o mesmo resultado.
+
+        Parâmetros
+        ----------
+            - web3 (Web3): Instância Web3 conectada por HTTP
+            - conta (None | str): Endereço usado como 'from' das chamadas
+            - pool (None | PoolProvedores): Envia as requisições em lote pela sessão
+            compartilhada da rede, com a troca de nó e a instrumentação. Caso seja
+            None, o lote é enviado diretamente à URL do provedor
+
+        Atributos
+        ----------
+            - web3 (Web3): Instância Web3 conectada por HTTP
+            - conta (None | str): Endereço usado como 'from' das chamadas
+            - pool (None | PoolProvedores): Envia as requisições em lote
+            - chamadas (list): Chamadas adicionadas e ainda não executadas
+    '''
+
+    def __init__(self, web3 : Web3, conta : str = None, pool = None):
+        self.web3 = web3
+        self.conta = conta
+        self.pool = pool
+        self.chamadas = []
+
+    def adiciona(self, funcao):
+        '''
+            Adiciona uma chamada ao lote.
+
+            Parâmetros
+            ----------
+                - funcao (ContractFunction): Função do contrato já com os argumentos.
+
+            Retorno
+            -------
+                - indice (int): Posição do resultado na lista retornada por executa.
+        '''
+        self.chamadas.append(funcao)
+        return len(self.chamadas) - 1
+
+    def _transacao(self, funcao):
+        transacao = {'to': funcao.address, 'data': funcao._encode_transaction_data()}
+        if self.conta is not None:
+            transacao['from'] = self.conta
+        return transacao
+
+    def _decodifica(self, funcao, dados):
+        tipos = get_abi_output_types(funcao.abi)
+        saida = self.web3.codec.decode(tipos, Web3.to_bytes(hexstr=dados))
+        saida = map_abi_data(BASE_RETURN_NORMALIZERS, tipos, saida)
+        return saida[0] if len(saida) == 1 else saida
+
+    def executa(self):
+        '''
+            Executa todas as chamadas do lote em uma única requisição.
+
+            Retorno
+            -------
+                - resultados (list): Resultado de cada chamada, na ordem em que
+                foram adicionadas. Chamadas com falha têm a exceção como resultado.
+        '''
+        chamadas, self.chamadas = self.chamadas, []
+        if not chamadas:
+            return []
+        ids = itertools.count(1)
+        requisicoes = [
+            {"jsonrpc": "2.0", "method": "eth_call", "params": [self._transacao(funcao), "latest"], "id": next(ids)}
+            for funcao in chamadas
+        ]
+        if self.pool is not None:
+            resposta = self.pool.make_batch_request(requisicoes)
+        else:
+            provider = self.web3.provider
+            resposta = json.loads(make_post_request(
+                provider.endpoint_uri, json.dumps(requisicoes).encode(), **provider.get_request_kwargs()
+            ))
+        if not isinstance(resposta, list):
+            # O nó não aceita requisições em lote
+            return [self._executaIndividual(funcao) for funcao in chamadas]
+
+        respostas = {item.get("id"): item for item in resposta}
+        resultados = []
+        for requisicao, funcao in zip(requisicoes, chamadas):
+            item = respostas.get(requisicao["id"], {})
+            try:
+                if "error" in item or "result" not in item:
+                    raise Exception(item.get("error", "Resposta ausente no lote"))
+                resultados.append(self._decodifica(funcao, item["result"]))
+            except Exception as e:
+                resultados.append(e)
+        return resultados
+
+    def _executaIndividual(self, funcao):
+        try:
+            return funcao.call({'from': self.conta} if self.conta is not None else {})
+        except Exception as e:
+            return e
@@ -1,8 +1,15 @@
+import math
+from concurrent.futures import Future
 from dapp.Connection import Connection
+from dapp.ContratoBase import ContratoBase
+from dapp.IndiceMarketplace import IndiceMarketplace
+from dapp.FluxoEventos import EventoItemCriado
+from dapp.Item import Item, ColunasItens, decodificaItens, TAMANHO_PALAVRA
+from dapp.Instrumentacao import instrumenta
 from web3.logs import DISCARD
 from web3 import Web3
 
-class MarketplaceAluguel:
+class MarketplaceAluguel(ContratoBase):
     '''
         Cria um novo objeto MarketplaceAluguel. Contém os métodos do contrato MarketplaceAluguel.
 
@@ -20,16 +27,68 @@ class MarketplaceAluguel:
             - web3 (Web3): Instância Web3
             - contract (Contract): Instância do contrato inteligente
             - contract_nft (str): Endereço do contrato de NFTs
+            - nonces (GerenciadorNonce): Gerenciador de nonces compartilhado entre as conexões
+            - indice (None | IndiceMarketplace): Índice local consultado no lugar das views getNFTs*
+            - decodificacao_rapida (bool): Decodifica as respostas Item[] sem o decodificador do web3
+            - escritores (None | PoolEscritores): Pool de contas usado nas escritas em lote do vendedor
     '''
 
+    # Tempo de vida da taxa do marketplace no cache, que também expira a cada novo bloco
+    TTL_TAXA = 300.0
+    # Gás reservado para cada transação em lote, além do gás dos itens
+    GAS_BASE_LOTE = 60000
+    # Gás por item usado apenas para dimensionar o primeiro lote, cuja estimativa
+    # (estimate_gas) define o gás por item dos lotes seguintes
+    GAS_POR_ITEM_ALUGUEL = 180000
+    GAS_POR_ITEM_FINALIZACAO = 120000
+    # Fração do limite de gás do bloco que um lote pode ocupar
+    FRACAO_BLOCO_LOTE = 0.5
+
     def __init__(self, pubk : str, pk : str, connection : Connection, contractNFT : str):
-        self.public_key = pubk
-        self.private_key = pk
-        self.web3 = connection.getWeb3Connection()
-        self.contract = connection.getContractConnection()
+        super().__init__(pubk, pk, connection)
         self.contract_nft = contractNFT
+        self.indice = None
+        self.decodificacao_rapida = False
+        self.escritores = None
+
+    def usaIndice(self, indice : IndiceMarketplace):
+        '''
+            Passa a responder as consultas getNFTs* a partir de um índice local,
+            sincronizado com os eventos da rede antes de cada consulta.
+
+            Parâmetros
+            ----------
+                - indice (None | IndiceMarketplace): Índice local ou None para
+                voltar a consultar o contrato.
+        '''
+        self.indice = indice
+
+    def usaDecodificacaoRapida(self, ativa : bool = True):
+        '''
+            Passa a decodificar as respostas Item[] das consultas getNFTs* e
+            *Paginado diretamente dos bytes da resposta (decodificaItens), sem
+            o decodificador genérico do web3.
+
+            Parâmetros
+            ----------
+                - ativa (bool): Ativa (True) ou desativa (False) a decodificação rápida.
+        '''
+        self.decodificacao_rapida = ativa
+
+    def usaEscritores(self, escritores):
+        '''
+            Passa a distribuir as escritas em lote do vendedor (criaItensEmLote)
+            entre as contas de um pool de escritores.
+
+            Parâmetros
+            ----------
+                - escritores (None | PoolEscritores): Pool de escritores ou None para
+                voltar a utilizar apenas a conta deste objeto.
+        '''
+        self.escritores = escritores
     
-    def criaItemAlugavel(self, tokenId : int, preco : int, tempoExpira : int, taxa : float):
+    @instrumenta
+    def criaItemAlugavel(self, tokenId : int, preco : int, tempoExpira : int, taxa : float, aguardar : bool = True):
         '''
             Disponibiliza um NFT para ser alugado.
 
@@ -39,43 +98,48 @@ class MarketplaceAluguel:
                 - preco (int): Preço do NFT alugável em Wei.
                 - tempoExpira (int): Tempo de expiração do item em segundos.
                 - taxa (float): Taxa cobrada pelo marketplace para criar um novo item.
+                - aguardar (bool): Aguarda a mineração da transação (True) ou
+                retorna imediatamente a transação pendente (False).
 
             Retorno
             -------
-                - item_formatado (None | dict): Dicionário contendo os
-                dados cadastrados ou None caso ocorra algum erro.
+                - item (None | Item | Future): Item cadastrado, a transação
+                pendente que resolve para ele caso aguardar seja False, ou None
+                caso ocorra algum erro.
         '''
         try:
-            # Resgata o nonce da conta
-            nonce = self.web3.eth.get_transaction_count(self.public_key, 'latest')
-            # Cria a transação
-            tx = self.contract.functions.criaItemAlugavel(
-                self.contract_nft,
-                tokenId,
-                Web3.to_wei(preco, 'ether'),
-                tempoExpira
-            ).build_transaction({
-                "nonce": nonce,
-                "from": self.public_key,
-                'value': self.web3.to_wei(taxa, 'ether'),
-                'gas': 2000000,
-                'gasPrice': self.web3.to_wei('50', 'gwei')
-            })
-            # Assina a transação com a chave privada da conta
-            signed_tx = self.web3.eth.account.sign_transaction(tx, self.private_key)
-            # Resgata o hash da transação
-            tx_hash = self.web3.eth.send_raw_transaction(signed_tx.rawTransaction)
+            # Cria, assina e envia a transação com um nonce reservado localmente
+            pendente = self._submeteTransacao(
+                self.contract.functions.criaItemAlugavel(
+                    self.contract_nft,
+                    tokenId,
+                    Web3.to_wei(preco, 'ether'),
+                    tempoExpira
+                ),
+                {
+                    'value': self.web3.to_wei(taxa, 'ether'),
+                    'gas': 2000000,
+                    'gasPrice': self.web3.to_wei('50', 'gwei')
+                },
+                self.extraiItemCriado,
+                EventoItemCriado,
+                lambda registro: Item._make(registro[:len(Item._fields)])
+            )
+            # Uma criação que falha pode ter usado uma taxa já alterada pelo dono
+            pendente.add_done_callback(lambda pendente: pendente.exception() and self.invalidaTaxa())
+            if not aguardar:
+                return pendente
             # Aguarda o término da transação para resgatar os dados do novo item
-            receipt = self.web3.eth.wait_for_transaction_receipt(tx_hash)
-            logs = self.contract.events.ItemCriado().process_receipt(receipt, DISCARD)
+            item = self._aguarda(pendente)
             print("NFT disponibilizado para aluguel com sucesso!")
-            item_formatado = self.formataItemCriado(dict(logs[0]['args']))
-            return item_formatado
+            return item
         except Exception as e:
             print(e)
+            self.invalidaTaxa()
             return None
     
-    def alugarItem(self, itemId: int, valor : float):
+    @instrumenta
+    def alugarItem(self, itemId: int, valor : float, aguardar : bool = True):
         '''
             Aluga um NFT.
 
@@ -83,142 +147,479 @@ class MarketplaceAluguel:
             ----------
                 - itemId (int): ID do item alugável.
                 - valor (float): Valor a ser pago pelo aluguel.
+                - aguardar (bool): Aguarda a mineração da transação (True) ou
+                retorna imediatamente a transação pendente (False).
 
             Retorno
             -------
-                - status (bool): Indica o sucesso ou falha do aluguel.
+                - status (bool | Future): Indica o sucesso ou falha do aluguel,
+                ou a transação pendente caso aguardar seja False.
         '''
         try:
-            # Resgata o nonce da conta
-            nonce = self.web3.eth.get_transaction_count(self.public_key, 'latest')
-            # Cria a transação
-            tx = self.contract.functions.alugarItem(
-                self.contract_nft,
-                itemId
-            ).build_transaction({
-                "nonce": nonce,
-                "from": self.public_key,
-                'value': self.web3.to_wei(valor, 'ether'),
-                'gas': 2000000,
-                'gasPrice': self.web3.to_wei('50', 'gwei')
-            })
-            # Assina a transação com a chave privada da conta
-            signed_tx = self.web3.eth.account.sign_transaction(tx, self.private_key)
-            # Resgata o hash da transação
-            tx_hash = self.web3.eth.send_raw_transaction(signed_tx.rawTransaction)
-            # Aguarda o término da transação para resgatar os dados do novo item
-            retorno = self.web3.eth.wait_for_transaction_receipt(tx_hash)
-            return True
+            # Cria, assina e envia a transação com um nonce reservado localmente
+            pendente = self._submeteTransacao(
+                self.contract.functions.alugarItem(
+                    self.contract_nft,
+                    itemId
+                ),
+                {
+                    'value': self.web3.to_wei(valor, 'ether'),
+                    'gas': 2000000,
+                    'gasPrice': self.web3.to_wei('50', 'gwei')
+                },
+                lambda receipt: True
+            )
+            if not aguardar:
+                return pendente
+            # Aguarda o término da transação
+            return self._aguarda(pendente)
         except Exception as e:
             print(e)
             return False
     
-    def finalizaAluguel(self, itemId: int):
+    @instrumenta
+    def finalizaAluguel(self, itemId: int, aguardar : bool = True):
         '''
             Finaliza um aluguel.
 
             Parâmetros
             ----------
                 - itemId (int): ID do item alugado.
+                - aguardar (bool): Aguarda a mineração da transação (True) ou
+                retorna imediatamente a transação pendente (False).
 
             Retorno
             -------
-                - status (bool): Indica o sucesso ou falha da finalização do aluguel.
+                - status (bool | Future): Indica o sucesso ou falha da finalização
+                do aluguel, ou a transação pendente caso aguardar seja False.
         '''
         try:
-            # Resgata o nonce da conta
-            nonce = self.web3.eth.get_transaction_count(self.public_key, 'latest')
-            # Cria a transação
-            tx = self.contract.functions.finalizaAluguel(
-                itemId
-            ).build_transaction({
-                "gasPrice": self.web3.eth.gas_price,
-                "nonce": nonce,
-                "from": self.public_key
-            })
-            # Assina a transação com a chave privada da conta
-            signed_tx = self.web3.eth.account.sign_transaction(tx, self.private_key)
-            # Resgata o hash da transação
-            tx_hash = self.web3.eth.send_raw_transaction(signed_tx.rawTransaction)
-            # Aguarda o término da transação para resgatar os dados do novo item
-            retorno = self.web3.eth.wait_for_transaction_receipt(tx_hash)
-            return True
+            # Cria, assina e envia a transação com um nonce reservado localmente
+            pendente = self._submeteTransacao(
+                self.contract.functions.finalizaAluguel(itemId),
+                {"gasPrice": self.getGasPrice()},
+                lambda receipt: True
+            )
+            if not aguardar:
+                return pendente
+            # Aguarda o término da transação
+            return self._aguarda(pendente)
         except Exception as e:
             print(e)
             return False
 
+    def _tamanhoLote(self, gas_por_item : int):
+        '''
+            Calcula quantos itens cabem em uma transação em lote, de acordo
+            com o limite de gás do bloco atual.
+
+            Parâmetros
+            ----------
+                - gas_por_item (int): Gás reservado para cada item.
+
+            Retorno
+            -------
+                - tamanho (int): Quantidade máxima de itens por transação.
+        '''
+        limite_bloco = self.cache.obtem("gas_limit_bloco", lambda: self.web3.eth.get_block('latest')['gasLimit'])
+        disponivel = int(limite_bloco * self.FRACAO_BLOCO_LOTE) - self.GAS_BASE_LOTE
+        return max(1, disponivel // gas_por_item)
+
+    def _gasPorItem(self, funcao, valor : int, quantidade : int):
+        '''
+            Calibra o gás por item de uma função em lote com estimate_gas sobre
+            o primeiro lote, uma única vez por função do contrato. O gás fixo
+            da transação é dividido entre os itens, e a margem do construtor de
+            transações é aplicada, como em ConstrutorTransacao.calibraGas.
+
+            Parâmetros
+            ----------
+                - funcao (ContractFunction): Função em lote já com os argumentos do primeiro lote.
+                - valor (int): Valor em Wei enviado com o primeiro lote.
+                - quantidade (int): Quantidade de itens do primeiro lote.
+
+            Retorno
+            -------
+                - gas_por_item (int): Gás reservado para cada item.
+        '''
+        def estima():
+            estimativa = self.web3.eth.estimate_gas({
+                'from': self.public_key,
+                'to': self.contract.address,
+                'data': funcao._encode_transaction_data(),
+                'value': valor
+            })
+            return math.ceil(estimativa * self.getConstrutor().margem_gas / quantidade)
+        chave = ("gas_por_item", self.contract.address, funcao.abi['name'])
+        return self.cache.obtem(chave, estima, ttl=float("inf"))
+
+    @instrumenta
+    def extraiResultadoLote(self, receipt):
+        '''
+            Resgata o resultado de cada item a partir do recibo de uma transação em lote.
+
+            Parâmetros
+            ----------
+                - receipt (AttributeDict): Recibo da transação alugarItens ou finalizaAlugueis.
+
+            Retorno
+            -------
+                - resultados (dict): Dicionário itemId -> sucesso (bool).
+        '''
+        logs = self.contract.events.ResultadoLote().process_receipt(receipt, DISCARD)
+        return {log['args']['itemId']: log['args']['sucesso'] for log in logs}
+
+    @staticmethod
+    def _loteFalho(erro : Exception):
+        # Lote que não chegou a ser enviado, representado como uma transação pendente com erro
+        pendente = Future()
+        pendente.set_exception(erro)
+        return pendente
+
+    def _aguardaLotes(self, lotes : list):
+        # Junta os resultados dos lotes; um lote revertido marca todos os seus itens como falha
+        resultados = {}
+        for ids, pendente in lotes:
+            try:
+                resultados.update(self._aguarda(pendente))
+            except Exception as e:
+                print(e)
+                resultados.update({item_id: False for item_id in ids})
+        return resultados
+
+    @instrumenta
+    def alugarItens(self, itens : list, tamanho_lote : int = None, aguardar : bool = True):
+        '''
+            Aluga vários NFTs, agrupados em transações alugarItens. As listas
+            maiores que o tamanho do lote são divididas em várias transações,
+            enviadas em sequência sem aguardar a mineração da anterior. O gás
+            por item é calibrado no primeiro uso (_gasPorItem).
+
+            Parâmetros
+            ----------
+                - itens (list): Lista de tuplas (itemId, valor) com o valor do aluguel em Ether.
+                - tamanho_lote (None | int): Quantidade de itens por transação. Caso
+                seja None, é calculada pelo limite de gás do bloco.
+                - aguardar (bool): Aguarda a mineração das transações (True) ou
+                retorna imediatamente as transações pendentes (False).
+
+            Retorno
+            -------
+                - resultados (None | dict | list): Dicionário itemId -> sucesso,
+                a lista de tuplas (itemIds, transação pendente) caso aguardar
+                seja False, ou None caso o tamanho do lote não possa ser
+                calculado. Um lote que não pôde ser enviado tem os seus itens
+                marcados como falha (ou a transação pendente resolvida com o erro).
+        '''
+        try:
+            tamanho = tamanho_lote or self._tamanhoLote(self.GAS_POR_ITEM_ALUGUEL)
+            if itens:
+                primeiro = itens[:tamanho]
+                gas_por_item = self._gasPorItem(
+                    self.contract.functions.alugarItens(self.contract_nft, [item_id for item_id, _ in primeiro]),
+                    sum(Web3.to_wei(valor, 'ether') for _, valor in primeiro),
+                    len(primeiro)
+                )
+                tamanho = tamanho_lote or self._tamanhoLote(gas_por_item)
+            lotes = []
+            for inicio in range(0, len(itens), tamanho):
+                lote = itens[inicio:inicio + tamanho]
+                ids = [item_id for item_id, _ in lote]
+                try:
+                    pendente = self._submeteTransacao(
+                        self.contract.functions.alugarItens(self.contract_nft, ids),
+                        {
+                            'value': sum(Web3.to_wei(valor, 'ether') for _, valor in lote),
+                            'gas': self.GAS_BASE_LOTE + len(lote) * gas_por_item,
+                            'gasPrice': self.web3.to_wei('50', 'gwei')
+                        },
+                        self.extraiResultadoLote
+                    )
+                except Exception as e:
+                    # Os lotes já enviados continuam válidos; apenas os itens deste falham
+                    pendente = self._loteFalho(e)
+                lotes.append((ids, pendente))
+            if not aguardar:
+                return lotes
+            return self._aguardaLotes(lotes)
+        except Exception as e:
+            print(e)
+            return None
+
+    @instrumenta
+    def finalizaAlugueis(self, itemIds : list, tamanho_lote : int = None, aguardar : bool = True):
+        '''
+            Finaliza vários aluguéis, agrupados em transações finalizaAlugueis.
+            As listas maiores que o tamanho do lote são divididas em várias
+            transações, enviadas em sequência sem aguardar a mineração da anterior.
+            O gás por item é calibrado no primeiro uso (_gasPorItem).
+
+            Parâmetros
+            ----------
+                - itemIds (list): IDs dos itens alugados.
+                - tamanho_lote (None | int): Quantidade de itens por transação. Caso
+                seja None, é calculada pelo limite de gás do bloco.
+                - aguardar (bool): Aguarda a mineração das transações (True) ou
+                retorna imediatamente as transações pendentes (False).
+
+            Retorno
+            -------
+                - resultados (None | dict | list): Dicionário itemId -> sucesso,
+                a lista de tuplas (itemIds, transação pendente) caso aguardar
+                seja False, ou None caso o tamanho do lote não possa ser
+                calculado. Um lote que não pôde ser enviado tem os seus itens
+                marcados como falha (ou a transação pendente resolvida com o erro).
+        '''
+        try:
+            tamanho = tamanho_lote or self._tamanhoLote(self.GAS_POR_ITEM_FINALIZACAO)
+            if itemIds:
+                primeiro = list(itemIds[:tamanho])
+                gas_por_item = self._gasPorItem(self.contract.functions.finalizaAlugueis(primeiro), 0, len(primeiro))
+                tamanho = tamanho_lote or self._tamanhoLote(gas_por_item)
+            lotes = []
+            for inicio in range(0, len(itemIds), tamanho):
+                ids = list(itemIds[inicio:inicio + tamanho])
+                try:
+                    pendente = self._submeteTransacao(
+                        self.contract.functions.finalizaAlugueis(ids),
+                        {
+                            'gas': self.GAS_BASE_LOTE + len(ids) * gas_por_item,
+                            'gasPrice': self.getGasPrice()
+                        },
+                        self.extraiResultadoLote
+                    )
+                except Exception as e:
+                    # Os lotes já enviados continuam válidos; apenas os itens deste falham
+                    pendente = self._loteFalho(e)
+                lotes.append((ids, pendente))
+            if not aguardar:
+                return lotes
+            return self._aguardaLotes(lotes)
+        except Exception as e:
+            print(e)
+            return None
+
+    @instrumenta
     def getNFTsAlugaveis(self):
         '''
             Resgata os NFTs disponíveis para alugar.
 
             Retorno
             -------
-                - nfts_disponiveis (None | list): Lista contendo os NFTs.
+                - nfts_disponiveis (None | list): Lista de Items.
         '''
         try:
-            nfts_disponiveis = self.contract.functions.getNFTsAlugaveis().call({'from': self.public_key})
-            lista_final = []
-            for item in list(nfts_disponiveis):
-                lista_final.append(self.formataItem(item))
-            return lista_final
+            if self.indice is not None:
+                # Consulta o índice local, atualizado com os eventos mais recentes
+                self.indice.sincroniza()
+                nfts_disponiveis = self.indice.getNFTsAlugaveis()
+                return [Item._make(item) for item in nfts_disponiveis]
+            return self._consultaItens(self.contract.functions.getNFTsAlugaveis())
         except Exception as e:
             print(e)
             return None
     
+    @instrumenta
     def getNFTsPorVendedor(self):
         '''
             Resgata os NFTs de um vendedor.
 
             Retorno
             -------
-                - nfts_disponiveis (None | list): Lista contendo os NFTs.
+                - nfts_disponiveis (None | list): Lista de Items.
         '''
         try:
-            nfts_disponiveis = self.contract.functions.getNFTsPorVendedor().call({'from': self.public_key})
-            lista_final = []
-            for item in list(nfts_disponiveis):
-                lista_final.append(self.formataItem(item))
-            return lista_final
+            if self.indice is not None:
+                # Consulta o índice local, atualizado com os eventos mais recentes
+                self.indice.sincroniza()
+                nfts_disponiveis = self.indice.getNFTsPorVendedor(self.public_key)
+                return [Item._make(item) for item in nfts_disponiveis]
+            return self._consultaItens(self.contract.functions.getNFTsPorVendedor())
         except Exception as e:
             print(e)
             return None
     
+    @instrumenta
     def getNFTsPorLocatario(self):
         '''
             Resgata os NFTs de um locatário.
 
             Retorno
             -------
-                - nfts_disponiveis (None | list): Lista contendo os NFTs.
+                - nfts_disponiveis (None | list): Lista de Items.
         '''
         try:
-            nfts_disponiveis = self.contract.functions.getNFTsPorLocatario().call({'from': self.public_key})
-            lista_final = []
-            for item in list(nfts_disponiveis):
-                lista_final.append(self.formataItem(item))
-            return lista_final
+            if self.indice is not None:
+                # Consulta o índice local, atualizado com os eventos mais recentes
+                self.indice.sincroniza()
+                nfts_disponiveis = self.indice.getNFTsPorLocatario(self.public_key)
+                return [Item._make(item) for item in nfts_disponiveis]
+            return self._consultaItens(self.contract.functions.getNFTsPorLocatario())
         except Exception as e:
             print(e)
             return None
     
+    @instrumenta
     def getNFTsExpiradosEAlugados(self):
         '''
             Resgata os NFTs expirados e que ainda estão alugados.
 
             Retorno
             -------
-                - nfts_disponiveis (None | list): Lista contendo os NFTs.
+                - nfts_disponiveis (None | list): Lista de Items.
         '''
         try:
-            nfts_disponiveis = self.contract.functions.getNFTsExpiradosEAlugados().call({'from': self.public_key})
-            lista_final = []
-            for item in list(nfts_disponiveis):
-                lista_final.append(self.formataItem(item))
-            return lista_final
+            if self.indice is not None:
+                # Consulta o índice local, atualizado com os eventos mais recentes
+                self.indice.sincroniza()
+                nfts_disponiveis = self.indice.getNFTsExpiradosEAlugados()
+                return [Item._make(item) for item in nfts_disponiveis]
+            return self._consultaItens(self.contract.functions.getNFTsExpiradosEAlugados())
         except Exception as e:
             print(e)
             return None
     
+    @instrumenta
+    def getColunasNFTs(self, consulta : str = "getNFTsAlugaveis"):
+        '''
+            Resgata os NFTs de uma das consultas getNFTs* em colunas, para
+            filtrar e ordenar muitos itens. A resposta da chamada é decodificada
+            diretamente em colunas, sem criar um objeto por item.
+
+            Parâmetros
+            ----------
+                - consulta (str): Nome da consulta: getNFTsAlugaveis, getNFTsPorVendedor,
+                getNFTsPorLocatario ou getNFTsExpiradosEAlugados.
+
+            Retorno
+            -------
+                - colunas (None | ColunasItens): Itens em colunas.
+        '''
+        try:
+            if self.indice is not None:
+                # Consulta o índice local, atualizado com os eventos mais recentes
+                self.indice.sincroniza()
+                consultas_indice = {
+                    "getNFTsAlugaveis": self.indice.getNFTsAlugaveis,
+                    "getNFTsPorVendedor": lambda: self.indice.getNFTsPorVendedor(self.public_key),
+                    "getNFTsPorLocatario": lambda: self.indice.getNFTsPorLocatario(self.public_key),
+                    "getNFTsExpiradosEAlugados": self.indice.getNFTsExpiradosEAlugados
+                }
+                return ColunasItens(consultas_indice[consulta]())
+            return ColunasItens.deABI(self._chamadaBruta(getattr(self.contract.functions, consulta)()))
+        except Exception as e:
+            print(e)
+            return None
+
+    def _chamadaBruta(self, funcao, bloco = 'latest'):
+        # Executa a chamada sem decodificar o retorno
+        return self.web3.eth.call({
+            'from': self.public_key,
+            'to': self.contract.address,
+            'data': funcao._encode_transaction_data()
+        }, bloco)
+
+    def _consultaItens(self, funcao):
+        # Executa uma consulta que retorna Item[] pelo caminho de decodificação escolhido
+        if self.decodificacao_rapida:
+            return decodificaItens(self._chamadaBruta(funcao))
+        return [Item._make(item) for item in funcao.call({'from': self.public_key})]
+
+    def _iteraPaginas(self, funcao, tamanho_pagina : int):
+        '''
+            Percorre uma das consultas paginadas do contrato, resgatando uma
+            página por vez apenas quando os itens da anterior forem consumidos.
+            Todas as páginas são lidas no bloco em que a iteração começou, para
+            que itens criados ou alugados entre as chamadas não sejam pulados
+            nem repetidos. Falhas em uma chamada são propagadas ao consumidor.
+
+            Parâmetros
+            ----------
+                - funcao (ContractFunction): Consulta paginada do contrato.
+                - tamanho_pagina (int): Quantidade máxima de itens por chamada.
+
+            Retorno
+            -------
+                - nfts (generator): Gerador de Items.
+        '''
+        bloco = self.web3.eth.block_number
+        cursor = 0
+        while True:
+            if self.decodificacao_rapida:
+                # O retorno (Item[], uint256) tem o cursor na segunda palavra do cabeçalho
+                dados = self._chamadaBruta(funcao(cursor, tamanho_pagina), bloco)
+                pagina = decodificaItens(dados)
+                cursor = int.from_bytes(dados[TAMANHO_PALAVRA:2 * TAMANHO_PALAVRA], 'big')
+            else:
+                pagina, cursor = funcao(cursor, tamanho_pagina).call({'from': self.public_key},
+                                                                     block_identifier=bloco)
+                pagina = [Item._make(item) for item in pagina]
+            yield from pagina
+            if cursor == 0:
+                return
+
+    @instrumenta
+    def iteraNFTsAlugaveis(self, tamanho_pagina : int = 100):
+        '''
+            Percorre os NFTs disponíveis para alugar, página a página.
+
+            Parâmetros
+            ----------
+                - tamanho_pagina (int): Quantidade máxima de itens por chamada.
+
+            Retorno
+            -------
+                - nfts (generator): Gerador de Items.
+        '''
+        return self._iteraPaginas(self.contract.functions.getNFTsAlugaveisPaginado, tamanho_pagina)
+
+    @instrumenta
+    def iteraNFTsPorVendedor(self, tamanho_pagina : int = 100):
+        '''
+            Percorre os NFTs de um vendedor, página a página.
+
+            Parâmetros
+            ----------
+                - tamanho_pagina (int): Quantidade máxima de itens por chamada.
+
+            Retorno
+            -------
+                - nfts (generator): Gerador de Items.
+        '''
+        return self._iteraPaginas(self.contract.functions.getNFTsPorVendedorPaginado, tamanho_pagina)
+
+    @instrumenta
+    def iteraNFTsPorLocatario(self, tamanho_pagina : int = 100):
+        '''
+            Percorre os NFTs de um locatário, página a página.
+
+            Parâmetros
+            ----------
+                - tamanho_pagina (int): Quantidade máxima de itens por chamada.
+
+            Retorno
+            -------
+                - nfts (generator): Gerador de Items.
+        '''
+        return self._iteraPaginas(self.contract.functions.getNFTsPorLocatarioPaginado, tamanho_pagina)
+
+    @instrumenta
+    def iteraNFTsExpiradosEAlugados(self, tamanho_pagina : int = 100):
+        '''
+            Percorre os NFTs expirados e que ainda estão alugados, página a página.
+            Cada chamada analisa no máximo tamanho_pagina itens alugados.
+
+            Parâmetros
+            ----------
+                - tamanho_pagina (int): Quantidade máxima de itens por chamada.
+
+            Retorno
+            -------
+                - nfts (generator): Gerador de Items.
+        '''
+        return self._iteraPaginas(self.contract.functions.getNFTsExpiradosEAlugadosPaginado, tamanho_pagina)
+
+    @instrumenta
     def getTaxaMarketplace(self):
         '''
             Resgata a taxa cobrada pelo marketplace para criar um novo item.
@@ -228,13 +629,96 @@ class MarketplaceAluguel:
                 - taxa (None | float) - Taxa cobrada pelo marketplace.
         '''
         try:
-            taxa = self.contract.functions.getTaxaMarketplace().call({'from': self.public_key})
+            # A taxa só muda através de setTaxaMarketplace, então é guardada em cache até o próximo bloco
+            taxa = self.cache.obtem(
+                ("taxa_marketplace", self.contract.address),
+                lambda: self.contract.functions.getTaxaMarketplace().call({'from': self.public_key}),
+                ttl=self.TTL_TAXA,
+                por_bloco=True
+            )
             taxa = float(Web3.from_wei(taxa, 'ether'))
             return taxa
         except Exception as e:
             print(e)
             return None
     
+    def invalidaTaxa(self):
+        '''
+            Descarta a taxa do marketplace guardada em cache.
+        '''
+        self.cache.invalida(("taxa_marketplace", self.contract.address))
+
+    @instrumenta
+    def setTaxaMarketplace(self, novaTaxa : float, aguardar : bool = True):
+        '''
+            Altera a taxa cobrada pelo marketplace (apenas o dono do contrato).
+
+            Parâmetros
+            ----------
+                - novaTaxa (float): Nova taxa em Ether.
+                - aguardar (bool): Aguarda a mineração da transação (True) ou
+                retorna imediatamente a transação pendente (False).
+
+            Retorno
+            -------
+                - status (bool | Future): Indica o sucesso ou falha da alteração,
+                ou a transação pendente caso aguardar seja False.
+        '''
+        try:
+            pendente = self._submeteTransacao(
+                self.contract.functions.setTaxaMarketplace(Web3.to_wei(novaTaxa, 'ether')),
+                {"gasPrice": self.getGasPrice()},
+                lambda receipt: True
+            )
+            # A taxa em cache deixa de valer assim que a alteração é minerada
+            pendente.add_done_callback(lambda pendente: self.invalidaTaxa())
+            if not aguardar:
+                return pendente
+            return self._aguarda(pendente)
+        except Exception as e:
+            print(e)
+            return False
+
+    @instrumenta
+    def getNFTsAlugaveisETaxa(self):
+        '''
+            Resgata os NFTs disponíveis para alugar e a taxa do marketplace
+            em uma única requisição.
+
+            Retorno
+            -------
+                - dados (None | tuple): Tupla (nfts_disponiveis, taxa) ou None
+                caso ocorra algum erro.
+        '''
+        try:
+            lote = self.novoLote()
+            lote.adiciona(self.contract.functions.getNFTsAlugaveis())
+            lote.adiciona(self.contract.functions.getTaxaMarketplace())
+            nfts_disponiveis, taxa = lote.executa()
+            for resultado in (nfts_disponiveis, taxa):
+                if isinstance(resultado, Exception):
+                    raise resultado
+            return [Item._make(item) for item in nfts_disponiveis], float(Web3.from_wei(taxa, 'ether'))
+        except Exception as e:
+            print(e)
+            return None
+    
+    @instrumenta
+    def extraiItemCriado(self, receipt):
+        '''
+            Resgata o item criado a partir do recibo da transação.
+
+            Parâmetros
+            ----------
+                - receipt (AttributeDict) - Recibo da transação criaItemAlugavel.
+
+            Retorno
+            -------
+                - item (Item) - Item criado.
+        '''
+        logs = self.contract.events.ItemCriado().process_receipt(receipt, DISCARD)
+        return Item(**{campo: logs[0]['args'][campo] for campo in Item._fields})
+    
     def formataItemCriado(self, item_criado : dict):
         '''
             Formata um item vindo da blockchain.
@@ -258,7 +742,7 @@ class MarketplaceAluguel:
     
     def formataItem(self, item : tuple):
         '''
-            Formata um item vindo da blockchain.
+            Formata um item vindo da blockchain para exibição.
 
             Parâmetros
             ----------
@@ -266,15 +750,6 @@ class MarketplaceAluguel:
 
             Retorno
             -------
-                - item_formatado (None | dict) - Item formatado.
+                - item_formatado (dict) - Item formatado.
         '''
-        return {
-            'itemId': item[0],
-            'statusAlugado': "Sim" if item[1] else "Não",
-            'enderecoContratoNFT': item[2],
-            'tokenId': item[3],
-            'vendedor': item[4],
-            'locatario': item[5] if item[1] else "-",
-            'preco': Web3.from_wei(item[6], 'ether'),
-            'expiraEm': item[7]
-        }
+        return Item._make(item).formata()
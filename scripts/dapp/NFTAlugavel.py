@@ -1,7 +1,11 @@
 from dapp.Connection import Connection
-from web3 import Web3
+from dapp.ContratoBase import ContratoBase
+from dapp.FluxoEventos import EventoTokenId
+from dapp.Instrumentacao import instrumenta
+from dapp.CacheConteudo import CacheConteudo
+from web3.logs import DISCARD
 
-class NFTAlugavel:
+class NFTAlugavel(ContratoBase):
     '''
         Cria um novo objeto NFTAlugavel. Contém os métodos do contrato NFTAlugavel.
 
@@ -17,46 +21,161 @@ class NFTAlugavel:
             - private_key (str): Chave privada da conta
             - web3 (Web3): Instância Web3
             - contract (Contract): Instância do contrato inteligente
+            - nonces (GerenciadorNonce): Gerenciador de nonces compartilhado entre as conexões
+            - conteudos (None | CacheConteudo): Cache em disco dos conteúdos apontados pelos CIDs
     '''
 
     def __init__(self, pubk : str, pk : str, connection : Connection):
-        self.public_key = pubk
-        self.private_key = pk
-        self.web3 = connection.getWeb3Connection()
-        self.contract = connection.getContractConnection()
+        super().__init__(pubk, pk, connection)
+        self.conteudos = None
 
-    def criarNovoToken(self, tokenCID : str):
+    def usaCacheConteudo(self, conteudos : CacheConteudo):
+        '''
+            Passa a resolver os CIDs dos tokens pelo cache de conteúdo informado.
+
+            Parâmetros
+            ----------
+                - conteudos (None | CacheConteudo): Cache de conteúdo ou None para desativar.
+        '''
+        self.conteudos = conteudos
+
+    @instrumenta
+    def criarNovoToken(self, tokenCID : str, aguardar : bool = True):
         '''
             Salva um NFT na blockchain.
 
             Parâmetros
             ----------
                 - tokenCID (str): CID do novo NFT.
+                - aguardar (bool): Aguarda a mineração da transação (True) ou
+                retorna imediatamente a transação pendente (False).
 
             Retorno
             -------
-                - token_id (None | int): ID do novo Token ou None caso ocorra algum erro.
+                - token_id (None | int | Future): ID do novo Token, a transação
+                pendente que resolve para o ID caso aguardar seja False,
+                ou None caso ocorra algum erro.
         '''
         try:
-            # Resgata o nonce da conta
-            nonce = self.web3.eth.get_transaction_count(self.public_key, 'latest')
-            # Cria a transação
-            tx = self.contract.functions.criarNovoToken(
-                tokenCID
-            ).build_transaction({
-                "gasPrice": self.web3.eth.gas_price,
-                "nonce": nonce,
-                "from": self.public_key
-            })
-            # Assina a transação com a chave privada da conta
-            signed_tx = self.web3.eth.account.sign_transaction(tx, self.private_key)
-            # Resgata o hash da transação realizada
-            tx_hash = self.web3.eth.send_raw_transaction(signed_tx.rawTransaction)
+            # Cria, assina e envia a transação com um nonce reservado localmente
+            pendente = self._submeteTransacao(
+                self.contract.functions.criarNovoToken(tokenCID),
+                {"gasPrice": self.getGasPrice()},
+                self.extraiTokenId,
+                EventoTokenId,
+                lambda registro: registro.tokenId
+            )
+            if not aguardar:
+                return pendente
             # Aguarda o término da transação para resgatar o ID do Token
-            receipt = self.web3.eth.wait_for_transaction_receipt(tx_hash)
-            token_id = Web3.to_int(receipt['logs'][0]['topics'][3])
+            token_id = self._aguarda(pendente)
             print("NFT criado com sucesso!")
             return token_id
         except Exception as e:
             print(e)
             return None
+
+    @instrumenta
+    def extraiTokenId(self, receipt):
+        '''
+            Resgata o ID do Token criado a partir do recibo da transação.
+
+            Parâmetros
+            ----------
+                - receipt (AttributeDict): Recibo da transação criarNovoToken.
+
+            Retorno
+            -------
+                - token_id (int): ID do novo Token.
+        '''
+        logs = self.contract.events.TokenId().process_receipt(receipt, DISCARD)
+        return logs[0]['args']['token_id']
+
+    @instrumenta
+    def getTokenURIs(self, tokenIds : list):
+        '''
+            Resgata os CIDs de vários NFTs em uma única requisição.
+
+            Parâmetros
+            ----------
+                - tokenIds (list): IDs dos NFTs.
+
+            Retorno
+            -------
+                - uris (None | dict): Dicionário tokenId -> CID (None para os
+                tokens com falha) ou None caso ocorra algum erro.
+        '''
+        try:
+            lote = self.novoLote()
+            for token_id in tokenIds:
+                lote.adiciona(self.contract.functions.tokenURI(token_id))
+            resultados = lote.executa()
+            return {
+                token_id: None if isinstance(uri, Exception) else uri
+                for token_id, uri in zip(tokenIds, resultados)
+            }
+        except Exception as e:
+            print(e)
+            return None
+
+    @instrumenta
+    def getDonos(self, tokenIds : list):
+        '''
+            Resgata os donos de vários NFTs em uma única requisição.
+
+            Parâmetros
+            ----------
+                - tokenIds (list): IDs dos NFTs.
+
+            Retorno
+            -------
+                - donos (None | dict): Dicionário tokenId -> endereço do dono
+                (None para os tokens com falha) ou None caso ocorra algum erro.
+        '''
+        try:
+            lote = self.novoLote()
+            for token_id in tokenIds:
+                lote.adiciona(self.contract.functions.ownerOf(token_id))
+            resultados = lote.executa()
+            return {
+                token_id: None if isinstance(dono, Exception) else dono
+                for token_id, dono in zip(tokenIds, resultados)
+            }
+        except Exception as e:
+            print(e)
+            return None
+
+    @instrumenta
+    def getConteudos(self, tokenIds : list, concorrencia : int = 16):
+        '''
+            Resgata os conteúdos apontados pelos CIDs de vários NFTs, baixando
+            em paralelo apenas os que ainda não estão no cache de conteúdo.
+
+            Parâmetros
+            ----------
+                - tokenIds (list): IDs dos NFTs.
+                - concorrencia (int): Quantidade máxima de downloads simultâneos.
+
+            Retorno
+            -------
+                - conteudos (None | dict): Dicionário tokenId -> conteúdo (mmap ou
+                bytes; None para os tokens com falha) ou None caso ocorra algum erro.
+        '''
+        try:
+            if self.conteudos is None:
+                raise Exception("Nenhum cache de conteúdo configurado (IPFS_GATEWAY)!")
+            uris = self.getTokenURIs(tokenIds)
+            if uris is None:
+                return None
+            self.conteudos.preCarrega([uri for uri in uris.values() if uri], concorrencia)
+            conteudos = {}
+            for token_id, uri in uris.items():
+                try:
+                    conteudos[token_id] = self.conteudos.le(uri) if uri else None
+                except Exception as e:
+                    print("Falha ao resgatar o conteúdo do NFT {}: {}".format(token_id, e))
+                    conteudos[token_id] = None
+            return conteudos
+        except Exception as e:
+            print(e)
+            return None
@@ -0,0 +1,541 @@
+import os, time, threading, multiprocessing
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from eth_account import Account
+from eth_keys import keys
+from web3 import Web3
+from dapp.Connection import Connection
+from dapp.NFTAlugavel import NFTAlugavel
+from dapp.MarketplaceAluguel import MarketplaceAluguel
+from dapp.RastreadorRecibos import TransacaoRevertida
+from dapp.Instrumentacao import instrumenta
+from dapp.ConstrutorTransacao import assinaTransacao
+
+# Chaves das contas, carregadas uma única vez em cada processo de assinatura
+_chaves_processo = {}
+
+def _iniciaProcesso(chaves : list):
+    for chave in chaves:
+        conta = Account.from_key(chave)
+        _chaves_processo[conta.address] = keys.PrivateKey(conta.key)
+
+def _assinaLote(lote : list):
+    # Executada nos processos de assinatura: (endereço, transação) -> (transação assinada, hash)
+    assinadas = []
+    for endereco, tx in lote:
+        assinada = assinaTransacao(_chaves_processo[endereco], tx)
+        assinadas.append((bytes(assinada.rawTransaction), bytes(assinada.hash)))
+    return assinadas
+
+class _Tarefa:
+    # Transação a ser enviada por uma das contas do pool (ou pela conta fixa)
+    __slots__ = ("funcao", "parametros", "processa", "conta", "resultado", "tentativas", "inicio")
+
+    def __init__(self, funcao, parametros : dict, processa, conta = None):
+        self.funcao = funcao
+        self.parametros = parametros
+        self.processa = processa
+        self.conta = conta
+        self.resultado = Future()
+        self.tentativas = 0
+        self.inicio = time.perf_counter()
+
+class _Conta:
+    # Estado de uma conta do pool
+    __slots__ = ("endereco", "nft", "construtor", "em_voo", "pausada_ate", "falhas_seguidas", "estatisticas")
+
+    def __init__(self, endereco : str, nft : NFTAlugavel):
+        self.endereco = endereco
+        self.nft = nft
+        self.construtor = nft.getConstrutor()
+        self.em_voo = 0
+        self.pausada_ate = 0.0
+        self.falhas_seguidas = 0
+        self.estatisticas = {"enviadas": 0, "confirmadas": 0, "revertidas": 0, "falhas": 0, "reenvios": 0, "gas": 0}
+
+class PoolEscritores:
+    '''
+        Cria um novo objeto PoolEscritores. Distribui as escritas do vendedor
+        (criação de NFTs, criação de itens e finalização de aluguéis) entre
+        várias contas, cada uma com a sua sequência de nonces. As transações
+        são montadas por uma thread de despacho, assinadas em processos
+        separados e enviadas em paralelo, uma thread por conta.
+
+        Cada conta mantém no máximo `pendentes_por_conta` transações não
+        confirmadas e é pausada por um tempo crescente após falhas de envio.
+        Os itens são sempre criados pela conta que criou o NFT (ou que é a sua
+        dona atual), já que apenas ela pode transferi-lo ao marketplace.
+
+        Os métodos têm a mesma assinatura dos métodos correspondentes de
+        NFTAlugavel e MarketplaceAluguel, então o pool pode ser usado no lugar
+        dos dois objetos, por exemplo em criaItensEmLote.
+
+        Parâmetros
+        ----------
+            - chaves (list): Chaves privadas das contas
+            - conn_nft (Connection): Conexão do contrato de NFTs
+            - conn_marketplace (Connection): Conexão do contrato do marketplace
+            - contractNFT (str): Endereço do contrato de NFTs
+            - processos (None | int): Quantidade de processos de assinatura (None para a
+            quantidade de CPUs, 0 para assinar na thread de despacho)
+            - pendentes_por_conta (int): Quantidade máxima de transações não confirmadas por conta
+            - tentativas (int): Quantidade máxima de tentativas de envio de cada transação
+            - tamanho_fila (int): Quantidade máxima de transações aguardando envio. Quem
+            submete uma nova transação aguarda enquanto a fila estiver cheia
+
+        Atributos
+        ----------
+            - contas (dict): Estado de cada conta, indexado pelo endereço
+            - donos (dict): Conta que criou (ou possui) cada NFT, indexada pelo ID do token
+            - nonces (GerenciadorNonce): Gerenciador de nonces compartilhado entre as conexões
+            - recibos (RastreadorRecibos): Rastreador de recibos compartilhado entre as conexões
+            - instrumentacao (Instrumentacao): Medições das requisições, atribuídas aos métodos
+            decorados com instrumenta
+            - gas_templates (dict): Gás por função e tamanho da calldata, compartilhado pelas contas
+    '''
+
+    # Intervalo inicial e máximo, em segundos, da pausa de uma conta após uma falha de envio
+    ATRASO_BASE = 0.25
+    ATRASO_MAXIMO = 10.0
+
+    def __init__(self, chaves : list, conn_nft : Connection, conn_marketplace : Connection, contractNFT : str,
+                 processos : int = None, pendentes_por_conta : int = 16, tentativas : int = 3,
+                 tamanho_fila : int = 1000):
+        if not chaves:
+            raise ValueError("Informe ao menos uma chave privada!")
+        self.contract_nft = contractNFT
+        self.processos = (os.cpu_count() or 1) if processos is None else processos
+        self.pendentes_por_conta = pendentes_por_conta
+        self.tentativas = tentativas
+        self.tamanho_fila = tamanho_fila
+        self._chaves = list(chaves)
+        self.contas = {}
+        self.gas_templates = {}
+        for chave in self._chaves:
+            endereco = Account.from_key(chave).address
+            conta = _Conta(endereco, NFTAlugavel(endereco, chave, conn_nft))
+            # A calibração do gás de cada função é feita uma única vez para todas as contas
+            conta.construtor.gas_templates = self.gas_templates
+            self.contas[endereco] = conta
+        # Objetos usados nas leituras e na extração dos resultados dos recibos
+        primeira = self.contas[next(iter(self.contas))]
+        self._nft = primeira.nft
+        self._marketplace = MarketplaceAluguel(primeira.endereco, self._chaves[0], conn_marketplace, contractNFT)
+        self.nonces = self._nft.nonces
+        self.recibos = self._nft.recibos
+        self.instrumentacao = self._nft.instrumentacao
+        self.donos = {}
+        self._fila = deque()
+        self._condicao = threading.Condition()
+        self._thread = None
+        self._encerrado = False
+        self._assinadores = None
+        self._envios = None
+        self._inicio = None
+        self._assinadas = 0
+        self._tempo_assinatura = 0.0
+        self._latencia_total = 0.0
+
+    def _submete(self, tarefa : _Tarefa):
+        with self._condicao:
+            if self._encerrado:
+                raise RuntimeError("O pool de escritores foi encerrado!")
+            # Contrapressão: aguarda enquanto a fila de envio estiver cheia
+            while len(self._fila) >= self.tamanho_fila:
+                self._condicao.wait()
+            if self._inicio is None:
+                self._inicio = time.perf_counter()
+            self._fila.append(tarefa)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._executa, daemon=True)
+                self._thread.start()
+            self._condicao.notify_all()
+        return tarefa.resultado
+
+    def _executa(self):
+        if self.processos > 0:
+            # Este método roda na thread de despacho: um fork copiaria um processo com várias
+            # threads (e travas possivelmente adquiridas), então os processos são iniciados do zero
+            self._assinadores = ProcessPoolExecutor(self.processos, mp_context=multiprocessing.get_context("spawn"),
+                                                    initializer=_iniciaProcesso, initargs=(self._chaves,))
+        self._envios = ThreadPoolExecutor(max_workers=min(len(self.contas), 32))
+        while True:
+            with self._condicao:
+                while True:
+                    if self._encerrado and not self._fila:
+                        return
+                    rodada, espera = self._distribui()
+                    if rodada:
+                        break
+                    self._condicao.wait(espera)
+                self._condicao.notify_all()
+            self._enviaRodada(rodada)
+
+    def _distribui(self):
+        '''
+            Retira da fila as transações que podem ser enviadas agora, cada uma
+            atribuída à sua conta fixa ou à conta com mais vagas. Deve ser
+            chamado com a trava do pool.
+
+            Retorno
+            -------
+                - rodada (tuple): Lista de pares (tarefa, conta) e o tempo máximo
+                de espera até que uma conta pausada volte a enviar (ou None).
+        '''
+        agora = time.monotonic()
+        livres = {}
+        espera = None
+        for conta in self.contas.values():
+            if conta.pausada_ate > agora:
+                espera = min(espera or float("inf"), conta.pausada_ate - agora)
+            elif conta.em_voo < self.pendentes_por_conta:
+                livres[conta] = self.pendentes_por_conta - conta.em_voo
+        rodada, adiadas = [], []
+        vagas = sum(livres.values())
+        while self._fila and vagas > 0:
+            tarefa = self._fila.popleft()
+            conta = tarefa.conta or max(livres, key=livres.get)
+            if livres.get(conta, 0) <= 0:
+                # A conta fixa da transação está cheia ou pausada
+                adiadas.append(tarefa)
+                continue
+            livres[conta] -= 1
+            vagas -= 1
+            conta.em_voo += 1
+            rodada.append((tarefa, conta))
+        self._fila.extendleft(reversed(adiadas))
+        return rodada, espera
+
+    def _enviaRodada(self, rodada : list):
+        '''
+            Monta, assina e envia as transações de uma rodada, mantendo a ordem
+            dos nonces de cada conta.
+
+            Parâmetros
+            ----------
+                - rodada (list): Pares (tarefa, conta) retornados por _distribui.
+        '''
+        try:
+            gas_price = self._nft.getGasPrice()
+        except Exception as e:
+            for tarefa, conta in rodada:
+                self._reenfileira(tarefa, conta, e)
+            return
+        montadas = []
+        for tarefa, conta in rodada:
+            parametros = dict(tarefa.parametros)
+            parametros.setdefault("gasPrice", gas_price)
+            nonce = self.nonces.proximoNonce(conta.endereco)
+            try:
+                montadas.append((tarefa, conta, conta.construtor.constroi(tarefa.funcao, parametros, nonce)))
+            except Exception as e:
+                # Ex.: a estimativa do gás reverteu, então a transação também reverteria
+                self.nonces.devolve(conta.endereco, nonce)
+                self._conclui(tarefa, conta, erro=e)
+
+        try:
+            assinadas = self._assina([(conta.endereco, tx) for _, conta, tx in montadas])
+        except Exception as e:
+            print("Falha na assinatura das transações: {}".format(e))
+            # Devolvidos do maior para o menor, para que o contador de cada conta recue
+            for _, conta, tx in reversed(montadas):
+                self.nonces.devolve(conta.endereco, tx["nonce"])
+            for tarefa, conta, _ in montadas:
+                self._reenfileira(tarefa, conta, e)
+            return
+
+        por_conta = {}
+        for (tarefa, conta, tx), (bruta, tx_hash) in zip(montadas, assinadas):
+            por_conta.setdefault(conta, []).append((tarefa, bruta, tx_hash, tx["nonce"]))
+        envios = {conta: self._envios.submit(self._enviaConta, itens) for conta, itens in por_conta.items()}
+        for conta, envio in envios.items():
+            enviadas, restantes, erro = envio.result()
+            for tarefa, tx_hash in enviadas:
+                self.nonces.confirma(conta.endereco)
+                conta.estatisticas["enviadas"] += 1
+                pendente = self.recibos.rastreia(tx_hash, self._processador(tarefa, conta))
+                pendente.add_done_callback(lambda pendente, tarefa=tarefa, conta=conta: self._confirmada(
+                    tarefa, conta, pendente))
+            if not restantes:
+                conta.falhas_seguidas = 0
+                continue
+            if self.nonces.erroDeNonce(erro):
+                # O primeiro nonce não aceito já está em uso na rede, então as
+                # reservas são descartadas e o contador sincronizado
+                for _ in restantes:
+                    self.nonces.confirma(conta.endereco)
+                self.nonces.sincroniza(conta.endereco)
+            else:
+                # Os nonces a partir da primeira transação não aceita ficaram livres
+                for _, _, _, nonce in reversed(restantes):
+                    self.nonces.devolve(conta.endereco, nonce)
+            with self._condicao:
+                conta.falhas_seguidas += 1
+                conta.pausada_ate = time.monotonic() + min(self.ATRASO_MAXIMO,
+                                                           self.ATRASO_BASE * 2 ** (conta.falhas_seguidas - 1))
+            self._reenfileira(restantes[0][0], conta, erro)
+            for tarefa, _, _, _ in restantes[1:]:
+                self._reenfileira(tarefa, conta, None)
+
+    def _assina(self, lista : list):
+        # Assina em processos separados, em blocos de tamanho próximo para cada processo
+        inicio = time.perf_counter()
+        if self._assinadores is None:
+            assinadas = []
+            for endereco, tx in lista:
+                assinada = self.contas[endereco].construtor.assina(tx)
+                assinadas.append((bytes(assinada.rawTransaction), bytes(assinada.hash)))
+        else:
+            tamanho = max(1, -(-len(lista) // self.processos))
+            blocos = [lista[i:i + tamanho] for i in range(0, len(lista), tamanho)]
+            assinadas = [assinada for bloco in self._assinadores.map(_assinaLote, blocos) for assinada in bloco]
+        self._tempo_assinatura += time.perf_counter() - inicio
+        self._assinadas += len(lista)
+        return assinadas
+
+    def _enviaConta(self, itens : list):
+        '''
+            Envia em ordem as transações assinadas de uma conta, parando na
+            primeira que não for aceita para não deixar lacunas nos nonces.
+
+            Retorno
+            -------
+                - resultado (tuple): Transações enviadas (tarefa, hash), transações
+                não enviadas (tarefa, transação assinada, hash, nonce) e o erro do envio.
+        '''
+        enviadas = []
+        for indice, (tarefa, bruta, tx_hash, _) in enumerate(itens):
+            try:
+                self._enviaBruta(bruta)
+            except Exception as e:
+                return enviadas, itens[indice:], e
+            enviadas.append((tarefa, tx_hash))
+        return enviadas, [], None
+
+    def _enviaBruta(self, bruta : bytes):
+        # Erros temporários são repetidos com a mesma transação assinada (mesmo nonce)
+        for tentativa in range(self.tentativas):
+            try:
+                self._nft.web3.eth.send_raw_transaction(bruta)
+                return
+            except Exception as e:
+                if "already known" in str(e).lower():
+                    # Uma tentativa anterior já havia sido aceita pelo nó
+                    return
+                if self.nonces.erroDeNonce(e) or tentativa == self.tentativas - 1:
+                    raise
+                time.sleep(self.ATRASO_BASE * 2 ** tentativa)
+
+    def _reenfileira(self, tarefa : _Tarefa, conta : _Conta, erro : Exception):
+        # Devolve uma transação não enviada ao início da fila ou a conclui com o erro
+        if erro is not None:
+            tarefa.tentativas += 1
+            if tarefa.tentativas >= self.tentativas:
+                self._conclui(tarefa, conta, erro=erro)
+                return
+        with self._condicao:
+            conta.em_voo -= 1
+            conta.estatisticas["reenvios"] += 1
+            self._fila.appendleft(tarefa)
+            self._condicao.notify_all()
+
+    def _processador(self, tarefa : _Tarefa, conta : _Conta):
+        def processa(recibo):
+            conta.estatisticas["gas"] += recibo["gasUsed"]
+            return tarefa.processa(conta, recibo)
+        return processa
+
+    def _confirmada(self, tarefa : _Tarefa, conta : _Conta, pendente : Future):
+        try:
+            resultado = pendente.result()
+        except Exception as e:
+            self._conclui(tarefa, conta, erro=e)
+            return
+        self._conclui(tarefa, conta, resultado)
+
+    def _conclui(self, tarefa : _Tarefa, conta : _Conta, resultado = None, erro : Exception = None):
+        with self._condicao:
+            conta.em_voo -= 1
+            if erro is None:
+                conta.estatisticas["confirmadas"] += 1
+                self._latencia_total += time.perf_counter() - tarefa.inicio
+            elif isinstance(erro, TransacaoRevertida):
+                conta.estatisticas["revertidas"] += 1
+            else:
+                conta.estatisticas["falhas"] += 1
+            self._condicao.notify_all()
+        if erro is None:
+            tarefa.resultado.set_result(resultado)
+        else:
+            tarefa.resultado.set_exception(erro)
+
+    def _registraToken(self, conta : _Conta, recibo):
+        token_id = self._nft.extraiTokenId(recibo)
+        self.donos[token_id] = conta.endereco
+        return token_id
+
+    def _contaDoToken(self, tokenId : int):
+        '''
+            Resgata a conta do pool que criou um NFT, consultando o dono atual
+            do token caso ele tenha sido criado fora do pool.
+
+            Parâmetros
+            ----------
+                - tokenId (int): ID do NFT.
+
+            Retorno
+            -------
+                - conta (_Conta): Conta dona do NFT.
+        '''
+        endereco = self.donos.get(tokenId)
+        if endereco is None:
+            donos = self._nft.getDonos([tokenId]) or {}
+            endereco = donos.get(tokenId)
+            if endereco not in self.contas:
+                raise Exception("O NFT {} não pertence a nenhuma conta do pool!".format(tokenId))
+            self.donos[tokenId] = endereco
+        return self.contas[endereco]
+
+    @instrumenta
+    def criarNovoToken(self, tokenCID : str, aguardar : bool = True):
+        '''
+            Salva um NFT na blockchain a partir da conta com mais vagas.
+
+            Parâmetros
+            ----------
+                - tokenCID (str): CID do novo NFT.
+                - aguardar (bool): Aguarda a mineração da transação (True) ou
+                retorna imediatamente a transação pendente (False).
+
+            Retorno
+            -------
+                - token_id (None | int | Future): ID do novo Token, a transação
+                pendente que resolve para o ID caso aguardar seja False,
+                ou None caso ocorra algum erro.
+        '''
+        try:
+            pendente = self._submete(_Tarefa(self._nft.contract.functions.criarNovoToken(tokenCID), {},
+                                             self._registraToken))
+            if not aguardar:
+                return pendente
+            return self._nft._aguarda(pendente)
+        except Exception as e:
+            print(e)
+            return None
+
+    @instrumenta
+    def criaItemAlugavel(self, tokenId : int, preco : int, tempoExpira : int, taxa : float, aguardar : bool = True):
+        '''
+            Disponibiliza um NFT para ser alugado, a partir da conta dona do NFT.
+
+            Parâmetros
+            ----------
+                - tokenId (int): ID do NFT.
+                - preco (int): Preço do NFT alugável em Ether.
+                - tempoExpira (int): Tempo de expiração do item em segundos.
+                - taxa (float): Taxa cobrada pelo marketplace para criar um novo item.
+                - aguardar (bool): Aguarda a mineração da transação (True) ou
+                retorna imediatamente a transação pendente (False).
+
+            Retorno
+            -------
+                - item (None | Item | Future): Item cadastrado, a transação
+                pendente que resolve para ele caso aguardar seja False, ou None
+                caso ocorra algum erro.
+        '''
+        try:
+            conta = self._contaDoToken(tokenId)
+            funcao = self._marketplace.contract.functions.criaItemAlugavel(
+                self.contract_nft,
+                tokenId,
+                Web3.to_wei(preco, 'ether'),
+                tempoExpira
+            )
+            pendente = self._submete(_Tarefa(funcao, {'value': Web3.to_wei(taxa, 'ether')},
+                                             lambda conta, recibo: self._marketplace.extraiItemCriado(recibo),
+                                             conta))
+            if not aguardar:
+                return pendente
+            return self._nft._aguarda(pendente)
+        except Exception as e:
+            print(e)
+            return None
+
+    @instrumenta
+    def finalizaAluguel(self, itemId : int, aguardar : bool = True):
+        '''
+            Finaliza um aluguel já expirado a partir da conta com mais vagas.
+
+            Parâmetros
+            ----------
+                - itemId (int): ID do item alugado.
+                - aguardar (bool): Aguarda a mineração da transação (True) ou
+                retorna imediatamente a transação pendente (False).
+
+            Retorno
+            -------
+                - status (bool | Future): Indica o sucesso ou falha da finalização
+                do aluguel, ou a transação pendente caso aguardar seja False.
+        '''
+        try:
+            pendente = self._submete(_Tarefa(self._marketplace.contract.functions.finalizaAluguel(itemId), {},
+                                             lambda conta, recibo: True))
+            if not aguardar:
+                return pendente
+            return self._nft._aguarda(pendente)
+        except Exception as e:
+            print(e)
+            return False
+
+    def getTaxaMarketplace(self):
+        '''
+            Resgata a taxa cobrada pelo marketplace para criar um novo item.
+
+            Retorno
+            -------
+                - taxa (None | float) - Taxa cobrada pelo marketplace.
+        '''
+        return self._marketplace.getTaxaMarketplace()
+
+    def estatisticas(self):
+        '''
+            Resume as transações enviadas pelo pool desde a primeira submissão.
+
+            Retorno
+            -------
+                - estatisticas (dict): Contadores de cada conta e do pool, vazão
+                de transações confirmadas, tempo médio de assinatura e latência
+                média entre a submissão e a confirmação.
+        '''
+        with self._condicao:
+            contas = {endereco: dict(conta.estatisticas, em_voo=conta.em_voo)
+                      for endereco, conta in self.contas.items()}
+            total = {campo: sum(conta[campo] for conta in contas.values())
+                     for campo in ("enviadas", "confirmadas", "revertidas", "falhas", "reenvios", "gas")}
+            tempo = time.perf_counter() - self._inicio if self._inicio is not None else 0.0
+            return {
+                "contas": contas,
+                "total": total,
+                "fila": len(self._fila),
+                "tempo_s": tempo,
+                "confirmadas_por_segundo": total["confirmadas"] / tempo if tempo else 0.0,
+                "assinatura_ms_media": 1000 * self._tempo_assinatura / self._assinadas if self._assinadas else None,
+                "latencia_ms_media": 1000 * self._latencia_total / total["confirmadas"] if total["confirmadas"] else None
+            }
+
+    def encerra(self):
+        '''
+            Envia as transações que ainda estão na fila e encerra a thread de
+            despacho e os processos de assinatura. As transações já enviadas
+            continuam sendo acompanhadas pelo rastreador de recibos.
+        '''
+        with self._condicao:
+            self._encerrado = True
+            self._condicao.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join()
+        if self._assinadores is not None:
+            self._assinadores.shutdown()
+        if self._envios is not None:
+            self._envios.shutdown()
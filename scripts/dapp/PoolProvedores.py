@@ -0,0 +1,200 @@
+import json, time, hashlib, threading
+import requests
+from requests.adapters import HTTPAdapter
+from web3 import Web3
+from dapp.GerenciadorNonce import GerenciadorNonce
+from dapp.RastreadorRecibos import RastreadorRecibos
+from dapp.CacheTTL import CacheTTL
+from dapp.Instrumentacao import Instrumentacao
+from dapp.ProvedorMultiplo import ProvedorMultiplo
+
+class PoolProvedores:
+    '''
+        Cria um novo objeto PoolProvedores. Mantém uma única instância Web3
+        por URL de rede, com uma sessão HTTP persistente (keep-alive) e os
+        objetos que devem ser compartilhados por todos os contratos da rede.
+        Utilize PoolProvedores.obtem para resgatar a instância de uma URL.
+
+        Parâmetros
+        ----------
+            - provider (str): URL do provedor da rede, ou várias URLs de nós da mesma
+            rede separadas por vírgula (ProvedorMultiplo)
+            - tamanho_pool (int): Quantidade máxima de conexões TCP mantidas abertas
+
+        Atributos
+        ----------
+            - provider (str): URL do provedor da rede
+            - sessao (Session): Sessão HTTP compartilhada
+            - web3 (Web3): Instância Web3 compartilhada
+            - nonce_manager (GerenciadorNonce): Gerenciador de nonces da rede
+            - receipt_tracker (RastreadorRecibos): Rastreador de recibos da rede
+            - cache (CacheTTL): Cache das leituras que mudam pouco na rede
+            - instrumentacao (Instrumentacao): Medições das requisições enviadas à rede
+    '''
+
+    # Instâncias existentes, indexadas pela URL do provedor
+    _instancias = {}
+    _trava = threading.Lock()
+
+    def __init__(self, provider : str, tamanho_pool : int = 20):
+        self.provider = provider
+        self.sessao = requests.Session()
+        urls = [url.strip() for url in provider.split(",") if url.strip()]
+        adaptador = HTTPAdapter(pool_connections=len(urls), pool_maxsize=tamanho_pool)
+        self.sessao.mount("http://", adaptador)
+        self.sessao.mount("https://", adaptador)
+        if len(urls) > 1:
+            # Leituras balanceadas entre os nós e escritas em um primário com troca automática
+            self.web3 = Web3(ProvedorMultiplo(urls, self.sessao))
+        else:
+            self.web3 = Web3(Web3.HTTPProvider(provider, session=self.sessao))
+        # Camada mais interna, mede apenas o envio de cada requisição ao provedor
+        self.instrumentacao = Instrumentacao()
+        self.web3.middleware_onion.inject(self.instrumentacao.middleware, name="instrumentacao", layer=0)
+        self.nonce_manager = GerenciadorNonce(self.web3)
+        # Os blocos observados pelo rastreador invalidam as entradas por bloco do
+        # cache; sem transações pendentes, o próprio cache consulta o bloco atual
+        self.cache = CacheTTL(consulta_bloco=self.web3.eth.get_block_number)
+        self.receipt_tracker = RastreadorRecibos(self.web3, notifica_bloco=self.cache.registraBloco)
+        self._conectado = None
+        self._trava_conexao = threading.Lock()
+        # Objetos dos contratos, indexados pelo endereço e pelo hash da ABI
+        self._contratos = {}
+
+    @classmethod
+    def obtem(cls, provider : str, tamanho_pool : int = 20):
+        '''
+            Resgata a instância compartilhada de uma URL, criando-a no primeiro uso.
+
+            Parâmetros
+            ----------
+                - provider (str): URL do provedor da rede.
+                - tamanho_pool (int): Quantidade máxima de conexões TCP mantidas
+                abertas. Utilizado apenas na criação da instância.
+
+            Retorno
+            -------
+                - pool (PoolProvedores): Instância compartilhada da URL.
+        '''
+        with cls._trava:
+            if provider not in cls._instancias:
+                cls._instancias[provider] = cls(provider, tamanho_pool)
+            return cls._instancias[provider]
+
+    def estaConectado(self):
+        '''
+            Verifica a conexão com a rede uma única vez por instância.
+
+            Retorno
+            -------
+                - status (bool): True caso a rede esteja acessível.
+        '''
+        with self._trava_conexao:
+            if not self._conectado:
+                self._conectado = self.web3.is_connected()
+            return self._conectado
+
+    def contrato(self, endereco : str, abi : list):
+        '''
+            Resgata o objeto de um contrato, criando-o apenas na primeira vez
+            em que o mesmo endereço e a mesma ABI são utilizados na rede.
+
+            Parâmetros
+            ----------
+                - endereco (str): Endereço do contrato.
+                - abi (list): ABI do contrato.
+
+            Retorno
+            -------
+                - contract (Contract): Objeto do contrato.
+        '''
+        chave = (endereco, hashlib.sha256(json.dumps(abi, sort_keys=True).encode()).hexdigest())
+        with self._trava_conexao:
+            contrato = self._contratos.get(chave)
+            if contrato is None:
+                contrato = self._contratos[chave] = self.web3.eth.contract(address=endereco, abi=abi)
+            return contrato
+
+    def make_batch_request(self, requisicoes : list):
+        '''
+            Envia várias requisições JSON-RPC em uma única requisição HTTP
+            pela sessão compartilhada. Com vários nós, o envio passa pelo
+            ProvedorMultiplo (escolha e troca de nó). A requisição é registrada
+            na instrumentação como "lote_<método>", pois não passa pelos
+            middlewares do web3.
+
+            Parâmetros
+            ----------
+                - requisicoes (list): Requisições JSON-RPC completas (com id).
+
+            Retorno
+            -------
+                - resposta (list | dict): Lista de respostas, ou a resposta de erro
+                de um nó que não aceita requisições em lote.
+        '''
+        provider = self.web3.provider
+        metodo = "lote_{}".format(requisicoes[0]["method"] if requisicoes else "vazio")
+        inicio = time.perf_counter()
+        try:
+            if isinstance(provider, ProvedorMultiplo):
+                resposta = provider.make_batch_request(requisicoes)
+            else:
+                envio = self.sessao.post(provider.endpoint_uri, data=json.dumps(requisicoes).encode(),
+                                         **provider.get_request_kwargs())
+                envio.raise_for_status()
+                resposta = envio.json()
+        except Exception:
+            self.instrumentacao.registraRequisicao(metodo, time.perf_counter() - inicio, True)
+            raise
+        self.instrumentacao.registraRequisicao(metodo, time.perf_counter() - inicio, not isinstance(resposta, list))
+        return resposta
+
+    def getWeb3(self):
+        '''
+            Retorna a instância Web3 compartilhada.
+
+            Retorno
+            -------
+                - web3 (Web3): Instância Web3.
+        '''
+        return self.web3
+
+    def getNonceManager(self):
+        '''
+            Retorna o gerenciador de nonces compartilhado.
+
+            Retorno
+            -------
+                - nonce_manager (GerenciadorNonce): Gerenciador de nonces da rede.
+        '''
+        return self.nonce_manager
+
+    def getReceiptTracker(self):
+        '''
+            Retorna o rastreador de recibos compartilhado.
+
+            Retorno
+            -------
+                - receipt_tracker (RastreadorRecibos): Rastreador de recibos da rede.
+        '''
+        return self.receipt_tracker
+
+    def getCache(self):
+        '''
+            Retorna o cache compartilhado.
+
+            Retorno
+            -------
+                - cache (CacheTTL): Cache das leituras que mudam pouco na rede.
+        '''
+        return self.cache
+
+    def getInstrumentacao(self):
+        '''
+            Retorna a instrumentação compartilhada.
+
+            Retorno
+            -------
+                - instrumentacao (Instrumentacao): Medições das requisições enviadas à rede.
+        '''
+        return self.instrumentacao
@@ -0,0 +1,339 @@
+import json, time, random, threading
+import requests
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from web3 import Web3
+from web3.providers.base import BaseProvider
+from web3.exceptions import ProviderConnectionError
+
+# Métodos enviados sempre ao primário: escritas, nonces pendentes e filtros (estado local do nó)
+METODOS_PRIMARIO = frozenset({
+    "eth_sendRawTransaction", "eth_sendTransaction", "eth_getTransactionCount",
+    "eth_newFilter", "eth_newBlockFilter", "eth_newPendingTransactionFilter",
+    "eth_getFilterChanges", "eth_getFilterLogs", "eth_uninstallFilter"
+})
+
+# Erros de um novo primário indicando que a transação reenviada já havia chegado à rede pelo nó anterior
+ERROS_JA_ENVIADA = ("already known", "nonce too low")
+
+class _Endpoint:
+    # Estado de saúde e latência de um nó
+    __slots__ = ("url", "provider", "latencia", "falhas", "saudavel", "bloco", "requisicoes", "erros")
+
+    def __init__(self, url : str, provider):
+        self.url = url
+        self.provider = provider
+        self.latencia = None
+        self.falhas = 0
+        self.saudavel = True
+        self.bloco = None
+        self.requisicoes = 0
+        self.erros = 0
+
+class ProvedorMultiplo(BaseProvider):
+    '''
+        Cria um novo objeto ProvedorMultiplo. Provedor do web3 que distribui
+        as requisições entre vários nós da mesma rede:
+
+        - leituras vão para um nó saudável sorteado com peso inversamente
+        proporcional à sua latência média, e são repetidas em outro nó caso
+        o escolhido não responda;
+        - escritas, nonces pendentes e filtros vão sempre ao mesmo nó
+        (primário), trocado automaticamente por outro nó saudável em caso de
+        falha; uma transação reenviada ao novo primário que ele já conhece
+        (already known / nonce too low) é tratada como enviada;
+        - requisições em lote (make_batch_request) seguem as leituras;
+        - opcionalmente (usaHedge), as chamadas eth_call que demoram mais que
+        o esperado são enviadas também a um segundo nó, e a primeira resposta
+        é utilizada.
+
+        Uma thread verifica periodicamente cada nó (eth_blockNumber), marcando
+        como indisponíveis os que não respondem ou estão atrasados em relação
+        ao nó mais adiantado.
+
+        Parâmetros
+        ----------
+            - urls (list): URLs HTTP dos nós, a primeira é o primário inicial
+            - sessao (None | Session): Sessão HTTP compartilhada pelos nós
+            - tempo_limite (float): Tempo máximo de cada requisição em segundos
+            - intervalo_saude (float): Intervalo entre as verificações de saúde em segundos
+            - falhas_maximas (int): Falhas seguidas para um nó ser marcado como indisponível
+            - atraso_maximo_blocos (int): Blocos de atraso para um nó ser marcado como indisponível
+
+        Atributos
+        ----------
+            - endpoints (list): Estado de cada nó
+            - sessao (Session): Sessão HTTP compartilhada pelos nós
+            - primario (_Endpoint): Nó que recebe as escritas
+            - metodos_hedge (frozenset): Métodos enviados a um segundo nó quando demoram
+            - atraso_hedge (None | float): Espera antes do segundo envio; adaptativa caso seja None
+            - hedges (int): Quantidade de requisições enviadas a um segundo nó
+            - trocas_primario (int): Quantidade de trocas do primário
+    '''
+
+    # Peso da última medição na latência média
+    PESO_LATENCIA = 0.2
+
+    def __init__(self, urls : list, sessao = None, tempo_limite : float = 10.0, intervalo_saude : float = 5.0,
+                 falhas_maximas : int = 3, atraso_maximo_blocos : int = 5):
+        super().__init__()
+        if not urls:
+            raise ValueError("Informe ao menos uma URL!")
+        self.sessao = sessao if sessao is not None else requests.Session()
+        self.endpoints = [
+            _Endpoint(url, Web3.HTTPProvider(url, session=self.sessao, request_kwargs={"timeout": tempo_limite}))
+            for url in urls
+        ]
+        self.primario = self.endpoints[0]
+        self.falhas_maximas = falhas_maximas
+        self.atraso_maximo_blocos = atraso_maximo_blocos
+        self.intervalo_saude = intervalo_saude
+        self.metodos_hedge = frozenset()
+        self.atraso_hedge = None
+        self.hedges = 0
+        self.trocas_primario = 0
+        self._trava = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=4 * len(self.endpoints))
+        self._parar = threading.Event()
+        self._thread = threading.Thread(target=self._verificaSaude, daemon=True)
+        self._thread.start()
+
+    def usaHedge(self, metodos = ("eth_call",), atraso : float = None):
+        '''
+            Passa a enviar as requisições dos métodos informados a um segundo
+            nó quando a resposta do primeiro demora mais que o atraso.
+
+            Parâmetros
+            ----------
+                - metodos (iterable): Métodos JSON-RPC com envio duplicado (vazio desativa).
+                - atraso (None | float): Espera em segundos antes do segundo envio. Caso
+                seja None, utiliza o dobro da latência média do nó escolhido.
+        '''
+        self.metodos_hedge = frozenset(metodos)
+        self.atraso_hedge = atraso
+
+    @property
+    def endpoint_uri(self):
+        return self._escolhe().url
+
+    def get_request_kwargs(self):
+        return self._escolhe().provider.get_request_kwargs()
+
+    def is_connected(self, show_traceback : bool = False):
+        # Conectado caso algum nó responda eth_blockNumber, começando pelos saudáveis
+        with self._trava:
+            ordem = sorted(self.endpoints, key=lambda e: not e.saudavel)
+        erro = None
+        for endpoint in ordem:
+            try:
+                resposta = self._envia(endpoint, "eth_blockNumber", [])
+            except Exception as e:
+                erro = e
+                continue
+            if "result" in resposta:
+                return True
+            erro = resposta.get("error")
+        if show_traceback:
+            raise ProviderConnectionError("Nenhum nó respondeu: {}".format(erro))
+        return False
+
+    def make_request(self, method, params):
+        if method in METODOS_PRIMARIO:
+            return self._escrita(method, params)
+        if method in self.metodos_hedge and len(self.endpoints) > 1:
+            return self._hedge(method, params)
+        return self._leitura(method, params)
+
+    def make_batch_request(self, requisicoes : list):
+        '''
+            Envia várias requisições JSON-RPC de leitura em uma única
+            requisição HTTP, a um nó escolhido como nas leituras e repetida em
+            outro nó caso o escolhido não responda.
+
+            Parâmetros
+            ----------
+                - requisicoes (list): Requisições JSON-RPC completas (com id).
+
+            Retorno
+            -------
+                - resposta (list | dict): Lista de respostas, ou a resposta de erro
+                de um nó que não aceita requisições em lote.
+        '''
+        corpo = json.dumps(requisicoes).encode()
+        tentados = set()
+        while True:
+            endpoint = self._escolhe(tentados)
+            tentados.add(endpoint)
+            try:
+                return self._mede(endpoint, self._postaLote, endpoint, corpo)
+            except Exception:
+                if len(tentados) == len(self.endpoints):
+                    raise
+
+    def _postaLote(self, endpoint : _Endpoint, corpo : bytes):
+        resposta = self.sessao.post(endpoint.url, data=corpo, **endpoint.provider.get_request_kwargs())
+        resposta.raise_for_status()
+        return resposta.json()
+
+    def _escrita(self, method, params):
+        # O mesmo nó recebe as escritas até falhar; uma transação assinada reenviada mantém o seu hash
+        tentados = set()
+        while True:
+            with self._trava:
+                endpoint = self.primario
+            tentados.add(endpoint)
+            try:
+                resposta = self._envia(endpoint, method, params)
+            except Exception:
+                proximo = self._trocaPrimario(endpoint, tentados)
+                if proximo is None:
+                    raise
+                continue
+            if len(tentados) > 1 and method == "eth_sendRawTransaction" and self._jaEnviada(resposta):
+                # O nó anterior chegou a propagar a transação antes de falhar
+                bruta = params[0]
+                tx_hash = Web3.keccak(hexstr=bruta) if isinstance(bruta, str) else Web3.keccak(bruta)
+                return {"jsonrpc": resposta.get("jsonrpc", "2.0"), "id": resposta.get("id"),
+                        "result": Web3.to_hex(tx_hash)}
+            return resposta
+
+    @staticmethod
+    def _jaEnviada(resposta):
+        erro = resposta.get("error") if isinstance(resposta, dict) else None
+        if not erro:
+            return False
+        mensagem = str(erro.get("message", erro) if isinstance(erro, dict) else erro).lower()
+        return any(trecho in mensagem for trecho in ERROS_JA_ENVIADA)
+
+    def _trocaPrimario(self, falho : _Endpoint, tentados : set):
+        with self._trava:
+            if self.primario is not falho:
+                # Outra thread já trocou o primário
+                return self.primario if self.primario not in tentados else None
+            candidatos = [e for e in self.endpoints if e not in tentados and e.saudavel] or \
+                         [e for e in self.endpoints if e not in tentados]
+            if not candidatos:
+                return None
+            self.primario = min(candidatos, key=lambda e: e.latencia if e.latencia is not None else float("inf"))
+            self.trocas_primario += 1
+            return self.primario
+
+    def _leitura(self, method, params):
+        tentados = set()
+        while True:
+            endpoint = self._escolhe(tentados)
+            tentados.add(endpoint)
+            try:
+                return self._envia(endpoint, method, params)
+            except Exception:
+                if len(tentados) == len(self.endpoints):
+                    raise
+
+    def _hedge(self, method, params):
+        primeiro = self._escolhe()
+        segundo = self._escolhe({primeiro})
+        atraso = self.atraso_hedge
+        if atraso is None:
+            atraso = 2 * primeiro.latencia if primeiro.latencia is not None else 0.1
+        pendentes = {self._executor.submit(self._envia, primeiro, method, params)}
+        concluidos, _ = wait(pendentes, timeout=atraso)
+        if concluidos and next(iter(concluidos)).exception() is None:
+            return next(iter(concluidos)).result()
+        # O primeiro nó demorou ou falhou: envia ao segundo e usa a primeira resposta válida
+        with self._trava:
+            self.hedges += 1
+        pendentes.add(self._executor.submit(self._envia, segundo, method, params))
+        erro = None
+        while pendentes:
+            concluidos, pendentes = wait(pendentes, return_when=FIRST_COMPLETED)
+            for futuro in concluidos:
+                if futuro.exception() is None:
+                    return futuro.result()
+                erro = futuro.exception()
+        raise erro
+
+    def _escolhe(self, excluidos : set = frozenset()):
+        # Sorteio ponderado pelo inverso da latência média entre os nós saudáveis
+        with self._trava:
+            candidatos = [e for e in self.endpoints if e.saudavel and e not in excluidos] or \
+                         [e for e in self.endpoints if e not in excluidos] or self.endpoints
+            medidas = [e.latencia for e in candidatos if e.latencia is not None]
+            # Nós ainda sem medições recebem a latência média dos demais
+            padrao = sum(medidas) / len(medidas) if medidas else 1.0
+            pesos = [1.0 / max(e.latencia if e.latencia is not None else padrao, 1e-4) for e in candidatos]
+        return random.choices(candidatos, pesos)[0]
+
+    def _envia(self, endpoint : _Endpoint, method, params):
+        return self._mede(endpoint, endpoint.provider.make_request, method, params)
+
+    def _mede(self, endpoint : _Endpoint, envio, *args):
+        # Atualiza a latência média e as falhas seguidas do nó a cada envio
+        inicio = time.perf_counter()
+        try:
+            resposta = envio(*args)
+        except Exception:
+            self._registraFalha(endpoint)
+            raise
+        duracao = time.perf_counter() - inicio
+        with self._trava:
+            endpoint.requisicoes += 1
+            endpoint.falhas = 0
+            endpoint.latencia = duracao if endpoint.latencia is None else \
+                (1 - self.PESO_LATENCIA) * endpoint.latencia + self.PESO_LATENCIA * duracao
+        return resposta
+
+    def _registraFalha(self, endpoint : _Endpoint):
+        with self._trava:
+            endpoint.requisicoes += 1
+            endpoint.erros += 1
+            endpoint.falhas += 1
+            if endpoint.falhas >= self.falhas_maximas:
+                endpoint.saudavel = False
+
+    def _verificaSaude(self):
+        while not self._parar.is_set():
+            for endpoint in self.endpoints:
+                try:
+                    resposta = self._envia(endpoint, "eth_blockNumber", [])
+                    endpoint.bloco = int(resposta["result"], 16)
+                except Exception:
+                    endpoint.bloco = None
+            with self._trava:
+                blocos = [e.bloco for e in self.endpoints if e.bloco is not None]
+                topo = max(blocos) if blocos else None
+                for endpoint in self.endpoints:
+                    respondeu = endpoint.bloco is not None
+                    atualizado = respondeu and topo - endpoint.bloco <= self.atraso_maximo_blocos
+                    endpoint.saudavel = atualizado and endpoint.falhas < self.falhas_maximas
+                if not self.primario.saudavel:
+                    saudaveis = [e for e in self.endpoints if e.saudavel]
+                    if saudaveis:
+                        self.primario = min(saudaveis, key=lambda e: e.latencia)
+                        self.trocas_primario += 1
+            self._parar.wait(self.intervalo_saude)
+
+    def para(self):
+        '''
+            Interrompe a verificação periódica de saúde dos nós.
+        '''
+        self._parar.set()
+
+    def estado(self):
+        '''
+            Resume o estado de cada nó.
+
+            Retorno
+            -------
+                - estado (list): Para cada nó, a URL, se é o primário, se está
+                saudável, a latência média em segundos, o último bloco visto e
+                as quantidades de requisições e erros.
+        '''
+        with self._trava:
+            return [{
+                "url": e.url,
+                "primario": e is self.primario,
+                "saudavel": e.saudavel,
+                "latencia": e.latencia,
+                "bloco": e.bloco,
+                "requisicoes": e.requisicoes,
+                "erros": e.erros
+            } for e in self.endpoints]
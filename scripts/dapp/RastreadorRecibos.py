@@ -0,0 +1,167 @@
+import time, threading
+from concurrent.futures import Future
+from web3 import Web3
+from web3.exceptions import TransactionNotFound, TimeExhausted
+
+def normalizaHash(tx_hash):
+    '''
+        Converte um hash de transação para texto hexadecimal em minúsculas.
+
+        Parâmetros
+        ----------
+            - tx_hash (HexBytes | bytes | str): Hash da transação.
+
+        Retorno
+        -------
+            - tx_hash (str): Hash no formato '0x...'.
+    '''
+    if isinstance(tx_hash, str):
+        return Web3.to_hex(hexstr=tx_hash).lower()
+    return Web3.to_hex(tx_hash)
+
+class TransacaoRevertida(Exception):
+    '''
+        Erro atribuído a uma transação pendente quando ela é minerada com falha.
+    '''
+    pass
+
+class RastreadorRecibos:
+    '''
+        Cria um novo objeto RastreadorRecibos. Acompanha várias transações
+        pendentes em uma única thread, resolvendo todas as que foram mineradas
+        em cada bloco novo a cada rodada de consulta. Transações não mineradas
+        dentro do prazo (descartadas, substituídas ou com o nó fora do ar) são
+        resolvidas com TimeExhausted.
+
+        Parâmetros
+        ----------
+            - web3 (Web3): Instância Web3
+            - intervalo (float): Intervalo em segundos entre as rodadas de consulta
+            - notifica_bloco (None | callable): Função chamada com o número de
+            cada bloco mais recente observado
+            - tempo_limite (float): Prazo em segundos para a mineração de cada transação
+
+        Atributos
+        ----------
+            - web3 (Web3): Instância Web3
+            - intervalo (float): Intervalo em segundos entre as rodadas de consulta
+            - tempo_limite (float): Prazo em segundos para a mineração de cada transação
+            - pendentes (dict): Transações pendentes indexadas pelo hash
+            - ultimo_bloco (None | int): Último bloco já verificado
+    '''
+
+    def __init__(self, web3 : Web3, intervalo : float = 0.5, notifica_bloco = None, tempo_limite : float = 120):
+        self.web3 = web3
+        self.intervalo = intervalo
+        self.tempo_limite = tempo_limite
+        self.notifica_bloco = notifica_bloco
+        self.pendentes = {}
+        self.ultimo_bloco = None
+        self._novos = []
+        self._trava = threading.Lock()
+        self._acorda = threading.Event()
+        self._thread = None
+
+    def rastreia(self, tx_hash, processa = None):
+        '''
+            Registra uma transação para ser acompanhada.
+
+            Parâmetros
+            ----------
+                - tx_hash (HexBytes | str): Hash da transação.
+                - processa (None | callable): Função aplicada ao recibo para gerar o resultado.
+
+            Retorno
+            -------
+                - pendente (Future): Resolvido com o recibo (ou o resultado de
+                processa) quando a transação for minerada, ou com TimeExhausted
+                caso o prazo termine antes.
+        '''
+        pendente = Future()
+        pendente.tx_hash = normalizaHash(tx_hash)
+        prazo = time.monotonic() + self.tempo_limite
+        with self._trava:
+            self.pendentes[pendente.tx_hash] = (pendente, processa, prazo)
+            self._novos.append(pendente.tx_hash)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._executa, daemon=True)
+                self._thread.start()
+        self._acorda.set()
+        return pendente
+
+    def quantidadePendentes(self):
+        '''
+            Retorna a quantidade de transações ainda não resolvidas.
+
+            Retorno
+            -------
+                - quantidade (int): Quantidade de transações pendentes.
+        '''
+        with self._trava:
+            return len(self.pendentes)
+
+    def _executa(self):
+        while True:
+            with self._trava:
+                if not self.pendentes:
+                    self._thread = None
+                    self.ultimo_bloco = None
+                    return
+            try:
+                self._rodada()
+            except Exception as e:
+                print(e)
+            # O prazo é verificado mesmo quando a rodada falha (ex.: nó fora do ar)
+            self._expira()
+            self._acorda.wait(self.intervalo)
+            self._acorda.clear()
+
+    def _rodada(self):
+        bloco_atual = self.web3.eth.block_number
+        if self.notifica_bloco is not None:
+            self.notifica_bloco(bloco_atual)
+        # Transações recém registradas são consultadas uma única vez, pois
+        # podem ter sido mineradas antes do último bloco verificado
+        with self._trava:
+            novos, self._novos = self._novos, []
+        for tx_hash in novos:
+            try:
+                self._resolve(tx_hash, self.web3.eth.get_transaction_receipt(tx_hash))
+            except TransactionNotFound:
+                pass
+
+        if self.ultimo_bloco is None:
+            self.ultimo_bloco = bloco_atual
+            return
+        # Um bloco novo resolve todas as transações pendentes que ele contém
+        for numero in range(self.ultimo_bloco + 1, bloco_atual + 1):
+            bloco = self.web3.eth.get_block(numero)
+            with self._trava:
+                contidas = [normalizaHash(h) for h in bloco['transactions']]
+                contidas = [h for h in contidas if h in self.pendentes]
+            for tx_hash in contidas:
+                self._resolve(tx_hash, self.web3.eth.get_transaction_receipt(tx_hash))
+            self.ultimo_bloco = numero
+
+    def _expira(self):
+        agora = time.monotonic()
+        with self._trava:
+            expiradas = [tx_hash for tx_hash, (_, _, prazo) in self.pendentes.items() if prazo <= agora]
+            registros = [self.pendentes.pop(tx_hash) for tx_hash in expiradas]
+        for tx_hash, (pendente, _, _) in zip(expiradas, registros):
+            pendente.set_exception(TimeExhausted(
+                "Transação {} não foi minerada em {} segundos!".format(tx_hash, self.tempo_limite)))
+
+    def _resolve(self, tx_hash : str, recibo):
+        with self._trava:
+            registro = self.pendentes.pop(tx_hash, None)
+        if registro is None:
+            return
+        pendente, processa, _ = registro
+        if recibo['status'] == 0:
+            pendente.set_exception(TransacaoRevertida("Transação {} revertida!".format(tx_hash)))
+            return
+        try:
+            pendente.set_result(processa(recibo) if processa else recibo)
+        except Exception as e:
+            pendente.set_exception(e)
@@ -0,0 +1,35 @@
+'''
+    Importa os eventos ItemCriado, TokenId e Transfer desde a implantação do
+    marketplace para um arquivo CSV (ou diretório Parquet, com pyarrow).
+    Execuções interrompidas são retomadas do checkpoint ao repetir o comando.
+
+    Uso: python scripts/importa_historico.py <arquivo.env> <saída> [bloco inicial] [csv|parquet] [threads]
+'''
+import sys
+from utils.run import init
+from dapp.ImportadorHistorico import ImportadorHistorico
+
+def mostraProgresso(resumo : dict):
+    print("Bloco {} | {:.0f} blocos/s | {:.0f} eventos/s | {} eventos".format(
+        resumo['ultimo_bloco'], resumo['blocos_por_segundo'], resumo['eventos_por_segundo'],
+        resumo['eventos_total']))
+
+env_name = sys.argv[1] if len(sys.argv) > 1 else "vendedor.env"
+caminho_saida = sys.argv[2] if len(sys.argv) > 2 else "eventos.csv"
+bloco_inicial = int(sys.argv[3]) if len(sys.argv) > 3 else 0
+formato = sys.argv[4] if len(sys.argv) > 4 else "csv"
+trabalhadores = int(sys.argv[5]) if len(sys.argv) > 5 else 8
+
+nft, marketplace = init(env_name)
+if nft != None and marketplace != None:
+    importador = ImportadorHistorico(marketplace.web3, marketplace.contract, nft.contract, caminho_saida,
+                                     formato=formato, trabalhadores=trabalhadores)
+    print("=======================================================")
+    resumo = importador.importa(bloco_inicial, progresso=mostraProgresso)
+    print("=======================================================")
+    print("Blocos importados: {}".format(resumo['blocos']))
+    print("Eventos importados: {}".format(resumo['eventos']))
+    print("Tempo total: {:.2f} segundos".format(resumo['tempo']))
+    print("Vazão: {:.0f} blocos/s, {:.0f} eventos/s".format(
+        resumo['blocos_por_segundo'], resumo['eventos_por_segundo']))
+    print("=======================================================")
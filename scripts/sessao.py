@@ -0,0 +1,155 @@
+'''
+    Sessão persistente do vendedor ou do locatário: as conexões são criadas
+    uma única vez e reutilizadas por todos os comandos, em um menu interativo
+    ou a partir de um arquivo de comandos (ou da entrada padrão, com "-").
+
+    Cada linha do arquivo de comandos contém a opção do menu (número ou nome)
+    seguida das respostas às suas perguntas, por exemplo:
+
+        postar 1 0.5 3600
+        listar
+
+    Ao final são exibidos o tempo de inicialização e a latência de cada
+    comando, salvos também em JSON caso um arquivo de relatório seja informado.
+
+    Uso: python scripts/sessao.py <vendedor|locatario> [arquivo.env] [arquivo de comandos | -] [relatório.json]
+'''
+import time
+INICIO = time.perf_counter()
+import sys, json, shlex
+
+# Papel -> (arquivo .env padrão, tabela de ações, menu)
+PAPEIS = {
+    "vendedor": ("vendedor.env", "ACOES_VENDEDOR", "menu_vendedor"),
+    "locatario": ("locatario.env", "ACOES_LOCATARIO", "menu_locatario"),
+}
+
+def localiza_acao(acoes : dict, texto : str):
+    # Aceita o número da opção ou o nome do comando
+    for opcao, (nome, acao) in acoes.items():
+        if texto == str(opcao) or texto == nome:
+            return nome, acao
+    return None, None
+
+def executa(nft, marketplace, acoes : dict, linha : str, interativo : bool, latencias : dict):
+    '''
+        Executa um comando da sessão e registra a sua latência.
+
+        Retorno
+        -------
+            - continua (bool): False caso a sessão deva ser encerrada.
+    '''
+    argumentos = shlex.split(linha, comments=True)
+    if not argumentos:
+        return True
+    if argumentos[0] in ("0", "sair"):
+        return False
+    nome, acao = localiza_acao(acoes, argumentos[0])
+    if acao is None:
+        print("Comando desconhecido: {}".format(argumentos[0]))
+        return True
+    respostas = argumentos[1:]
+
+    def pergunta(texto : str):
+        if respostas:
+            resposta = respostas.pop(0)
+            if not interativo:
+                print("{}{}".format(texto, resposta))
+            return resposta
+        if interativo:
+            return input(texto)
+        raise ValueError("Argumentos insuficientes para o comando '{}'".format(nome))
+
+    inicio = time.perf_counter()
+    erro = False
+    try:
+        acao(nft, marketplace, pergunta)
+    except Exception as e:
+        erro = True
+        print(e)
+    duracao = time.perf_counter() - inicio
+    latencias.setdefault(nome, []).append((duracao, erro))
+    print("Comando '{}' executado em {:.1f} ms".format(nome, duracao * 1000))
+    return True
+
+def resume(latencias : dict):
+    resumo = {}
+    for nome, medidas in latencias.items():
+        duracoes = sorted(duracao * 1000 for duracao, _ in medidas)
+        resumo[nome] = {
+            "quantidade": len(duracoes),
+            "falhas": sum(1 for _, erro in medidas if erro),
+            "media_ms": sum(duracoes) / len(duracoes),
+            "p50_ms": duracoes[(len(duracoes) - 1) // 2],
+            "max_ms": duracoes[-1]
+        }
+    return resumo
+
+def main():
+    papel = sys.argv[1] if len(sys.argv) > 1 else "vendedor"
+    if papel not in PAPEIS:
+        print("Papel desconhecido: {} (opções: {})".format(papel, ", ".join(PAPEIS)))
+        return
+    env_padrao, nome_acoes, nome_menu = PAPEIS[papel]
+    env_name = sys.argv[2] if len(sys.argv) > 2 else env_padrao
+    arquivo_comandos = sys.argv[3] if len(sys.argv) > 3 else None
+    caminho_relatorio = sys.argv[4] if len(sys.argv) > 4 else None
+
+    # Os módulos do web3 são importados apenas após a leitura dos argumentos
+    inicio_importacao = time.perf_counter()
+    from utils.run import init
+    from utils import acoes as modulo_acoes, menu as modulo_menu
+    importacao = time.perf_counter() - inicio_importacao
+    inicio_conexao = time.perf_counter()
+    nft, marketplace = init(env_name)
+    conexao = time.perf_counter() - inicio_conexao
+    if marketplace is None:
+        return
+    acoes = getattr(modulo_acoes, nome_acoes)
+    mostra_menu = getattr(modulo_menu, nome_menu)
+    inicializacao = time.perf_counter() - INICIO
+    print("Sessão iniciada em {:.0f} ms (importações: {:.0f} ms, conexão: {:.0f} ms)".format(
+        inicializacao * 1000, importacao * 1000, conexao * 1000))
+
+    latencias = {}
+    if arquivo_comandos is None:
+        while True:
+            mostra_menu()
+            print("=======================================================")
+            try:
+                linha = input("Selecione uma opção: ")
+            except EOFError:
+                break
+            print("=======================================================")
+            if not executa(nft, marketplace, acoes, linha, True, latencias):
+                break
+    else:
+        arquivo = sys.stdin if arquivo_comandos == "-" else open(arquivo_comandos, "r", encoding="utf-8")
+        try:
+            for linha in arquivo:
+                if not executa(nft, marketplace, acoes, linha, False, latencias):
+                    break
+        finally:
+            if arquivo is not sys.stdin:
+                arquivo.close()
+
+    resumo = resume(latencias)
+    print("=======================================================")
+    print("Inicialização: {:.0f} ms (importações: {:.0f} ms, conexão: {:.0f} ms)".format(
+        inicializacao * 1000, importacao * 1000, conexao * 1000))
+    for nome, medidas in resumo.items():
+        print("{}: {} comandos, média {:.1f} ms, p50 {:.1f} ms, máximo {:.1f} ms, falhas {}".format(
+            nome, medidas["quantidade"], medidas["media_ms"], medidas["p50_ms"], medidas["max_ms"], medidas["falhas"]))
+    print("=======================================================")
+    if caminho_relatorio:
+        with open(caminho_relatorio, "w", encoding="utf-8") as arquivo:
+            json.dump({
+                "papel": papel,
+                "inicializacao_ms": inicializacao * 1000,
+                "importacao_ms": importacao * 1000,
+                "conexao_ms": conexao * 1000,
+                "comandos": resumo
+            }, arquivo, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+from datetime import datetime
+
+def mostra_item(item, data_expiracao : bool = False):
+    '''
+        Exibe os dados de um item do marketplace.
+
+        Parâmetros
+        ----------
+            - item (Item): Item a ser exibido.
+            - data_expiracao (bool): Exibe o prazo como data de expiração (itens
+            alugados) em vez de segundos.
+    '''
+    print("ID do item alugável: {}".format(item.itemId))
+    print("ID do NFT: {}".format(item.tokenId))
+    print("Endereço do contrato do NFT: {}".format(item.contratoNFT))
+    print("Alugado? {}".format(item.alugadoTexto))
+    print("Vendedor: {}".format(item.vendedor))
+    print("Locatário: {}".format(item.locatarioTexto))
+    print("Valor do aluguel: {} ETH".format(item.precoEther))
+    if data_expiracao:
+        print("Prazo do aluguel: {}".format(datetime.fromtimestamp(item.expiraEm)))
+    else:
+        print("Prazo do aluguel em segundos: {}".format(item.expiraEm))
+    print("=======================================================")
+
+def criar_nft(nft, marketplace, pergunta = input):
+    '''
+        Cria um novo NFT a partir de um CID.
+
+        Parâmetros
+        ----------
+            - nft (NFTAlugavel): Instância do contrato de NFTs.
+            - marketplace (MarketplaceAluguel): Instância do contrato do marketplace.
+            - pergunta (callable): Função que recebe o texto da pergunta e retorna a resposta.
+    '''
+    print("=======================================================")
+    token_cid = pergunta("Cole aqui o CID do NFT que deseja criar: ")
+    print("=======================================================")
+    token_id = nft.criarNovoToken(token_cid)
+    if token_id is not None:
+        print("ID do NFT gerado: {}".format(token_id))
+    print("=======================================================")
+
+def postar_nft(nft, marketplace, pergunta = input):
+    '''
+        Disponibiliza um NFT para aluguel.
+
+        Parâmetros
+        ----------
+            - nft (NFTAlugavel): Instância do contrato de NFTs.
+            - marketplace (MarketplaceAluguel): Instância do contrato do marketplace.
+            - pergunta (callable): Função que recebe o texto da pergunta e retorna a resposta.
+    '''
+    print("=======================================================")
+    token_id = int(pergunta("Digite o ID do NFT: "))
+    preco = float(pergunta("Digite o preço de aluguel do NFT (Em Ether): "))
+    tempo = int(pergunta("Digite o tempo do aluguel (Em segundos): "))
+    taxa = marketplace.getTaxaMarketplace()
+    print("Taxa cobrada pelo marketplace: {} ETH".format(taxa))
+    print("=======================================================")
+    item_criado = marketplace.criaItemAlugavel(token_id, preco, tempo, taxa)
+    if item_criado is not None:
+        print("=======================================================")
+        print("ID do item alugável: {}".format(item_criado.itemId))
+        print("ID do NFT: {}".format(item_criado.tokenId))
+        print("Alugado? {}".format(item_criado.alugadoTexto))
+        print("Vendedor: {}".format(item_criado.vendedor))
+        print("Valor do aluguel: {} ETH".format(item_criado.precoEther))
+        print("Prazo do aluguel em segundos: {}".format(item_criado.expiraEm))
+        print("=======================================================")
+
+def listar_nfts_vendedor(nft, marketplace, pergunta = input):
+    '''
+        Exibe os NFTs postados pela conta.
+
+        Parâmetros
+        ----------
+            - nft (NFTAlugavel): Instância do contrato de NFTs.
+            - marketplace (MarketplaceAluguel): Instância do contrato do marketplace.
+            - pergunta (callable): Função que recebe o texto da pergunta e retorna a resposta.
+    '''
+    print("=======================================================")
+    nfts = marketplace.getNFTsPorVendedor()
+    if len(nfts) > 0:
+        print("NFTs pertencentes a esta conta:\n")
+        for item in nfts:
+            mostra_item(item)
+    else:
+        print("Nenhum NFT pertencente a esta conta!")
+        print("=======================================================")
+
+def criar_nfts_em_lote(nft, marketplace, pergunta = input):
+    '''
+        Cria e posta um NFT para cada CID de um arquivo.
+
+        Parâmetros
+        ----------
+            - nft (NFTAlugavel): Instância do contrato de NFTs.
+            - marketplace (MarketplaceAluguel): Instância do contrato do marketplace.
+            - pergunta (callable): Função que recebe o texto da pergunta e retorna a resposta.
+    '''
+    # Importado apenas quando utilizado
+    from utils.lote import criaItensEmLote
+    print("=======================================================")
+    caminho_cids = pergunta("Digite o caminho do arquivo de CIDs: ")
+    caminho_manifesto = pergunta("Digite o caminho do manifesto de resultados: ")
+    preco = float(pergunta("Digite o preço de aluguel de cada NFT (Em Ether): "))
+    tempo = int(pergunta("Digite o tempo do aluguel (Em segundos): "))
+    concorrencia = int(pergunta("Digite a quantidade máxima de transações pendentes: "))
+    print("=======================================================")
+    escritores = marketplace.escritores
+    if escritores is None:
+        resumo = criaItensEmLote(nft, marketplace, caminho_cids, caminho_manifesto, preco, tempo, concorrencia)
+    else:
+        # O pool de escritores substitui os dois contratos, distribuindo as transações entre as contas
+        resumo = criaItensEmLote(escritores, escritores, caminho_cids, caminho_manifesto, preco, tempo, concorrencia)
+    print("Itens criados: {}".format(resumo['criados']))
+    print("Itens já processados anteriormente: {}".format(resumo['ignorados']))
+    print("Falhas: {}".format(resumo['falhas']))
+    print("Tempo total: {:.2f} segundos".format(resumo['tempo']))
+    if escritores is not None:
+        estatisticas = escritores.estatisticas()
+        print("Transações confirmadas por segundo: {:.1f}".format(estatisticas['confirmadas_por_segundo']))
+        for endereco, conta in estatisticas['contas'].items():
+            print("{}: {} confirmadas, {} revertidas, {} falhas, {} reenvios".format(
+                endereco, conta['confirmadas'], conta['revertidas'], conta['falhas'], conta['reenvios']))
+    print("=======================================================")
+
+def listar_nfts_disponiveis(nft, marketplace, pergunta = input):
+    '''
+        Exibe os NFTs disponíveis para alugar.
+
+        Parâmetros
+        ----------
+            - nft (NFTAlugavel): Instância do contrato de NFTs.
+            - marketplace (MarketplaceAluguel): Instância do contrato do marketplace.
+            - pergunta (callable): Função que recebe o texto da pergunta e retorna a resposta.
+    '''
+    print("=======================================================")
+    nfts = marketplace.getNFTsAlugaveis()
+    if len(nfts) > 0:
+        print("NFTs disponíveis para alugar:\n")
+        for item in nfts:
+            mostra_item(item)
+    else:
+        print("Nenhum NFT disponível!")
+        print("=======================================================")
+
+def alugar_nft(nft, marketplace, pergunta = input):
+    '''
+        Aluga um item do marketplace.
+
+        Parâmetros
+        ----------
+            - nft (NFTAlugavel): Instância do contrato de NFTs.
+            - marketplace (MarketplaceAluguel): Instância do contrato do marketplace.
+            - pergunta (callable): Função que recebe o texto da pergunta e retorna a resposta.
+    '''
+    print("=======================================================")
+    item_id = int(pergunta("Digite o ID de um item para alugar: "))
+    pgto = float(pergunta("Digite o valor deste item para pagamento: "))
+    print("=======================================================")
+    if marketplace.alugarItem(item_id, pgto):
+        print("Item alugado com sucesso!")
+        print("=======================================================")
+
+def listar_nfts_alugados(nft, marketplace, pergunta = input):
+    '''
+        Exibe os NFTs alugados pela conta.
+
+        Parâmetros
+        ----------
+            - nft (NFTAlugavel): Instância do contrato de NFTs.
+            - marketplace (MarketplaceAluguel): Instância do contrato do marketplace.
+            - pergunta (callable): Função que recebe o texto da pergunta e retorna a resposta.
+    '''
+    print("=======================================================")
+    nfts = marketplace.getNFTsPorLocatario()
+    if len(nfts) > 0:
+        print("NFTs alugados por esta conta:\n")
+        for item in nfts:
+            mostra_item(item, data_expiracao=True)
+    else:
+        print("Nenhum NFT alugado por esta conta!")
+        print("=======================================================")
+
+def finalizar_aluguel(nft, marketplace, pergunta = input):
+    '''
+        Finaliza o aluguel de um item.
+
+        Parâmetros
+        ----------
+            - nft (NFTAlugavel): Instância do contrato de NFTs.
+            - marketplace (MarketplaceAluguel): Instância do contrato do marketplace.
+            - pergunta (callable): Função que recebe o texto da pergunta e retorna a resposta.
+    '''
+    print("=======================================================")
+    item_id = int(pergunta("Digite o ID de um item para finalizar o aluguel: "))
+    print("=======================================================")
+    if marketplace.finalizaAluguel(item_id):
+        print("Aluguel finalizado com sucesso!")
+        print("=======================================================")
+
+# Opções de cada menu: número -> (nome do comando, ação)
+ACOES_VENDEDOR = {
+    1: ("criar", criar_nft),
+    2: ("postar", postar_nft),
+    3: ("listar", listar_nfts_vendedor),
+    4: ("lote", criar_nfts_em_lote),
+}
+ACOES_LOCATARIO = {
+    1: ("disponiveis", listar_nfts_disponiveis),
+    2: ("alugar", alugar_nft),
+    3: ("alugados", listar_nfts_alugados),
+    4: ("finalizar", finalizar_aluguel),
+}
@@ -0,0 +1,149 @@
+import os, csv, time
+from concurrent.futures import wait, FIRST_COMPLETED
+from dapp.NFTAlugavel import NFTAlugavel
+from dapp.MarketplaceAluguel import MarketplaceAluguel
+
+# Colunas do manifesto de resultados
+COLUNAS_MANIFESTO = ["cid", "tokenId", "itemId"]
+
+def leCIDs(caminho_cids : str):
+    '''
+        Lê um arquivo de CIDs linha a linha, sem carregá-lo inteiro na memória.
+
+        Parâmetros
+        ----------
+            - caminho_cids (str): Caminho do arquivo contendo um CID por linha.
+
+        Retorno
+        -------
+            - cids (generator): Gerador dos CIDs não vazios do arquivo.
+    '''
+    with open(caminho_cids, "r", encoding="utf-8") as arquivo:
+        for linha in arquivo:
+            cid = linha.strip()
+            if cid:
+                yield cid
+
+def leManifesto(caminho_manifesto : str):
+    '''
+        Lê um manifesto gerado por uma execução anterior.
+
+        Parâmetros
+        ----------
+            - caminho_manifesto (str): Caminho do manifesto.
+
+        Retorno
+        -------
+            - processados (dict): Dicionário CID -> (tokenId, itemId) com o
+            último estado registrado de cada CID.
+    '''
+    processados = {}
+    if not os.path.exists(caminho_manifesto):
+        return processados
+    with open(caminho_manifesto, "r", encoding="utf-8", newline="") as arquivo:
+        for linha in csv.DictReader(arquivo):
+            token_id = int(linha["tokenId"]) if linha["tokenId"] else None
+            item_id = int(linha["itemId"]) if linha["itemId"] else None
+            processados[linha["cid"]] = (token_id, item_id)
+    return processados
+
+def criaItensEmLote(nft : NFTAlugavel, marketplace : MarketplaceAluguel, caminho_cids : str,
+                    caminho_manifesto : str, preco : float, tempo : int, concorrencia : int = 50):
+    '''
+        Cria um NFT e o disponibiliza para aluguel para cada CID de um arquivo.
+        As transações são enviadas sem aguardar a mineração, mantendo até
+        `concorrencia` transações pendentes ao mesmo tempo. Cada resultado é
+        anexado ao manifesto, permitindo retomar uma execução interrompida.
+
+        Parâmetros
+        ----------
+            - nft (NFTAlugavel): Instância do contrato de NFTs.
+            - marketplace (MarketplaceAluguel): Instância do contrato do marketplace.
+            - caminho_cids (str): Caminho do arquivo contendo um CID por linha.
+            - caminho_manifesto (str): Caminho do manifesto CSV (cid, tokenId, itemId).
+            - preco (float): Preço de aluguel de cada NFT em Ether.
+            - tempo (int): Tempo do aluguel em segundos.
+            - concorrencia (int): Quantidade máxima de transações pendentes.
+
+        Retorno
+        -------
+            - resumo (dict): Quantidade de itens criados, ignorados e com falha,
+            além do tempo total em segundos.
+    '''
+    inicio = time.perf_counter()
+    resumo = {"criados": 0, "ignorados": 0, "falhas": 0}
+    processados = leManifesto(caminho_manifesto)
+    # A taxa é resgatada uma única vez para todo o lote
+    taxa = marketplace.getTaxaMarketplace()
+    if taxa is None:
+        raise RuntimeError("Não foi possível resgatar a taxa do marketplace!")
+
+    novo_arquivo = not os.path.exists(caminho_manifesto)
+    with open(caminho_manifesto, "a", encoding="utf-8", newline="") as arquivo:
+        escritor = csv.writer(arquivo)
+
+        def registra(linha : list):
+            # Cada linha vai ao disco antes da próxima, para que uma execução
+            # interrompida não perca resultados já confirmados na rede
+            escritor.writerow(linha)
+            arquivo.flush()
+            os.fsync(arquivo.fileno())
+
+        if novo_arquivo:
+            registra(COLUNAS_MANIFESTO)
+
+        # Transação pendente -> (etapa, cid, tokenId)
+        pendentes = {}
+
+        def posta(cid : str, token_id : int):
+            pendente = marketplace.criaItemAlugavel(token_id, preco, tempo, taxa, aguardar=False)
+            if pendente is None:
+                registra([cid, token_id, ""])
+                resumo["falhas"] += 1
+            else:
+                pendentes[pendente] = ("postagem", cid, token_id)
+
+        def processaConcluidas(concluidas):
+            for pendente in concluidas:
+                etapa, cid, token_id = pendentes.pop(pendente)
+                try:
+                    resultado = pendente.result()
+                except Exception as e:
+                    print("Falha ao processar o CID {}: {}".format(cid, e))
+                    registra([cid, token_id if token_id is not None else "", ""])
+                    resumo["falhas"] += 1
+                    continue
+                if etapa == "criacao":
+                    # O NFT já existe na rede: uma execução retomada deve apenas postá-lo
+                    registra([cid, resultado, ""])
+                    posta(cid, resultado)
+                else:
+                    registra([cid, token_id, resultado.itemId])
+                    resumo["criados"] += 1
+
+        for cid in leCIDs(caminho_cids):
+            token_id, item_id = processados.get(cid, (None, None))
+            if item_id is not None:
+                resumo["ignorados"] += 1
+                continue
+            # Limita a quantidade de transações pendentes
+            while len(pendentes) >= concorrencia:
+                concluidas, _ = wait(list(pendentes), return_when=FIRST_COMPLETED)
+                processaConcluidas(concluidas)
+            if token_id is not None:
+                # NFT já criado em uma execução anterior, falta apenas postá-lo
+                posta(cid, token_id)
+                continue
+            pendente = nft.criarNovoToken(cid, aguardar=False)
+            if pendente is None:
+                registra([cid, "", ""])
+                resumo["falhas"] += 1
+            else:
+                pendentes[pendente] = ("criacao", cid, None)
+
+        while pendentes:
+            concluidas, _ = wait(list(pendentes), return_when=FIRST_COMPLETED)
+            processaConcluidas(concluidas)
+
+    resumo["tempo"] = time.perf_counter() - inicio
+    return resumo
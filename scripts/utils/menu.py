@@ -7,6 +7,7 @@ def menu_vendedor():
     print("| 1 - Criar um novo NFT                               |")
     print("| 2 - Postar um NFT para aluguel                      |")
     print("| 3 - Visualizar os NFTs alugáveis da conta           |")
+    print("| 4 - Criar e postar NFTs em lote (arquivo de CIDs)   |")
     print("| 0 - Sair                                            |")
     print("=======================================================")
 
@@ -1,8 +1,161 @@
-import os, json
-from environs import Env
+import os, json, atexit, hashlib
 from dapp.Connection import Connection
 from dapp.NFTAlugavel import NFTAlugavel
 from dapp.MarketplaceAluguel import MarketplaceAluguel
+# Os módulos dos recursos opcionais e o environs são importados apenas quando utilizados
+
+# Pasta (ao lado do arquivo .env) com as variáveis de ambiente já convertidas
+PASTA_CACHE_AMBIENTE = ".cache"
+# Variáveis que nunca são guardadas no cache
+VARIAVEIS_SECRETAS = ("PRIVATE_KEY", "PRIVATE_KEYS")
+
+def le_ambiente(env_name : str):
+    '''
+        Lê o arquivo .env contendo os dados para conexão.
+
+        Parâmetros
+        ----------
+            - env_name (str): Nome do arquivo .env contendo os dados para conexão.
+
+        Retorno
+        -------
+            - dados (dict): Dicionário contendo as variáveis de ambiente já convertidas.
+    '''
+
+    from environs import Env
+
+    # Resgata variáveis de ambiente
+    env = Env()
+    path_to_env = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + "\\{}".format(env_name)
+    env.read_env(path_to_env)
+    return {
+        "PUBLIC_KEY": env.str("PUBLIC_KEY"),
+        "PRIVATE_KEY": env.str("PRIVATE_KEY"),
+        "CHAIN_URL": env.str("CHAIN_URL"),
+        "CONTRACT_ADDRESS_NFT": env.str("CONTRACT_ADDRESS_NFT"),
+        "CONTRACT_ABI_NFT": json.loads(env.str("CONTRACT_ABI_NFT")),
+        "CONTRACT_ADDRESS_MARKET": env.str("CONTRACT_ADDRESS_MARKET"),
+        "CONTRACT_ABI_MARKET": json.loads(env.str("CONTRACT_ABI_MARKET")),
+        "CHAIN_POOL_SIZE": env.int("CHAIN_POOL_SIZE", 20),
+        "INDEX_DB": env.str("INDEX_DB", ""),
+        "INDEX_START_BLOCK": env.int("INDEX_START_BLOCK", 0),
+        "EVENT_STREAM": env.bool("EVENT_STREAM", False),
+        "CHAIN_WS_URL": env.str("CHAIN_WS_URL", ""),
+        "FAST_ITEM_DECODE": env.bool("FAST_ITEM_DECODE", False),
+        "CHAIN_HEDGE": env.bool("CHAIN_HEDGE", False),
+        "CHAIN_HEDGE_DELAY": env.float("CHAIN_HEDGE_DELAY", 0.0),
+        "IPFS_GATEWAY": env.str("IPFS_GATEWAY", ""),
+        "IPFS_CACHE_DIR": env.str("IPFS_CACHE_DIR", "conteudos"),
+        "IPFS_CACHE_MB": env.int("IPFS_CACHE_MB", 512),
+        "RPC_METRICS_FILE": env.str("RPC_METRICS_FILE", ""),
+        "RPC_LOG": env.str("RPC_LOG", ""),
+        "RPC_PROFILE": env.list("RPC_PROFILE", []),
+        "RPC_PROFILE_DIR": env.str("RPC_PROFILE_DIR", "perfis"),
+        "PRIVATE_KEYS": env.list("PRIVATE_KEYS", []),
+        "WRITER_PROCESSES": env.int("WRITER_PROCESSES", 0),
+        "WRITER_PENDING": env.int("WRITER_PENDING", 16),
+    }
+
+def localiza_ambiente(env_name : str):
+    '''
+        Procura o arquivo .env na pasta dos scripts e nas pastas acima dela.
+
+        Parâmetros
+        ----------
+            - env_name (str): Nome do arquivo .env contendo os dados para conexão.
+
+        Retorno
+        -------
+            - caminho (None | str): Caminho do arquivo ou None caso não seja encontrado.
+    '''
+    pasta = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    while True:
+        caminho = os.path.join(pasta, env_name)
+        if os.path.isfile(caminho):
+            return caminho
+        superior = os.path.dirname(pasta)
+        if superior == pasta:
+            return None
+        pasta = superior
+
+def le_segredos(caminho_env : str):
+    '''
+        Lê as chaves privadas diretamente do arquivo .env (ou do próprio
+        ambiente, que tem precedência), sem passar pelo cache.
+
+        Parâmetros
+        ----------
+            - caminho_env (str): Caminho do arquivo .env.
+
+        Retorno
+        -------
+            - segredos (dict): Dicionário com PRIVATE_KEY e PRIVATE_KEYS.
+    '''
+    from dotenv import dotenv_values
+    arquivo = dotenv_values(caminho_env)
+
+    def valor(nome : str):
+        return os.environ[nome] if nome in os.environ else (arquivo.get(nome) or "")
+
+    if "PRIVATE_KEY" not in os.environ and "PRIVATE_KEY" not in arquivo:
+        raise KeyError("Variável PRIVATE_KEY não definida em {}".format(caminho_env))
+    return {
+        "PRIVATE_KEY": valor("PRIVATE_KEY"),
+        "PRIVATE_KEYS": [chave.strip() for chave in valor("PRIVATE_KEYS").split(",") if chave.strip()],
+    }
+
+def le_ambiente_em_cache(env_name : str):
+    '''
+        Lê o arquivo .env como le_ambiente, guardando em disco (JSON, legível
+        apenas pelo dono) as variáveis já convertidas, exceto as chaves
+        privadas, identificadas pelo hash do conteúdo do arquivo. As execuções
+        seguintes com o mesmo arquivo não precisam importar o environs nem
+        converter as ABIs novamente; as chaves privadas são sempre lidas do
+        próprio arquivo. Variáveis definidas no ambiente, que têm precedência
+        sobre o arquivo, também invalidam o cache quando mudam.
+
+        Parâmetros
+        ----------
+            - env_name (str): Nome do arquivo .env contendo os dados para conexão.
+
+        Retorno
+        -------
+            - dados (dict): Dicionário contendo as variáveis de ambiente já convertidas.
+    '''
+    caminho_env = localiza_ambiente(env_name)
+    if caminho_env is None:
+        return le_ambiente(env_name)
+    with open(caminho_env, "rb") as arquivo:
+        chave = hashlib.sha256(arquivo.read()).hexdigest()
+    pasta_cache = os.path.join(os.path.dirname(caminho_env), PASTA_CACHE_AMBIENTE)
+    # Um único arquivo por .env, sobrescrito quando o .env muda
+    caminho_cache = os.path.join(pasta_cache, "ambiente-{}.json".format(os.path.basename(env_name)))
+    try:
+        with open(caminho_cache, "r", encoding="utf-8") as arquivo:
+            cache = json.load(arquivo)
+        if cache["hash"] == chave and all(os.environ.get(nome) == valor
+                                          for nome, valor in cache["sobrescritas"].items()):
+            dados = cache["dados"]
+            dados.update(le_segredos(caminho_env))
+            return dados
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    antes = dict(os.environ)
+    dados = le_ambiente(env_name)
+    publicos = {nome: valor for nome, valor in dados.items() if nome not in VARIAVEIS_SECRETAS}
+    # Valores definidos no ambiente antes da leitura do arquivo
+    sobrescritas = {nome: antes.get(nome) for nome in publicos}
+    try:
+        os.makedirs(pasta_cache, exist_ok=True)
+        temporario = "{}.{}.tmp".format(caminho_cache, os.getpid())
+        descritor = os.open(temporario, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(descritor, "w", encoding="utf-8") as arquivo:
+            json.dump({"hash": chave, "sobrescritas": sobrescritas, "dados": publicos}, arquivo)
+        os.replace(temporario, caminho_cache)
+    except OSError as e:
+        print("Não foi possível salvar o cache do ambiente: {}".format(e))
+    return dados
 
 def init(env_name : str):
     '''
@@ -19,29 +172,109 @@ def init(env_name : str):
             que mapeiam os contratos em solidity.
     '''
 
-    # Resgata variáveis de ambiente
-    env = Env()
-    path_to_env = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + "\\{}".format(env_name)
-    env.read_env(path_to_env)
     # Inicializa constantes
-    PUBLIC_KEY = env.str("PUBLIC_KEY")
-    PRIVATE_KEY = env.str("PRIVATE_KEY")
-    CHAIN_URL = env.str("CHAIN_URL")
-    CONTRACT_ADDRESS_NFT = env.str("CONTRACT_ADDRESS_NFT")
-    CONTRACT_ABI_NFT = json.loads(env.str("CONTRACT_ABI_NFT"))
-    CONTRACT_ADDRESS_MARKET = env.str("CONTRACT_ADDRESS_MARKET")
-    CONTRACT_ABI_MARKET = json.loads(env.str("CONTRACT_ABI_MARKET"))
+    dados = le_ambiente_em_cache(env_name)
 
     # Cria conexões e instancia os objetos dos contratos
     nft_instance = None
     marketplace_instance = None
-    conn_nft = Connection(CHAIN_URL, CONTRACT_ADDRESS_NFT, CONTRACT_ABI_NFT)
-    conn_marketplace = Connection(CHAIN_URL, CONTRACT_ADDRESS_MARKET, CONTRACT_ABI_MARKET)
+    # Os dois contratos compartilham a mesma instância Web3, sessão HTTP,
+    # gerenciador de nonces e rastreador de recibos da rede
+    conn_nft = Connection(dados["CHAIN_URL"], dados["CONTRACT_ADDRESS_NFT"], dados["CONTRACT_ABI_NFT"],
+                          pool_size=dados["CHAIN_POOL_SIZE"])
+    conn_marketplace = Connection(dados["CHAIN_URL"], dados["CONTRACT_ADDRESS_MARKET"], dados["CONTRACT_ABI_MARKET"],
+                                  pool_size=dados["CHAIN_POOL_SIZE"])
     status_nft = conn_nft.executeConnection()
     status_mrktplc = conn_marketplace.executeConnection()
     if status_nft and status_mrktplc:
-        nft_instance = NFTAlugavel(PUBLIC_KEY, PRIVATE_KEY, conn_nft)
-        marketplace_instance = MarketplaceAluguel(PUBLIC_KEY, PRIVATE_KEY, conn_marketplace, CONTRACT_ADDRESS_NFT)
+        nft_instance = NFTAlugavel(dados["PUBLIC_KEY"], dados["PRIVATE_KEY"], conn_nft)
+        marketplace_instance = MarketplaceAluguel(dados["PUBLIC_KEY"], dados["PRIVATE_KEY"], conn_marketplace,
+                                                  dados["CONTRACT_ADDRESS_NFT"])
+        provedor = conn_marketplace.getWeb3Connection().provider
+        if dados["CHAIN_HEDGE"] and hasattr(provedor, "usaHedge"):
+            # Chamadas eth_call lentas são enviadas também a um segundo nó
+            provedor.usaHedge(("eth_call",), dados["CHAIN_HEDGE_DELAY"] or None)
+        # As medições das requisições são compartilhadas pelos dois contratos da rede
+        instrumentacao = conn_marketplace.getInstrumentacao()
+        if dados["RPC_LOG"]:
+            instrumentacao.registraLog(dados["RPC_LOG"])
+        if dados["RPC_PROFILE"]:
+            instrumentacao.perfila(dados["RPC_PROFILE"], dados["RPC_PROFILE_DIR"])
+        if dados["RPC_METRICS_FILE"]:
+            atexit.register(instrumentacao.salvaPrometheus, dados["RPC_METRICS_FILE"])
+        if dados["IPFS_GATEWAY"]:
+            from dapp.CacheConteudo import CacheConteudo
+            # Conteúdos dos CIDs verificados e guardados em disco
+            nft_instance.usaCacheConteudo(CacheConteudo(dados["IPFS_GATEWAY"], dados["IPFS_CACHE_DIR"],
+                                                        dados["IPFS_CACHE_MB"] * 1024 * 1024))
+        if dados["PRIVATE_KEYS"]:
+            from dapp.PoolEscritores import PoolEscritores
+            # Escritas em lote distribuídas entre as contas, com assinatura em processos separados
+            marketplace_instance.usaEscritores(PoolEscritores(dados["PRIVATE_KEYS"], conn_nft, conn_marketplace,
+                                                              dados["CONTRACT_ADDRESS_NFT"],
+                                                              dados["WRITER_PROCESSES"] or None,
+                                                              dados["WRITER_PENDING"]))
+        # Decodifica as listas de itens diretamente dos bytes da resposta
+        marketplace_instance.usaDecodificacaoRapida(dados["FAST_ITEM_DECODE"])
+        if dados["INDEX_DB"]:
+            from dapp.IndiceMarketplace import IndiceMarketplace
+            from dapp.ArmazemSQLite import ArmazemSQLite
+            # As consultas passam a usar o índice em disco, retomado do último bloco sincronizado
+            indice = IndiceMarketplace(conn_marketplace.getWeb3Connection(), conn_marketplace.getContractConnection(),
+                                       ArmazemSQLite(dados["INDEX_DB"]), dados["INDEX_START_BLOCK"],
+                                       contract_nft=conn_nft.getContractConnection())
+            marketplace_instance.usaIndice(indice)
+        if dados["EVENT_STREAM"]:
+            from dapp.FluxoEventos import FluxoEventos
+            # Um único fluxo de eventos acompanha as transações enviadas e mantém o índice atualizado
+            fluxo = FluxoEventos(conn_marketplace.getWeb3Connection(), conn_marketplace.getContractConnection(),
+                                 conn_nft.getContractConnection(), url_ws=dados["CHAIN_WS_URL"] or None)
+            nft_instance.usaFluxo(fluxo)
+            marketplace_instance.usaFluxo(fluxo)
+            if marketplace_instance.indice is not None:
+                marketplace_instance.indice.consomeFluxo(fluxo)
+            fluxo.inicia()
+    else:
+        print("Ocorreu um erro! Cheque as conexões com a rede e contratos.")
+    return nft_instance, marketplace_instance
+
+async def init_async(env_name : str):
+    '''
+        Versão assíncrona de init, que cria os objetos assíncronos das
+        classes que mapeiam os contratos em solidity.
+
+        Parâmetros
+        ----------
+            - env_name (str): Nome do arquivo .env contendo os dados para conexão.
+
+        Retorno
+        -------
+            - data (None | tuple): Tupla contendo os objetos assíncronos das
+            classes que mapeiam os contratos em solidity.
+    '''
+
+    from dapp.AsyncConnection import AsyncConnection
+    from dapp.AsyncNFTAlugavel import AsyncNFTAlugavel
+    from dapp.AsyncMarketplaceAluguel import AsyncMarketplaceAluguel
+
+    # Inicializa constantes
+    dados = le_ambiente_em_cache(env_name)
+
+    # Cria conexões e instancia os objetos dos contratos
+    nft_instance = None
+    marketplace_instance = None
+    # O provedor assíncrono não distribui as requisições entre nós, então apenas o primário da lista é utilizado
+    url = dados["CHAIN_URL"].split(",")[0].strip()
+    conn_nft = AsyncConnection(url, dados["CONTRACT_ADDRESS_NFT"], dados["CONTRACT_ABI_NFT"])
+    status_nft = await conn_nft.executeConnection()
+    # Os dois contratos compartilham o gerenciador de nonces da conta
+    conn_marketplace = AsyncConnection(url, dados["CONTRACT_ADDRESS_MARKET"],
+                                       dados["CONTRACT_ABI_MARKET"], conn_nft.getNonceManager())
+    status_mrktplc = await conn_marketplace.executeConnection()
+    if status_nft and status_mrktplc:
+        nft_instance = AsyncNFTAlugavel(dados["PUBLIC_KEY"], dados["PRIVATE_KEY"], conn_nft)
+        marketplace_instance = AsyncMarketplaceAluguel(dados["PUBLIC_KEY"], dados["PRIVATE_KEY"], conn_marketplace,
+                                                       dados["CONTRACT_ADDRESS_NFT"])
     else:
         print("Ocorreu um erro! Cheque as conexões com a rede e contratos.")
-    return nft_instance, marketplace_instance
\ No newline at end of file
+    return nft_instance, marketplace_instance